@@ -3,6 +3,11 @@ ASGI config for event_backend project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
 
+The Procfile serves the project through this module (gunicorn with uvicorn
+workers) for the /api/stream/ Server-Sent Events endpoint: each open stream is
+an idle coroutine here, whereas WSGI would buffer it and pin a whole worker, so
+the endpoint refuses WSGI requests.
+
 For more information on this file, see
 https://docs.djangoproject.com/en/5.2/howto/deployment/asgi/
 """
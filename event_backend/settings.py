@@ -40,12 +40,17 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     'corsheaders.middleware.CorsMiddleware',
+    # Server-Timing header, per-route timing histograms and request log lines
+    'events.instrumentation.RequestTimingMiddleware',
+    # DEBUG only: checks per-view query budgets (see events.query_budget)
+    'events.query_budget.QueryBudgetMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'whitenoise.middleware.WhiteNoiseMiddleware',  # Added for static files
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'events.identity.RequestIdentityMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
@@ -72,11 +77,14 @@ WSGI_APPLICATION = 'event_backend.wsgi.application'
 
 # Database
 if os.environ.get('DATABASE_URL'):
-    # Use PostgreSQL on Render
+    # Use PostgreSQL on Render. The web process is served over ASGI, where sync views run in
+    # per-request threads: persistent connections opened there are never reused or closed
+    # and would pile up until Postgres refuses new ones, so connections close after each
+    # request unless DB_CONN_MAX_AGE says otherwise (e.g. for a WSGI deployment).
     DATABASES = {
         'default': dj_database_url.config(
             default=os.environ.get('DATABASE_URL'),
-            conn_max_age=600,
+            conn_max_age=int(os.environ.get('DB_CONN_MAX_AGE', '0')),
             ssl_require=True
         )
     }
@@ -89,6 +97,18 @@ else:
         }
     }
 
+# Cache (per-process locmem by default; point CACHE_BACKEND/CACHE_LOCATION at a
+# shared backend so dashboard invalidation reaches every gunicorn worker)
+CACHES = {
+    'default': {
+        'BACKEND': os.environ.get('CACHE_BACKEND', 'django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': os.environ.get('CACHE_LOCATION', 'evex-default'),
+    }
+}
+
+# Seconds a cached dashboard payload may be served before it is rebuilt
+DASHBOARD_CACHE_TIMEOUT = int(os.environ.get('DASHBOARD_CACHE_TIMEOUT', '300'))
+
 # Password validation
 AUTH_PASSWORD_VALIDATORS = [
     {
@@ -127,10 +147,68 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 EMAIL_BACKEND = 'django.core.mail.backends.console.EmailBackend'
 DEFAULT_FROM_EMAIL = 'noreply@evex.com'
 
+# Queued email delivery (send_queued_emails): messages per SMTP connection and retries per message
+EMAIL_BATCH_SIZE = int(os.environ.get('EMAIL_BATCH_SIZE', '200'))
+EMAIL_MAX_ATTEMPTS = 3
+
+# A queued email claimed by a mailer batch for this long without being marked sent is
+# picked up again (its worker is assumed dead)
+EMAIL_CLAIM_STALE_SECONDS = int(os.environ.get('EMAIL_CLAIM_STALE_SECONDS', '600'))
+
+# Rows per INSERT / recipients per chunk for bulk notification fan-out
+NOTIFICATION_BATCH_SIZE = int(os.environ.get('NOTIFICATION_BATCH_SIZE', '2000'))
+
+# A running fan-out without progress for this long is taken over and resumed by the
+# send_queued_emails worker (its previous worker is assumed dead)
+NOTIFICATION_FANOUT_STALE_SECONDS = int(os.environ.get('NOTIFICATION_FANOUT_STALE_SECONDS', '300'))
+
+# Registration/waitlist/cancellation notifications for the same user and event within this
+# many seconds update one row (and one pending email) instead of piling up
+NOTIFICATION_COALESCE_SECONDS = int(os.environ.get('NOTIFICATION_COALESCE_SECONDS', '600'))
+
+# Days a *read* notification is kept, per notification_type (see the prune_notifications command)
+NOTIFICATION_RETENTION_DAYS = {
+    'default': 90,
+    'event_reminder': 14,
+    'waitlist_promotion': 30,
+    'registration_confirmation': 60,
+}
+
+# Completed events older than this have their registrations/notifications moved to archive tables
+EVENT_ARCHIVE_AFTER_DAYS = int(os.environ.get('EVENT_ARCHIVE_AFTER_DAYS', '180'))
+
+# Processes used to hash passwords during bulk student imports (in the send_queued_emails worker)
+STUDENT_IMPORT_HASH_WORKERS = int(os.environ.get('STUDENT_IMPORT_HASH_WORKERS', str(min(4, os.cpu_count() or 1))))
+
+# Event date/venue edits within this many seconds are folded into one event_updated notification
+EVENT_UPDATE_COALESCE_SECONDS = int(os.environ.get('EVENT_UPDATE_COALESCE_SECONDS', '900'))
+
+# Query budgets (DEBUG only): 'log' or 'raise' when a request runs more queries than its view
+# declares, the budget for views declaring none (None = unchecked), and how often one query
+# fingerprint may repeat in a request before it is reported as a likely N+1
+QUERY_BUDGET_ACTION = os.environ.get('QUERY_BUDGET_ACTION', 'log')
+QUERY_BUDGET_DEFAULT = None
+QUERY_BUDGET_REPEAT_THRESHOLD = int(os.environ.get('QUERY_BUDGET_REPEAT_THRESHOLD', '5'))
+
+# Request timing (events.instrumentation): whether every response carries a Server-Timing
+# header with DB/render/app time (staff users always get it; it reveals query counts, so
+# it's off for everyone else by default), and the duration above which a request is logged
+# as a warning
+SERVER_TIMING_HEADER = os.environ.get('SERVER_TIMING_HEADER', 'False') == 'True'
+REQUEST_TIMING_SLOW_MS = int(os.environ.get('REQUEST_TIMING_SLOW_MS', '1000'))
+
+# Prometheus metrics at /api/metrics/ (events.metrics): the directory where each worker
+# process writes its counters (shared by all gunicorn workers; empty = this process only),
+# how often a worker writes them, and the bearer token scrapers must send (without one the
+# endpoint is only served with DEBUG on)
+METRICS_MULTIPROC_DIR = os.environ.get('METRICS_MULTIPROC_DIR', '')
+METRICS_FLUSH_SECONDS = float(os.environ.get('METRICS_FLUSH_SECONDS', '5'))
+METRICS_TOKEN = os.environ.get('METRICS_TOKEN', '')
+
 # REST Framework settings
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'events.authentication.ClaimsJWTAuthentication',
     ),
     'DEFAULT_PERMISSION_CLASSES': (
         'rest_framework.permissions.IsAuthenticated',
@@ -143,6 +221,10 @@ SIMPLE_JWT = {
     'REFRESH_TOKEN_LIFETIME': timedelta(days=7),
 }
 
+# How long a user's token fingerprint is cached. Revocation is immediate with a shared
+# cache backend; with the per-process default other workers notice within this window.
+AUTH_FINGERPRINT_CACHE_TIMEOUT = int(os.environ.get('AUTH_FINGERPRINT_CACHE_TIMEOUT', '300'))
+
 # Logging configuration
 LOGGING = {
     'version': 1,
@@ -157,5 +239,10 @@ LOGGING = {
             'handlers': ['console'],
             'level': os.getenv('DJANGO_LOG_LEVEL', 'INFO'),
         },
+        # One JSON line per request at INFO; only slow requests at the default WARNING
+        'events.instrumentation': {
+            'handlers': ['console'],
+            'level': os.getenv('REQUEST_TIMING_LOG_LEVEL', 'WARNING'),
+        },
     },
 }
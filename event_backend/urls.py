@@ -2,12 +2,11 @@ from django.contrib import admin
 from django.urls import path, include
 from django.conf import settings
 from django.conf.urls.static import static
-from rest_framework_simplejwt.views import TokenRefreshView
-from events.views import UsernameOrEmailTokenObtainPairView
+from events.views import UsernameOrEmailTokenObtainPairView, ClaimsTokenRefreshView
 
 urlpatterns = [
     path('admin/', admin.site.urls),
     path('api/token/', UsernameOrEmailTokenObtainPairView.as_view(), name='token_obtain_pair'),
-    path('api/token/refresh/', TokenRefreshView.as_view(), name='token_refresh'),
+    path('api/token/refresh/', ClaimsTokenRefreshView.as_view(), name='token_refresh'),
     path('api/', include('events.urls')),
 ] + static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
\ No newline at end of file
@@ -22,4 +22,20 @@ class EventAdmin(admin.ModelAdmin):
 class RegistrationAdmin(admin.ModelAdmin):
     list_display = ['event', 'user', 'status', 'registered_at']
 
-admin.site.register([EventCategory, WaitlistEntry, Attendance, Feedback, Notification])
\ No newline at end of file
+@admin.register(NotificationFanout)
+class NotificationFanoutAdmin(admin.ModelAdmin):
+    list_display = ['title', 'university', 'user_type', 'status', 'notified_count', 'total_recipients', 'created_at']
+    list_filter = ['status']
+
+@admin.register(StudentImportJob)
+class StudentImportJobAdmin(admin.ModelAdmin):
+    list_display = ['university', 'status', 'created_count', 'error_count', 'created_by', 'created_at']
+    list_filter = ['status']
+    exclude = ['csv_content']
+
+@admin.register(EmailDeliveryBatch)
+class EmailDeliveryBatchAdmin(admin.ModelAdmin):
+    list_display = ['started_at', 'attempted', 'sent', 'failed', 'duration_ms', 'is_digest', 'error']
+
+admin.site.register([EventCategory, WaitlistEntry, Attendance, Feedback, Notification, QueuedEmail,
+                     ArchivedRegistration, ArchivedWaitlistEntry, ArchivedRecentActivity, ArchivedNotification])
\ No newline at end of file
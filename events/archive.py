@@ -0,0 +1,147 @@
+from collections import Counter
+
+from django.db import transaction
+from django.db.models import F, Value, BooleanField
+from django.utils import timezone
+
+from .caching import (
+    per_row_invalidation_suppressed,
+    invalidate_organizer_dashboard,
+    invalidate_student_overview,
+    invalidate_recent_activities,
+)
+from .models import (
+    Event, Registration, WaitlistEntry, RecentActivity, Notification, Attendance,
+    ArchivedRegistration, ArchivedWaitlistEntry, ArchivedRecentActivity, ArchivedNotification,
+)
+from .notifications import decrement_unread
+
+# Rows copied per INSERT while moving an event's history to the archive tables
+ARCHIVE_INSERT_BATCH_SIZE = 1000
+
+
+def archivable_events(completed_before):
+    """
+    Completed events whose start time is older than completed_before and that
+    haven't been archived yet.
+    """
+    return Event.objects.filter(status='completed', date_time__lt=completed_before, archived_at__isnull=True)
+
+
+def _copy(queryset, archive_model, fields):
+    rows = [
+        archive_model(original_id=row.pop('id'), **row)
+        for row in queryset.values('id', *fields)
+    ]
+    archive_model.objects.bulk_create(rows, batch_size=ARCHIVE_INSERT_BATCH_SIZE)
+    return rows
+
+
+def archive_events(event_ids):
+    """
+    Move the registrations, waitlist entries, activities and notifications of the
+    given events into the archive tables in one transaction and mark the events
+    archived, including ones with nothing to move. Returns per-table counts.
+    """
+    with transaction.atomic(), per_row_invalidation_suppressed():
+        registrations = Registration.objects.filter(event_id__in=event_ids)
+        waitlist = WaitlistEntry.objects.filter(event_id__in=event_ids)
+        activities = RecentActivity.objects.filter(event_id__in=event_ids)
+        notifications = Notification.objects.filter(related_event_id__in=event_ids)
+
+        copied_registrations = _copy(
+            registrations, ArchivedRegistration, ['event_id', 'user_id', 'registered_at', 'status']
+        )
+        copied_waitlist = _copy(
+            waitlist, ArchivedWaitlistEntry, ['event_id', 'user_id', 'joined_at', 'position']
+        )
+        copied_activities = _copy(
+            activities, ArchivedRecentActivity, ['event_id', 'user_id', 'action', 'timestamp']
+        )
+        copied_notifications = _copy(
+            notifications, ArchivedNotification,
+            ['user_id', 'title', 'message', 'notification_type', 'is_read', 'created_at',
+             'related_event_id', 'target_university_id']
+        )
+
+        # Attendance outlives the registration it was checked in against
+        Attendance.objects.filter(event_id__in=event_ids, registration__isnull=False).update(registration=None)
+        registrations.delete()
+        waitlist.delete()
+        activities.delete()
+        notifications.delete()
+        Event.objects.filter(id__in=event_ids).update(archived_at=timezone.now())
+
+        unread = Counter(row.user_id for row in copied_notifications if not row.is_read)
+        for user_id, count in unread.items():
+            decrement_unread(user_id, by=count)
+        for organizer_id in set(Event.objects.filter(id__in=event_ids).values_list('organizer_id', flat=True)):
+            invalidate_organizer_dashboard(organizer_id)
+        for user_id in {row.user_id for row in copied_registrations}:
+            invalidate_student_overview(user_id)
+        for user_id in {row.user_id for row in copied_activities}:
+            invalidate_recent_activities(user_id)
+
+    return {
+        'registrations': len(copied_registrations),
+        'waitlist_entries': len(copied_waitlist),
+        'activities': len(copied_activities),
+        'notifications': len(copied_notifications),
+    }
+
+
+def archive_notifications(notification_ids):
+    """
+    Copy notifications to the archive table and delete them from the hot one.
+    """
+    with transaction.atomic():
+        notifications = Notification.objects.filter(id__in=notification_ids)
+        copied = _copy(
+            notifications, ArchivedNotification,
+            ['user_id', 'title', 'message', 'notification_type', 'is_read', 'created_at',
+             'related_event_id', 'target_university_id']
+        )
+        notifications.delete()
+        unread = Counter(row.user_id for row in copied if not row.is_read)
+        for user_id, count in unread.items():
+            decrement_unread(user_id, by=count)
+    return len(copied)
+
+
+HISTORY_REGISTRATION_FIELDS = ['id', 'event_id', 'event_title', 'event_date', 'status', 'registered_at', 'archived']
+
+
+def registration_history(user):
+    """
+    The user's live and archived registrations as one queryset of dicts, newest first.
+    Archived rows keep the id they had in the live table.
+    """
+    live = Registration.objects.filter(user=user).annotate(
+        event_title=F('event__title'),
+        event_date=F('event__date_time'),
+        archived=Value(False, output_field=BooleanField()),
+    ).values(*HISTORY_REGISTRATION_FIELDS).order_by()
+    archived = ArchivedRegistration.objects.filter(user=user).annotate(
+        event_title=F('event__title'),
+        event_date=F('event__date_time'),
+        archived=Value(True, output_field=BooleanField()),
+    ).values('original_id', *HISTORY_REGISTRATION_FIELDS[1:]).order_by()
+    return live.union(archived, all=True).order_by('-registered_at')
+
+
+def activity_history(user):
+    """
+    The user's live and archived activity feed as one queryset of dicts, newest first.
+    """
+    fields = ['event_id', 'event_title', 'event_date', 'action', 'timestamp', 'archived']
+    live = RecentActivity.objects.filter(user=user).annotate(
+        event_title=F('event__title'),
+        event_date=F('event__date_time'),
+        archived=Value(False, output_field=BooleanField()),
+    ).values('id', *fields).order_by()
+    archived = ArchivedRecentActivity.objects.filter(user=user).annotate(
+        event_title=F('event__title'),
+        event_date=F('event__date_time'),
+        archived=Value(True, output_field=BooleanField()),
+    ).values('original_id', *fields).order_by()
+    return live.union(archived, all=True).order_by('-timestamp')
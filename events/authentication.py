@@ -0,0 +1,160 @@
+import hashlib
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import F
+from django.utils.functional import SimpleLazyObject, empty
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.settings import api_settings
+
+from .models import UserProfile
+from .utils import get_user_profile
+
+USER_TYPE_CLAIM = 'user_type'
+UNIVERSITY_CLAIM = 'university_id'
+STAFF_CLAIM = 'is_staff'
+FINGERPRINT_CLAIM = 'auth_fp'
+
+CLAIMS_FINGERPRINT_KEY = 'auth_fp:{user_id}'
+
+
+def _fingerprint(token_version, user_type, university_id, is_staff, is_active, password):
+    """
+    Digest of everything a token's claims vouch for. Any change to the role, university,
+    staff/active flags, password or token_version produces a different value.
+    """
+    raw = f'{token_version}:{user_type}:{university_id}:{is_staff}:{is_active}:{password}'
+    return hashlib.sha256(raw.encode()).hexdigest()[:16]
+
+
+def current_fingerprint(user_id):
+    """
+    The fingerprint live tokens for user_id must carry, cached so authentication
+    normally needs no query. None when the user or their profile no longer exists.
+    """
+    key = CLAIMS_FINGERPRINT_KEY.format(user_id=user_id)
+    fingerprint = cache.get(key)
+    if fingerprint is None:
+        row = UserProfile.objects.filter(user_id=user_id).values_list(
+            'token_version', 'user_type', 'university_id',
+            'user__is_staff', 'user__is_active', 'user__password'
+        ).first()
+        if row is None:
+            return None
+        fingerprint = _fingerprint(*row)
+        # With a per-process cache (locmem) other workers notice a change only after this timeout
+        cache.set(key, fingerprint, getattr(settings, 'AUTH_FINGERPRINT_CACHE_TIMEOUT', 300))
+    return fingerprint
+
+
+def invalidate_fingerprint(user_id):
+    key = CLAIMS_FINGERPRINT_KEY.format(user_id=user_id)
+    transaction.on_commit(lambda: cache.delete(key))
+
+
+def revoke_user_tokens(user_id):
+    """
+    Invalidate every access and refresh token issued to the user so far.
+    """
+    UserProfile.objects.filter(user_id=user_id).update(token_version=F('token_version') + 1)
+    invalidate_fingerprint(user_id)
+
+
+def add_role_claims(token, user):
+    """
+    Embed the role, university and staff flag so permission checks can skip the profile lookup.
+    """
+    profile = get_user_profile(user, create_if_missing=True)
+    token[USER_TYPE_CLAIM] = profile.user_type
+    token[UNIVERSITY_CLAIM] = profile.university_id
+    token[STAFF_CLAIM] = user.is_staff
+    fingerprint = _fingerprint(
+        profile.token_version, profile.user_type, profile.university_id,
+        user.is_staff, user.is_active, user.password
+    )
+    token[FINGERPRINT_CLAIM] = fingerprint
+    cache.set(
+        CLAIMS_FINGERPRINT_KEY.format(user_id=user.pk), fingerprint,
+        getattr(settings, 'AUTH_FINGERPRINT_CACHE_TIMEOUT', 300)
+    )
+    return token
+
+
+def check_fingerprint(token):
+    user_id = token.get(api_settings.USER_ID_CLAIM)
+    if token.get(FINGERPRINT_CLAIM) != current_fingerprint(user_id):
+        raise AuthenticationFailed('Token has been revoked', code='token_revoked')
+
+
+class TokenClaimsUser(SimpleLazyObject):
+    """
+    request.user for claim-bearing tokens. id, role, university and staff flag come
+    from the token; touching anything else loads the User row once, so views that
+    need the model instance keep working unchanged.
+    """
+
+    def __init__(self, token):
+        self.__dict__['_token'] = token
+        user_id = int(token[api_settings.USER_ID_CLAIM])
+        super().__init__(lambda: User.objects.get(pk=user_id))
+
+    def prime(self, user):
+        """
+        Use an already loaded User instead of querying for it on first access.
+        """
+        if self._wrapped is empty:
+            self._wrapped = user
+
+    def __copy__(self):
+        if self._wrapped is empty:
+            return type(self)(self._token)
+        return super().__copy__()
+
+    def __bool__(self):
+        return True
+
+    @property
+    def id(self):
+        return int(self._token[api_settings.USER_ID_CLAIM])
+
+    @property
+    def pk(self):
+        return self.id
+
+    @property
+    def is_authenticated(self):
+        return True
+
+    @property
+    def is_anonymous(self):
+        return False
+
+    @property
+    def is_staff(self):
+        return bool(self._token.get(STAFF_CLAIM, False))
+
+    @property
+    def user_type(self):
+        return self._token.get(USER_TYPE_CLAIM)
+
+    @property
+    def university_id(self):
+        return self._token.get(UNIVERSITY_CLAIM)
+
+
+class ClaimsJWTAuthentication(JWTAuthentication):
+    """
+    JWTAuthentication that trusts the role claims instead of loading the user, after
+    checking the token's fingerprint against the (cached) current one.
+    Tokens issued before the claims existed fall back to the database lookup.
+    """
+
+    def get_user(self, validated_token):
+        if FINGERPRINT_CLAIM not in validated_token:
+            return super().get_user(validated_token)
+        check_fingerprint(validated_token)
+        return TokenClaimsUser(validated_token)
+
@@ -0,0 +1,125 @@
+import threading
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+from .metrics import metrics
+
+ORGANIZER_DASHBOARD_KEY = 'organizer_dashboard:{organizer_id}'
+
+_local = threading.local()
+
+
+@contextmanager
+def per_row_invalidation_suppressed():
+    """
+    Skip signal-driven per-row invalidation inside bulk jobs; the job must
+    invalidate the affected organizers and users itself.
+    """
+    previous = getattr(_local, 'suppressed', False)
+    _local.suppressed = True
+    try:
+        yield
+    finally:
+        _local.suppressed = previous
+
+
+def per_row_invalidation_is_suppressed():
+    return getattr(_local, 'suppressed', False)
+
+
+def record_lookup(name, value):
+    """
+    Count a cache read as a hit or miss in cache_requests_total (events.metrics).
+    """
+    metrics.inc('cache_requests_total', cache=name, result='miss' if value is None else 'hit')
+
+
+def _dashboard_timeout():
+    return getattr(settings, 'DASHBOARD_CACHE_TIMEOUT', 300)
+
+
+def organizer_dashboard_key(organizer_id):
+    return ORGANIZER_DASHBOARD_KEY.format(organizer_id=organizer_id)
+
+
+def get_organizer_dashboard(organizer_id, build):
+    """
+    Return the cached dashboard payload for an organizer, building it on a miss.
+    """
+    key = organizer_dashboard_key(organizer_id)
+    payload = cache.get(key)
+    record_lookup('organizer_dashboard', payload)
+    if payload is None:
+        payload = build()
+        cache.set(key, payload, _dashboard_timeout())
+    return payload
+
+
+def invalidate_organizer_dashboard(organizer_id):
+    """
+    Drop the organizer's cached dashboard once the current transaction commits,
+    so a concurrent request can't re-cache pre-commit data.
+    """
+    if organizer_id is None:
+        return
+    key = organizer_dashboard_key(organizer_id)
+    transaction.on_commit(lambda: cache.delete(key))
+
+
+STUDENT_OVERVIEW_KEY = 'student_overview:{user_id}'
+RECENT_ACTIVITY_KEY = 'recent_activity:{user_id}'
+RECENT_ACTIVITY_LIMIT = 5
+
+
+def get_student_overview(user_id, build):
+    """
+    Return the cached student overview payload, building it on a miss.
+    """
+    key = STUDENT_OVERVIEW_KEY.format(user_id=user_id)
+    payload = cache.get(key)
+    record_lookup('student_overview', payload)
+    if payload is None:
+        payload = build()
+        cache.set(key, payload, _dashboard_timeout())
+    return payload
+
+
+def invalidate_student_overview(user_id):
+    key = STUDENT_OVERVIEW_KEY.format(user_id=user_id)
+    transaction.on_commit(lambda: cache.delete(key))
+
+
+def get_recent_activities(user_id, build):
+    """
+    Return the user's newest RECENT_ACTIVITY_LIMIT serialized activities from cache.
+    """
+    key = RECENT_ACTIVITY_KEY.format(user_id=user_id)
+    activities = cache.get(key)
+    record_lookup('recent_activity', activities)
+    if activities is None:
+        activities = list(build())[:RECENT_ACTIVITY_LIMIT]
+        cache.set(key, activities, _dashboard_timeout())
+    return activities
+
+
+def push_recent_activity(user_id, activity_data):
+    """
+    Prepend a freshly created activity to the cached list, keeping it bounded.
+    A cold cache is left alone; the next read rebuilds it from the database.
+    """
+    key = RECENT_ACTIVITY_KEY.format(user_id=user_id)
+
+    def _push():
+        activities = cache.get(key)
+        if activities is not None:
+            cache.set(key, ([activity_data] + activities)[:RECENT_ACTIVITY_LIMIT], _dashboard_timeout())
+
+    transaction.on_commit(_push)
+
+
+def invalidate_recent_activities(user_id):
+    key = RECENT_ACTIVITY_KEY.format(user_id=user_id)
+    transaction.on_commit(lambda: cache.delete(key))
@@ -0,0 +1,351 @@
+"""
+Registration contention harness (see the benchmark_registration_contention command).
+
+Hundreds of registrants and cancellers hit one small event at once, from threads or
+forked processes, using one of several registration strategies. Afterwards the event
+is checked for overbooking and waitlist consistency.
+"""
+import multiprocessing
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.db import DatabaseError, connection, connections, transaction
+from django.db.backends.signals import connection_created
+from django.utils import timezone
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from .benchmarking import summarize
+from .models import University, EventCategory, Venue, Event, UserProfile, Registration, WaitlistEntry
+from .utils import promote_from_waitlist
+
+ISOLATION_LEVELS = {
+    'read_committed': 'READ COMMITTED',
+    'repeatable_read': 'REPEATABLE READ',
+    'serializable': 'SERIALIZABLE',
+}
+
+# SQLite is always serializable; what varies is when a transaction takes the write lock.
+# Deferred transactions that read first and then write fail with "database is locked"
+# when another writer got in between, without waiting for the busy timeout.
+SQLITE_TRANSACTION_MODES = {
+    'deferred': None,
+    'immediate': 'IMMEDIATE',
+}
+
+# Error text of failures worth retrying: serialization/deadlock on PostgreSQL, busy SQLite
+# (shared-cache SQLite databases, like the in-memory test one, report table locks instead)
+RETRYABLE_ERRORS = ('could not serialize', 'deadlock detected', 'database is locked', 'database table is locked')
+
+ACTIVE_STATUSES = ['registered', 'attended']
+
+_settings = {}
+
+
+def configure_session(sender, connection, **kwargs):
+    """
+    connection_created receiver for worker connections: session isolation level on
+    PostgreSQL, busy timeout and transaction mode on SQLite.
+    """
+    if connection.vendor == 'sqlite':
+        connection.transaction_mode = SQLITE_TRANSACTION_MODES[_settings['isolation']]
+    with connection.cursor() as cursor:
+        if connection.vendor == 'postgresql':
+            cursor.execute(
+                'SET SESSION CHARACTERISTICS AS TRANSACTION ISOLATION LEVEL '
+                + ISOLATION_LEVELS[_settings['isolation']]
+            )
+        elif connection.vendor == 'sqlite':
+            cursor.execute(f"PRAGMA busy_timeout = {_settings['busy_timeout_ms']}")
+
+
+class _LockTimer:
+    """
+    Execute wrapper timing the statements that wait for locks: SELECT ... FOR UPDATE,
+    and on SQLite the BEGIN IMMEDIATE that waits for the database write lock.
+    """
+
+    def __init__(self):
+        self.lock_ms = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        if 'FOR UPDATE' not in sql and not sql.startswith('BEGIN'):
+            return execute(sql, params, many, context)
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.lock_ms += (time.perf_counter() - started) * 1000
+
+
+def _is_retryable(message):
+    message = message.lower()
+    return any(text in message for text in RETRYABLE_ERRORS)
+
+
+def _book(event, user_id):
+    if event.is_full:
+        if WaitlistEntry.objects.filter(event=event, user_id=user_id).exists():
+            return 'rejected'
+        position = WaitlistEntry.objects.filter(event=event).count() + 1
+        WaitlistEntry.objects.create(event=event, user_id=user_id, position=position)
+        return 'waitlisted'
+    registration, created = Registration.objects.get_or_create(
+        event=event, user_id=user_id, defaults={'status': 'registered'}
+    )
+    if not created:
+        if registration.status in ACTIVE_STATUSES:
+            return 'rejected'
+        registration.status = 'registered'
+        registration.save(update_fields=['status'])
+    return 'registered'
+
+
+def register_no_lock(event_id, user_id):
+    """
+    Check-then-insert without locking the event: the baseline that can overbook.
+    """
+    with transaction.atomic():
+        return _book(Event.objects.get(pk=event_id), user_id)
+
+
+def register_row_lock(event_id, user_id):
+    """
+    The capacity logic of EventViewSet.register: lock the event row, then check and insert.
+    """
+    with transaction.atomic():
+        return _book(Event.objects.select_for_update().get(pk=event_id), user_id)
+
+
+def register_view(event_id, user_id):
+    """
+    The full EventViewSet.register action (eligibility, clash check, notifications, activity).
+    """
+    from .views import EventViewSet
+
+    request = APIRequestFactory().post(f'/api/events/{event_id}/register/')
+    force_authenticate(request, user=User.objects.get(pk=user_id))
+    response = EventViewSet.as_view({'post': 'register'})(request, pk=event_id)
+    if response.status_code == 201:
+        return 'registered'
+    if response.status_code == 200 and response.data.get('status') == 'added_to_waitlist':
+        return 'waitlisted'
+    error = str(response.data.get('error', ''))
+    if response.status_code >= 500:
+        raise DatabaseError(error)
+    return 'rejected'
+
+
+def cancel_direct(event_id, user_id):
+    """
+    Cancel and promote in one transaction holding the event lock. Committing the cancel
+    first left the seat empty whenever the promotion then hit a lock conflict: the retry
+    found nothing to cancel.
+    """
+    with transaction.atomic():
+        event = Event.objects.select_for_update().get(pk=event_id)
+        updated = Registration.objects.filter(
+            event_id=event_id, user_id=user_id, status__in=ACTIVE_STATUSES
+        ).update(status='cancelled')
+        if not updated:
+            return 'rejected'
+        promote_from_waitlist(event)
+    return 'cancelled'
+
+
+def cancel_view(event_id, user_id):
+    from .views import EventViewSet
+
+    request = APIRequestFactory().post(f'/api/events/{event_id}/cancel_registration/')
+    force_authenticate(request, user=User.objects.get(pk=user_id))
+    response = EventViewSet.as_view({'post': 'cancel_registration'})(request, pk=event_id)
+    return 'cancelled' if response.status_code == 200 else 'rejected'
+
+
+STRATEGIES = {
+    'no_lock': (register_no_lock, cancel_direct),
+    'row_lock': (register_row_lock, cancel_direct),
+    'view': (register_view, cancel_view),
+}
+
+
+def run_task(task):
+    """
+    Run one register/cancel attempt with retries. Returns a result dict.
+    """
+    kind, event_id, user_id = task
+    register, cancel = STRATEGIES[_settings['strategy']]
+    func = register if kind == 'register' else cancel
+    timer = _LockTimer()
+    retries = 0
+    started = time.perf_counter()
+    with connection.execute_wrapper(timer):
+        while True:
+            try:
+                outcome = func(event_id, user_id)
+                break
+            except DatabaseError as e:
+                if _is_retryable(str(e)) and retries < _settings['retries']:
+                    retries += 1
+                    time.sleep(random.uniform(0, 0.005 * retries))
+                    continue
+                outcome = 'error'
+                break
+    return {
+        'kind': kind,
+        'outcome': outcome,
+        'ms': (time.perf_counter() - started) * 1000,
+        'lock_ms': timer.lock_ms,
+        'retries': retries,
+    }
+
+
+def check_event(event_id, limit):
+    """
+    Invariants after a run: no overbooking, contiguous unique waitlist positions,
+    nobody both seated and waitlisted, no free seat while people wait.
+    """
+    active = Registration.objects.filter(event_id=event_id, status__in=ACTIVE_STATUSES)
+    active_count = active.count()
+    positions = sorted(WaitlistEntry.objects.filter(event_id=event_id).values_list('position', flat=True))
+    issues = []
+    if active_count > limit:
+        issues.append(f'overbooked by {active_count - limit}')
+    if positions != list(range(1, len(positions) + 1)):
+        issues.append(f'waitlist positions not contiguous: {len(positions)} entries, '
+                      f'{len(set(positions))} distinct positions')
+    both = WaitlistEntry.objects.filter(event_id=event_id, user__in=active.values('user_id')).count()
+    if both:
+        issues.append(f'{both} users both registered and waitlisted')
+    if positions and active_count < limit:
+        issues.append(f'{limit - active_count} free seats with {len(positions)} users waiting')
+    return {
+        'active': active_count,
+        'limit': limit,
+        'waitlist': len(positions),
+        'overbooked': max(active_count - limit, 0),
+        'issues': issues,
+    }
+
+
+class ContentionHarness:
+    """
+    Seeds registrants once, then runs each (strategy, isolation) combination against a fresh event.
+    """
+
+    def __init__(self, registrants=300, cancellers=50, limit=100, concurrency=32, mode='threads',
+                 seed=42, retries=5, busy_timeout_ms=5000, prefix='contention'):
+        if cancellers > limit:
+            raise ValueError('cancellers need seats of their own; use at most --limit of them')
+        self.registrants = registrants
+        self.cancellers = cancellers
+        self.limit = limit
+        self.concurrency = concurrency
+        self.mode = mode
+        self.seed = seed
+        self.retries = retries
+        self.busy_timeout_ms = busy_timeout_ms
+        self.prefix = prefix
+
+    def setup(self):
+        university, _ = University.objects.get_or_create(
+            short_code='CONT', defaults={'name': 'Contention Test University', 'domain': 'contention.test'}
+        )
+        self.university = university
+        self.category, _ = EventCategory.objects.get_or_create(name='Contention Test')
+        self.venue, _ = Venue.objects.get_or_create(
+            name=f'{self.prefix} hall', university=university, defaults={'capacity': 10000}
+        )
+        self.cleanup()
+        password = make_password(None)
+        users = User.objects.bulk_create([
+            User(username=f'{self.prefix}_{i}', email=f'{self.prefix}_{i}@contention.test', password=password)
+            for i in range(self.registrants + self.cancellers + 1)
+        ])
+        if any(user.pk is None for user in users):
+            users = list(User.objects.filter(username__startswith=f'{self.prefix}_').order_by('id'))
+        UserProfile.objects.bulk_create([
+            UserProfile(user=user, university=university, user_type='student', is_verified=True)
+            for user in users
+        ])
+        self.organizer, self.cancellers_ids, self.registrant_ids = (
+            users[0], [u.pk for u in users[1:self.cancellers + 1]], [u.pk for u in users[self.cancellers + 1:]]
+        )
+        UserProfile.objects.filter(user=self.organizer).update(user_type='organizer')
+
+    def cleanup(self):
+        users = User.objects.filter(username__startswith=f'{self.prefix}_')
+        Event.objects.filter(organizer__in=users).delete()
+        users.delete()
+
+    def _fresh_event(self):
+        event = Event.objects.create(
+            title=f'{self.prefix} event',
+            description='Registration contention run',
+            date_time=timezone.now() + timedelta(days=30),
+            venue=self.venue,
+            organizer=self.organizer,
+            host_university=self.university,
+            category=self.category,
+            participant_limit=self.limit,
+            visibility='public',
+            status='published',
+        )
+        # Cancellers start out holding seats so they have something to cancel
+        Registration.objects.bulk_create([
+            Registration(event=event, user_id=user_id, status='registered') for user_id in self.cancellers_ids
+        ])
+        return event
+
+    def _execute(self, tasks):
+        if self.mode == 'processes':
+            # Children must not share the parent's database connection
+            connections.close_all()
+            with multiprocessing.get_context('fork').Pool(self.concurrency) as pool:
+                return pool.map(run_task, tasks, chunksize=1)
+
+        with ThreadPoolExecutor(self.concurrency) as pool:
+            return list(pool.map(run_task, tasks))
+
+    def run(self, strategy, isolation):
+        _settings.update(
+            strategy=strategy, isolation=isolation, retries=self.retries, busy_timeout_ms=self.busy_timeout_ms
+        )
+        event = self._fresh_event()
+        tasks = [('register', event.pk, user_id) for user_id in self.registrant_ids]
+        tasks += [('cancel', event.pk, user_id) for user_id in self.cancellers_ids]
+        random.Random(self.seed).shuffle(tasks)
+
+        # Every worker connection opened from here on gets the session settings
+        connections.close_all()
+        connection_created.connect(configure_session)
+        try:
+            started = time.perf_counter()
+            results = self._execute(tasks)
+            elapsed = time.perf_counter() - started
+        finally:
+            connection_created.disconnect(configure_session)
+
+        outcomes = {}
+        for result in results:
+            key = f"{result['kind']}:{result['outcome']}"
+            outcomes[key] = outcomes.get(key, 0) + 1
+        registered = outcomes.get('register:registered', 0)
+        report = {
+            'strategy': strategy,
+            'isolation': isolation,
+            'mode': self.mode,
+            'concurrency': self.concurrency,
+            'elapsed_s': round(elapsed, 3),
+            'registrations_per_s': round(registered / elapsed, 2) if elapsed else None,
+            'outcomes': outcomes,
+            'retries': sum(result['retries'] for result in results),
+            'latency': summarize([result['ms'] for result in results]),
+            'lock_wait': summarize([result['lock_ms'] for result in results]),
+            'check': check_event(event.pk, self.limit),
+        }
+        event.delete()
+        return report
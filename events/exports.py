@@ -0,0 +1,104 @@
+import csv
+
+from .models import Registration, Attendance, Feedback
+
+# Rows pulled from the database per round-trip while streaming an export
+EXPORT_CHUNK_SIZE = 2000
+
+# Spreadsheet apps run cells starting with these as formulas (CSV injection)
+FORMULA_PREFIXES = ('=', '+', '-', '@', '\t', '\r')
+
+
+class Echo:
+    """
+    File-like object whose write() hands the line back, so csv.writer output can be streamed.
+    """
+
+    def write(self, value):
+        return value
+
+
+def _registration_rows(events):
+    return Registration.objects.filter(event__in=events).order_by('event_id', 'registered_at').values_list(
+        'event_id',
+        'event__title',
+        'user_id',
+        'user__username',
+        'user__first_name',
+        'user__last_name',
+        'user__email',
+        'user__profile__university__name',
+        'user__profile__student_id',
+        'user__profile__contact_number',
+        'status',
+        'registered_at',
+    )
+
+
+def _attendance_rows(events):
+    return Attendance.objects.filter(event__in=events).order_by('event_id', 'checked_in_at').values_list(
+        'event_id',
+        'event__title',
+        'user_id',
+        'user__username',
+        'user__first_name',
+        'user__last_name',
+        'user__email',
+        'user__profile__university__name',
+        'user__profile__student_id',
+        'checked_in_at',
+        'checked_in_by__username',
+        'is_verified',
+        'notes',
+    )
+
+
+def _feedback_rows(events):
+    return Feedback.objects.filter(event__in=events).order_by('event_id', 'created_at').values_list(
+        'event_id',
+        'event__title',
+        'user_id',
+        'user__username',
+        'user__email',
+        'rating',
+        'comment',
+        'created_at',
+    )
+
+
+EXPORTS = {
+    'registrations': (
+        ['event_id', 'event_title', 'user_id', 'username', 'first_name', 'last_name', 'email',
+         'university', 'student_id', 'contact_number', 'status', 'registered_at'],
+        _registration_rows,
+    ),
+    'attendance': (
+        ['event_id', 'event_title', 'user_id', 'username', 'first_name', 'last_name', 'email',
+         'university', 'student_id', 'checked_in_at', 'checked_in_by', 'is_verified', 'notes'],
+        _attendance_rows,
+    ),
+    'feedback': (
+        ['event_id', 'event_title', 'user_id', 'username', 'email', 'rating', 'comment', 'created_at'],
+        _feedback_rows,
+    ),
+}
+
+
+def _safe_cell(value):
+    """
+    Quote user-controlled text so a spreadsheet shows it instead of evaluating it.
+    """
+    if isinstance(value, str) and value.startswith(FORMULA_PREFIXES):
+        return "'" + value
+    return value
+
+
+def stream_csv(dataset, events, chunk_size=EXPORT_CHUNK_SIZE):
+    """
+    Yield CSV lines for one of the EXPORTS datasets, restricted to the given events queryset.
+    """
+    header, rows = EXPORTS[dataset]
+    writer = csv.writer(Echo())
+    yield writer.writerow(header)
+    for row in rows(events).iterator(chunk_size=chunk_size):
+        yield writer.writerow([_safe_cell(value) for value in row])
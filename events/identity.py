@@ -0,0 +1,89 @@
+from django.utils.functional import cached_property
+
+from .authentication import TokenClaimsUser
+from .models import UserProfile
+from .utils import get_user_profile
+
+
+class RequestIdentity:
+    """
+    Request-scoped cache of the authenticated user, their profile and university.
+    All three are loaded with one select_related query the first time any is needed,
+    and request.user is primed so later user.profile / profile.university reads are free.
+    Only use it after authentication has run (i.e. inside views and permissions).
+    """
+
+    def __init__(self, request):
+        self._request = request
+
+    @cached_property
+    def profile(self):
+        user = self._request.user
+        if not user.is_authenticated:
+            return None
+        profile = UserProfile.objects.select_related('user', 'university').filter(user_id=user.pk).first()
+        if profile is not None:
+            if type(user) is TokenClaimsUser:
+                user.prime(profile.user)
+                user = profile.user
+            # Cache the profile on the user as well, so user.profile needs no query
+            user.profile = profile
+        return profile
+
+    @property
+    def user(self):
+        # Loading the profile primes request.user with the joined User row
+        self.profile
+        return self._request.user
+
+    @property
+    def university(self):
+        profile = self.profile
+        return profile.university if profile else None
+
+    def get_profile(self, create_if_missing=False):
+        """
+        The memoized profile, optionally creating a missing one like get_user_profile.
+        """
+        if self.profile is None and create_if_missing and self._request.user.is_authenticated:
+            self.__dict__['profile'] = get_user_profile(self._request.user, create_if_missing=True)
+        return self.profile
+
+
+def get_identity(request):
+    """
+    The RequestIdentity of a Django or DRF request, set up by RequestIdentityMiddleware
+    or created here on first use when the middleware is not installed.
+    """
+    http_request = getattr(request, '_request', request)
+    identity = getattr(http_request, 'identity', None)
+    if identity is None:
+        identity = http_request.identity = RequestIdentity(http_request)
+    return identity
+
+
+def user_role(request):
+    """
+    (user_type, university_id) of the request user: straight from the token claims
+    when available, otherwise from the request's memoized profile.
+    """
+    user_type = getattr(request.user, 'user_type', None)
+    if user_type is not None:
+        return user_type, request.user.university_id
+    profile = get_identity(request).get_profile(create_if_missing=True)
+    if not profile:
+        return None, None
+    return profile.user_type, profile.university_id
+
+
+class RequestIdentityMiddleware:
+    """
+    Attaches a lazy RequestIdentity as request.identity; nothing is queried unless a view uses it.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        request.identity = RequestIdentity(request)
+        return self.get_response(request)
@@ -0,0 +1,254 @@
+import csv
+import io
+import logging
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import django
+from django.conf import settings
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.core.validators import validate_email
+from django.db import IntegrityError, transaction
+from django.db.models.functions import Lower
+from django.utils import timezone
+
+from .models import StudentImportJob, UserProfile
+
+logger = logging.getLogger(__name__)
+
+# Students validated, hashed and inserted together
+IMPORT_BATCH_SIZE = 1000
+
+IMPORT_COLUMNS = ['username', 'email', 'password', 'first_name', 'last_name', 'student_id', 'department', 'contact_number']
+REQUIRED_COLUMNS = ['username', 'email']
+
+# Errors kept in the returned summary; the total is always reported
+MAX_REPORTED_ERRORS = 200
+
+_FIELDS = {field.name: field for model in (User, UserProfile) for field in model._meta.fields}
+MAX_LENGTHS = {column: _FIELDS[column].max_length for column in IMPORT_COLUMNS if column != 'password'}
+
+
+def _init_hash_worker():
+    # Spawned (non-forked) workers start without configured apps
+    django.setup()
+
+
+def hash_workers():
+    return getattr(settings, 'STUDENT_IMPORT_HASH_WORKERS', min(4, os.cpu_count() or 1))
+
+
+def check_columns(fieldnames):
+    missing = [column for column in REQUIRED_COLUMNS if column not in (fieldnames or [])]
+    if missing:
+        raise ValueError(f"CSV is missing required columns: {', '.join(missing)}")
+
+
+class StudentImport:
+    """
+    Streams CSV rows into User + UserProfile in set-based batches:
+    one validation query per batch for existing usernames/emails, password hashing
+    spread over a process pool, and one bulk_create per table. bulk_create skips the
+    ensure_user_profile signal, so profiles are created here directly.
+    """
+
+    def __init__(self, university, batch_size=IMPORT_BATCH_SIZE, workers=None, dry_run=False):
+        self.university = university
+        self.batch_size = batch_size
+        self.workers = hash_workers() if workers is None else workers
+        self.dry_run = dry_run
+        self.created = 0
+        self.error_count = 0
+        self.errors = []
+        self._seen_usernames = set()
+        self._seen_emails = set()
+        self._pool = None
+
+    def _error(self, line, message):
+        self.error_count += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append({'line': line, 'error': message})
+
+    def run(self, lines):
+        """
+        Import an iterable of CSV text lines (header first). Returns the summary dict.
+        """
+        reader = csv.DictReader(lines)
+        check_columns(reader.fieldnames)
+
+        if self.workers > 1 and not self.dry_run:
+            self._pool = ProcessPoolExecutor(max_workers=self.workers, initializer=_init_hash_worker)
+        try:
+            batch = []
+            for row in reader:
+                batch.append((reader.line_num, row))
+                if len(batch) >= self.batch_size:
+                    self._import_batch(batch)
+                    batch = []
+            if batch:
+                self._import_batch(batch)
+        finally:
+            if self._pool is not None:
+                self._pool.shutdown()
+        return self.summary()
+
+    def summary(self):
+        return {
+            'created': self.created,
+            'error_count': self.error_count,
+            'errors': self.errors,
+            'dry_run': self.dry_run,
+        }
+
+    def _clean(self, batch):
+        """
+        Per-row checks plus duplicates within the file; returns the rows worth a DB check.
+        """
+        valid = []
+        for line, row in batch:
+            row = {column: (row.get(column) or '').strip() for column in IMPORT_COLUMNS}
+            if not row['username'] or not row['email']:
+                self._error(line, 'username and email are required')
+                continue
+            too_long = [column for column, limit in MAX_LENGTHS.items() if len(row[column]) > limit]
+            if too_long:
+                self._error(line, f"Too long: {', '.join(too_long)}")
+                continue
+            try:
+                validate_email(row['email'])
+            except DjangoValidationError:
+                self._error(line, f"Invalid email: {row['email']}")
+                continue
+            username, email = row['username'].lower(), row['email'].lower()
+            if username in self._seen_usernames:
+                self._error(line, f"Duplicate username in file: {row['username']}")
+                continue
+            if email in self._seen_emails:
+                self._error(line, f"Duplicate email in file: {row['email']}")
+                continue
+            self._seen_usernames.add(username)
+            self._seen_emails.add(email)
+            valid.append((line, row))
+        return valid
+
+    def _existing(self, rows):
+        usernames = [row['username'].lower() for _, row in rows]
+        emails = [row['email'].lower() for _, row in rows]
+        taken_usernames = set(
+            User.objects.annotate(username_lower=Lower('username'))
+            .filter(username_lower__in=usernames).values_list('username_lower', flat=True)
+        )
+        taken_emails = set(
+            User.objects.annotate(email_lower=Lower('email'))
+            .filter(email_lower__in=emails).values_list('email_lower', flat=True)
+        )
+        return taken_usernames, taken_emails
+
+    def _hash(self, passwords):
+        # Rows without a password get an unusable one; the student sets it via password reset
+        to_hash = [password for password in passwords if password]
+        if self._pool is not None and to_hash:
+            chunksize = max(len(to_hash) // (self.workers * 4), 1)
+            hashed = iter(self._pool.map(make_password, to_hash, chunksize=chunksize))
+        else:
+            hashed = iter([make_password(password) for password in to_hash])
+        return [next(hashed) if password else make_password(None) for password in passwords]
+
+    def _import_batch(self, batch):
+        rows = self._clean(batch)
+        if not rows:
+            return
+        taken_usernames, taken_emails = self._existing(rows)
+        new_rows = []
+        for line, row in rows:
+            if row['username'].lower() in taken_usernames:
+                self._error(line, f"Username already exists: {row['username']}")
+            elif row['email'].lower() in taken_emails:
+                self._error(line, f"Email already exists: {row['email']}")
+            else:
+                new_rows.append((line, row))
+        if self.dry_run:
+            self.created += len(new_rows)
+            return
+        if not new_rows:
+            return
+
+        passwords = self._hash([row['password'] for _, row in new_rows])
+        users = [
+            User(
+                username=row['username'],
+                email=row['email'],
+                password=password,
+                first_name=row['first_name'],
+                last_name=row['last_name'],
+            )
+            for (_, row), password in zip(new_rows, passwords)
+        ]
+        try:
+            with transaction.atomic():
+                User.objects.bulk_create(users)
+                if any(user.pk is None for user in users):
+                    # Backends that can't return ids from a bulk insert
+                    ids = dict(User.objects.filter(
+                        username__in=[user.username for user in users]
+                    ).values_list('username', 'id'))
+                    for user in users:
+                        user.pk = ids[user.username]
+                UserProfile.objects.bulk_create([
+                    UserProfile(
+                        user=user,
+                        university=self.university,
+                        user_type='student',
+                        student_id=row['student_id'],
+                        department=row['department'],
+                        contact_number=row['contact_number'],
+                    )
+                    for user, (_, row) in zip(users, new_rows)
+                ])
+        except IntegrityError as e:
+            # Someone registered one of these names since the batch was validated
+            for line, _ in new_rows:
+                self._error(line, f'Batch rejected, retry the import: {e}')
+            return
+        self.created += len(users)
+
+
+def run_import_job(job):
+    """
+    Import a StudentImportJob's CSV and record the summary (or the error) on the row.
+    The CSV, which may hold plain-text passwords, is cleared either way.
+    """
+    try:
+        summary = StudentImport(job.university).run(io.StringIO(job.csv_content, newline=''))
+    except Exception as e:
+        logger.exception("Student import %s failed", job.pk)
+        job.status, job.error = 'failed', str(e)
+    else:
+        job.status = 'completed'
+        job.created_count = summary['created']
+        job.error_count = summary['error_count']
+        job.errors = summary['errors']
+    job.finished_at = timezone.now()
+    job.csv_content = ''
+    job.save()
+    return job
+
+
+def run_pending_imports():
+    """
+    Process uploaded student imports, oldest first; called by the send_queued_emails
+    worker so hashing never runs inside a web request. Returns the jobs processed.
+    """
+    job_ids = list(
+        StudentImportJob.objects.filter(status='pending').order_by('created_at', 'pk').values_list('pk', flat=True)
+    )
+    processed = []
+    for job_id in job_ids:
+        # Conditional update so two workers never import the same file
+        if not StudentImportJob.objects.filter(pk=job_id, status='pending').update(status='running'):
+            continue
+        job = StudentImportJob.objects.select_related('university').get(pk=job_id)
+        processed.append(run_import_job(job))
+    return processed
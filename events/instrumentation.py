@@ -0,0 +1,154 @@
+import json
+import logging
+import threading
+import time
+
+from django.conf import settings
+from django.db import connection
+
+from .metrics import Histogram, LATENCY_BUCKETS_MS, QUERY_COUNT_BUCKETS, metrics
+
+logger = logging.getLogger(__name__)
+
+
+class RouteTimings:
+    """
+    In-process per-route histograms of request time, DB time and query count.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._routes = {}
+
+    def record(self, route, total_ms, db_ms, queries):
+        with self._lock:
+            histograms = self._routes.get(route)
+            if histograms is None:
+                histograms = self._routes[route] = {
+                    'total_ms': Histogram(LATENCY_BUCKETS_MS),
+                    'db_ms': Histogram(LATENCY_BUCKETS_MS),
+                    'queries': Histogram(QUERY_COUNT_BUCKETS),
+                }
+            histograms['total_ms'].observe(total_ms)
+            histograms['db_ms'].observe(db_ms)
+            histograms['queries'].observe(queries)
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                route: {name: histogram.as_dict() for name, histogram in histograms.items()}
+                for route, histograms in self._routes.items()
+            }
+
+    def reset(self):
+        with self._lock:
+            self._routes.clear()
+
+
+route_timings = RouteTimings()
+
+
+class RequestTiming:
+    """
+    Per-request measurements; also the execute wrapper adding up query count and DB time.
+    """
+
+    def __init__(self):
+        self.queries = 0
+        self.db_ms = 0.0
+        self.render_ms = 0.0
+        self._render_started = None
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.db_ms += (time.perf_counter() - started) * 1000
+            self.queries += 1
+
+    def render_started(self):
+        self._render_started = time.perf_counter()
+
+    def render_finished(self, response):
+        if self._render_started is not None:
+            self.render_ms = (time.perf_counter() - self._render_started) * 1000
+        return response
+
+
+def view_name(request):
+    match = getattr(request, 'resolver_match', None)
+    return match.view_name if match else 'unmatched'
+
+
+def route_name(request):
+    return f'{request.method} {view_name(request)}'
+
+
+class RequestTimingMiddleware:
+    """
+    Measures each request: total time, DB time and query count (connection.execute_wrapper)
+    and response rendering (serialization to JSON). Adds a Server-Timing header for staff
+    (or everyone, with SERVER_TIMING_HEADER), records per-route histograms in route_timings
+    and events.metrics, and logs one JSON line per request: at INFO, or WARNING when slower
+    than REQUEST_TIMING_SLOW_MS.
+    Streaming responses are measured up to the point the response starts.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        timing = request.timing = RequestTiming()
+        started = time.perf_counter()
+        with connection.execute_wrapper(timing):
+            response = self.get_response(request)
+        total_ms = (time.perf_counter() - started) * 1000
+        app_ms = max(total_ms - timing.db_ms - timing.render_ms, 0)
+
+        route = route_name(request)
+        route_timings.record(route, total_ms, timing.db_ms, timing.queries)
+        self._record_metrics(request, response, total_ms, timing)
+        if getattr(settings, 'SERVER_TIMING_HEADER', False) or self._is_staff(request):
+            response['Server-Timing'] = (
+                f'db;dur={timing.db_ms:.1f};desc="{timing.queries} queries", '
+                f'render;dur={timing.render_ms:.1f}, app;dur={app_ms:.1f}, total;dur={total_ms:.1f}'
+            )
+
+        slow = total_ms >= getattr(settings, 'REQUEST_TIMING_SLOW_MS', 1000)
+        level = logging.WARNING if slow else logging.INFO
+        if logger.isEnabledFor(level):
+            logger.log(level, json.dumps({
+                'event': 'request',
+                'route': route,
+                'path': request.path,
+                'status': response.status_code,
+                'total_ms': round(total_ms, 1),
+                'db_ms': round(timing.db_ms, 1),
+                'queries': timing.queries,
+                'render_ms': round(timing.render_ms, 1),
+                'app_ms': round(app_ms, 1),
+            }))
+        return response
+
+    @staticmethod
+    def _is_staff(request):
+        # DRF copies the user it authenticated (e.g. from a JWT) onto the Django request
+        user = getattr(request, 'user', None)
+        return bool(user and user.is_staff)
+
+    def _record_metrics(self, request, response, total_ms, timing):
+        labels = {'method': request.method, 'route': view_name(request)}
+        metrics.inc('http_requests_total', status=f'{response.status_code // 100}xx', **labels)
+        metrics.observe('http_request_duration_seconds', total_ms / 1000, **labels)
+        metrics.observe('http_request_db_duration_seconds', timing.db_ms / 1000, **labels)
+        metrics.observe('http_request_db_queries', timing.queries, **labels)
+        metrics.maybe_flush()
+
+    def process_template_response(self, request, response):
+        # DRF Responses are rendered right after this hook, the callback runs once rendering is done
+        timing = getattr(request, 'timing', None)
+        if timing is not None:
+            timing.render_started()
+            response.add_post_render_callback(timing.render_finished)
+        return response
@@ -0,0 +1,192 @@
+import logging
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.db.models import Min, Q
+from django.utils import timezone
+
+from .models import QueuedEmail, EmailDeliveryBatch
+
+logger = logging.getLogger(__name__)
+
+
+def _from_email():
+    return getattr(settings, 'DEFAULT_FROM_EMAIL', 'noreply@evex.com')
+
+
+def _max_attempts():
+    return getattr(settings, 'EMAIL_MAX_ATTEMPTS', 3)
+
+
+def _send_batch(messages, is_digest=False):
+    """
+    Send (queued_rows, EmailMessage) pairs over one connection and record the batch.
+    Each message is sent individually on the open connection so one bad address
+    doesn't fail the rest of the batch. When the connection can't be opened every
+    message counts as a failed attempt and the batch records the error.
+    """
+    started = time.monotonic()
+    sent = failed = 0
+    error = ''
+    now = timezone.now()
+    connection = get_connection()
+    try:
+        connection.open()
+    except Exception as e:
+        logger.warning("Could not connect to the mail server: %s", e)
+        error = str(e)
+        for rows, _ in messages:
+            for row in rows:
+                row.last_error = error
+                row.attempts += 1
+                row.claimed_at = None
+        failed = len(messages)
+    else:
+        try:
+            for rows, message in messages:
+                try:
+                    connection.send_messages([message])
+                    for row in rows:
+                        row.sent_at = now
+                    sent += 1
+                except Exception as e:
+                    logger.warning("Failed to send email to %s: %s", message.to, e)
+                    for row in rows:
+                        row.last_error = str(e)
+                    failed += 1
+                for row in rows:
+                    row.attempts += 1
+                    row.claimed_at = None
+        finally:
+            connection.close()
+
+    QueuedEmail.objects.bulk_update(
+        [row for rows, _ in messages for row in rows],
+        ['sent_at', 'attempts', 'last_error', 'claimed_at']
+    )
+    batch = EmailDeliveryBatch.objects.create(
+        duration_ms=int((time.monotonic() - started) * 1000),
+        attempted=len(messages),
+        sent=sent,
+        failed=failed,
+        is_digest=is_digest,
+        error=error,
+    )
+    logger.info(
+        "Email batch %s: %s sent, %s failed in %sms",
+        batch.pk, sent, failed, batch.duration_ms
+    )
+    return batch
+
+
+def _skip_without_address(rows):
+    """
+    Mark rows for users without an email address as done; return the deliverable ones.
+    """
+    deliverable, skipped = [], []
+    for row in rows:
+        (deliverable if row.user.email else skipped).append(row)
+    if skipped:
+        QueuedEmail.objects.filter(id__in=[row.id for row in skipped]).update(
+            sent_at=timezone.now(), last_error='No email address'
+        )
+    return deliverable
+
+
+def unclaimed():
+    """
+    Q for queued emails no mailer batch holds: never claimed, or claimed by a worker
+    that stopped before marking them sent.
+    """
+    stale_before = timezone.now() - timedelta(seconds=getattr(settings, 'EMAIL_CLAIM_STALE_SECONDS', 600))
+    return Q(claimed_at__isnull=True) | Q(claimed_at__lt=stale_before)
+
+
+def pending_emails():
+    return QueuedEmail.objects.filter(
+        unclaimed(),
+        sent_at__isnull=True,
+        attempts__lt=_max_attempts()
+    )
+
+
+def _claim(ids):
+    """
+    Claim the still-unclaimed rows among ids and return them, loaded after the claim so
+    they carry any content coalescing wrote before it. Rows claimed by another batch in
+    the meantime are left out.
+    """
+    now = timezone.now()
+    QueuedEmail.objects.filter(unclaimed(), id__in=ids, sent_at__isnull=True).update(claimed_at=now)
+    return QueuedEmail.objects.filter(id__in=ids, claimed_at=now).select_related('user')
+
+
+def deliver_queued_emails(batch_size=None):
+    """
+    Send every pending non-digest email, batch_size messages per SMTP connection.
+    Stops after a batch that couldn't connect. Returns the EmailDeliveryBatch records created.
+    """
+    batch_size = batch_size or getattr(settings, 'EMAIL_BATCH_SIZE', 200)
+    batches = []
+    last_id = 0
+    while True:
+        ids = list(
+            pending_emails().filter(digest=False, id__gt=last_id)
+            .order_by('id').values_list('id', flat=True)[:batch_size]
+        )
+        if not ids:
+            return batches
+        last_id = ids[-1]
+        rows = _skip_without_address(_claim(ids).order_by('id'))
+        if rows:
+            batches.append(_send_batch([
+                ([row], EmailMessage(row.subject, row.body, _from_email(), [row.user.email]))
+                for row in rows
+            ]))
+            if batches[-1].error:
+                return batches
+
+
+def deliver_digests(batch_size=None, older_than=timedelta(days=1)):
+    """
+    Send one digest per user whose oldest held email has waited at least older_than.
+    Stops after a batch that couldn't connect.
+    """
+    batch_size = batch_size or getattr(settings, 'EMAIL_BATCH_SIZE', 200)
+    due_users = list(
+        pending_emails().filter(digest=True).values('user_id')
+        .annotate(oldest=Min('created_at'))
+        .filter(oldest__lte=timezone.now() - older_than)
+        .values_list('user_id', flat=True)
+    )
+
+    batches = []
+    for start in range(0, len(due_users), batch_size):
+        ids = list(
+            pending_emails().filter(digest=True, user_id__in=due_users[start:start + batch_size])
+            .values_list('id', flat=True)
+        )
+        rows = _skip_without_address(_claim(ids).order_by('user_id', 'created_at'))
+        by_user = {}
+        for row in rows:
+            by_user.setdefault(row.user_id, []).append(row)
+        if by_user:
+            batches.append(_send_batch(
+                [(user_rows, _digest_message(user_rows)) for user_rows in by_user.values()],
+                is_digest=True
+            ))
+            if batches[-1].error:
+                break
+    return batches
+
+
+def _digest_message(rows):
+    sections = [f"{row.subject}\n{row.body}" for row in rows]
+    return EmailMessage(
+        f"Your Evex daily digest ({len(rows)} updates)",
+        "\n\n".join(sections),
+        _from_email(),
+        [rows[0].user.email],
+    )
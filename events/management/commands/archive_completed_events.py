@@ -0,0 +1,46 @@
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from events.archive import archivable_events, archive_events
+
+
+class Command(BaseCommand):
+    help = 'Moves the registrations, waitlist, activity and notifications of long-completed events to archive tables'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, default=getattr(settings, 'EVENT_ARCHIVE_AFTER_DAYS', 180),
+                            help='Archive events that took place more than this many days ago')
+        parser.add_argument('--batch-size', type=int, default=50, help='Events archived per transaction')
+        parser.add_argument('--sleep', type=float, default=0, help='Seconds to pause between batches')
+        parser.add_argument('--dry-run', action='store_true', help='Only report how many events would be archived')
+
+    def handle(self, *args, **options):
+        events = archivable_events(timezone.now() - timedelta(days=options['days'])).order_by('id')
+
+        if options['dry_run']:
+            self.stdout.write(self.style.SUCCESS(f'Would archive {events.count()} events'))
+            return
+
+        totals = {}
+        archived_events = 0
+        last_id = 0
+        while True:
+            event_ids = list(events.filter(id__gt=last_id).values_list('id', flat=True)[:options['batch_size']])
+            if not event_ids:
+                break
+            last_id = event_ids[-1]
+            for table, count in archive_events(event_ids).items():
+                totals[table] = totals.get(table, 0) + count
+            archived_events += len(event_ids)
+            self.stdout.write(f'  Archived {archived_events} events...', ending='\r')
+            if options['sleep']:
+                time.sleep(options['sleep'])
+
+        self.stdout.write('')
+        for table, count in totals.items():
+            self.stdout.write(f'  {table}: {count}')
+        self.stdout.write(self.style.SUCCESS(f'Archived history of {archived_events} events'))
@@ -0,0 +1,283 @@
+import json
+import logging
+import random
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.db.models import Count, F
+from django.test import Client
+from django.test.utils import override_settings
+from django.utils import timezone
+
+from events.benchmarking import QueryStats, summarize
+from events.models import Event, Registration, WaitlistEntry
+from events.synthetic import SyntheticDataGenerator
+from events.views import UsernameOrEmailTokenObtainPairSerializer
+
+BENCHMARK_PREFIX = 'bench'
+
+
+class Command(BaseCommand):
+    help = ('Benchmarks the hot API endpoints against a deterministic dataset and reports '
+            'latency percentiles, throughput, SQL queries and rows fetched per endpoint')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=5000, help='Users in the seeded dataset')
+        parser.add_argument('--events', type=int, default=300, help='Events in the seeded dataset')
+        parser.add_argument('--registrations', type=int, default=50000, help='Registration demand in the dataset')
+        parser.add_argument('--seed', type=int, default=42, help='Seed for the dataset and request choices')
+        parser.add_argument('--reseed', action='store_true', help='Regenerate the dataset even if it exists')
+        parser.add_argument('--iterations', type=int, default=100, help='Timed requests per endpoint')
+        parser.add_argument('--warmup', type=int, default=5, help='Untimed requests per endpoint first')
+        parser.add_argument('--cold-cache', action='store_true', help='Clear the cache before every request')
+        parser.add_argument('--only', nargs='+', metavar='ENDPOINT', help='Benchmark just these endpoints')
+        parser.add_argument('--base-url', help='Drive a running server (e.g. http://127.0.0.1:8000) '
+                                               'instead of the in-process test client; no query counts then')
+        parser.add_argument('--concurrency', type=int, default=1, help='Parallel clients with --base-url')
+        parser.add_argument('--output', help='Also write the JSON report to this file')
+        parser.add_argument('--compare', help='Previous JSON report to print deltas against')
+        parser.add_argument('--json', action='store_true', help='Print the JSON report')
+
+    def handle(self, *args, **options):
+        if options['concurrency'] > 1 and not options['base_url']:
+            raise CommandError('--concurrency needs --base-url; the test client runs requests one at a time')
+        self.rng = random.Random(options['seed'])
+        dataset = self._seed(options)
+        actors = self._actors()
+        endpoints = self._endpoints(actors)
+        if options['only']:
+            unknown = set(options['only']) - set(endpoints)
+            if unknown:
+                raise CommandError(f"Unknown endpoints: {', '.join(sorted(unknown))}")
+            endpoints = {name: spec for name, spec in endpoints.items() if name in options['only']}
+
+        results = {}
+        # The test client sends Host: testserver, which the test runner normally allows
+        request_logger = logging.getLogger('django.request')
+        log_level = request_logger.level
+        # Expected 4xx responses (e.g. re-registering) would otherwise be logged per request
+        request_logger.setLevel(logging.ERROR)
+        try:
+            with override_settings(ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, 'testserver']):
+                for name, (method, paths, token) in endpoints.items():
+                    if not options['json']:
+                        self.stdout.write(f'  {name}...', ending='\r')
+                    results[name] = self._run(method, paths, token, options)
+        finally:
+            request_logger.setLevel(log_level)
+        if not options['json']:
+            self.stdout.write('')
+
+        report = {
+            'meta': {
+                'seed': options['seed'],
+                'dataset': dataset,
+                'vendor': connection.vendor,
+                'transport': options['base_url'] or 'test-client',
+                'iterations': options['iterations'],
+                'cold_cache': options['cold_cache'],
+                'concurrency': options['concurrency'],
+            },
+            'endpoints': results,
+        }
+        if options['output']:
+            with open(options['output'], 'w') as f:
+                json.dump(report, f, indent=2)
+        if options['json']:
+            self.stdout.write(json.dumps(report, indent=2))
+            return
+        self._print(report, options['compare'])
+
+    def _seed(self, options):
+        generator = SyntheticDataGenerator(
+            prefix=BENCHMARK_PREFIX, seed=options['seed'], batch_size=5000,
+            log=lambda message: None if options['json'] else self.stdout.write(f'  {message}'),
+        )
+        if options['reseed'] or not generator.has_existing_data():
+            generator.clear()
+            generator.generate(
+                users=options['users'], organizers=max(options['events'] // 25, 1), events=options['events'],
+                registrations=options['registrations'], universities=10,
+            )
+        # Report what is actually there; a reused dataset may have been seeded with other sizes
+        events = Event.objects.filter(organizer__username__startswith=f'{BENCHMARK_PREFIX}_')
+        return {
+            'users': User.objects.filter(username__startswith=f'{BENCHMARK_PREFIX}_').count(),
+            'events': events.count(),
+            'registrations': Registration.objects.filter(event__in=events).count(),
+        }
+
+    def _actors(self):
+        """
+        Deterministic users and events for the requests: the busiest organizer, the most
+        active student, and students paired with open upcoming events they can register for.
+        """
+        users = User.objects.filter(username__startswith=f'{BENCHMARK_PREFIX}_')
+        organizer = users.filter(profile__user_type='organizer').annotate(
+            event_count=Count('event')
+        ).order_by('-event_count', 'id').first()
+        student = users.filter(profile__user_type='student').annotate(
+            registration_count=Count('registration')
+        ).order_by('-registration_count', 'id').first()
+        if organizer is None or student is None:
+            raise CommandError('The benchmark dataset has no organizer or student; run with --reseed')
+
+        open_events = list(
+            Event.objects.with_registration_counts().filter(
+                organizer__username__startswith=f'{BENCHMARK_PREFIX}_',
+                status='published', date_time__gt=timezone.now(),
+            ).exclude(visibility='university').filter(
+                annotated_active_count__lt=F('participant_limit')
+            ).order_by('id').values_list('id', flat=True)
+        )
+        registrants = list(users.filter(profile__user_type='student').order_by('id')[:200])
+        if not open_events or not registrants:
+            raise CommandError('No open events or students in the benchmark dataset; run with --reseed')
+        # Pairs the student isn't already booked or waitlisted for; cancelled ones are re-registered
+        taken = set(Registration.objects.filter(
+            user__in=registrants, event_id__in=open_events
+        ).exclude(status='cancelled').values_list('user_id', 'event_id'))
+        taken |= set(WaitlistEntry.objects.filter(
+            user__in=registrants, event_id__in=open_events
+        ).values_list('user_id', 'event_id'))
+        pairs = []
+        for user in registrants:
+            candidates = [event_id for event_id in open_events if (user.id, event_id) not in taken]
+            if candidates:
+                pairs.append((user, self.rng.choice(candidates)))
+        return {
+            'organizer': organizer,
+            'student': student,
+            'pairs': pairs,
+            'events': list(Event.objects.filter(
+                organizer__username__startswith=f'{BENCHMARK_PREFIX}_', status='published'
+            ).order_by('id').values_list('id', flat=True)),
+        }
+
+    def _token(self, user):
+        return str(UsernameOrEmailTokenObtainPairSerializer.get_token(user).access_token)
+
+    def _endpoints(self, actors):
+        """
+        name -> (method, [(path, token)...] cycled through, default token).
+        Register and cancel walk the same (student, event) pairs so the data stays stable.
+        """
+        organizer_token = self._token(actors['organizer'])
+        student_token = self._token(actors['student'])
+        event_ids = actors['events']
+        words = ['Tech', 'event', 'Summit', 'Workshop', 'bench']
+        pairs = [(event_id, self._token(user)) for user, event_id in actors['pairs']]
+        return {
+            'events_list': ('GET', [('/api/events/', None)], None),
+            'events_search': ('GET', [(f'/api/events/?search={word}', None) for word in words], None),
+            'event_detail': ('GET', [(f'/api/events/{event_id}/', None) for event_id in event_ids[:50]], None),
+            'register': ('POST', [(f'/api/events/{event_id}/register/', token) for event_id, token in pairs], None),
+            'cancel_registration': (
+                'POST', [(f'/api/events/{event_id}/cancel_registration/', token) for event_id, token in pairs], None
+            ),
+            'organizer_dashboard': ('GET', [('/api/organizer/dashboard/', None)], organizer_token),
+            'organizer_analytics': ('GET', [('/api/organizer/analytics/', None)], organizer_token),
+            'organizer_events': ('GET', [('/api/organizer/events/', None)], organizer_token),
+            'organizer_registrations': ('GET', [('/api/organizer/registrations/', None)], organizer_token),
+            'student_overview': ('GET', [('/api/student/overview/', None)], student_token),
+            'student_registrations': ('GET', [('/api/registrations/', None)], student_token),
+            'notifications': ('GET', [('/api/notifications/', None)], student_token),
+        }
+
+    def _run(self, method, paths, token, options):
+        requests = [
+            (method, path, path_token or token)
+            for i in range(options['warmup'] + options['iterations'])
+            for path, path_token in [paths[i % len(paths)]]
+        ]
+        warmup, timed = requests[:options['warmup']], requests[options['warmup']:]
+        send = self._remote if options['base_url'] else self._local
+        for request in warmup:
+            send(request, options)
+
+        started = time.perf_counter()
+        if options['concurrency'] > 1:
+            with ThreadPoolExecutor(options['concurrency']) as pool:
+                samples = list(pool.map(lambda request: send(request, options), timed))
+        else:
+            samples = [send(request, options) for request in timed]
+        elapsed = time.perf_counter() - started
+
+        result = summarize([sample['ms'] for sample in samples])
+        result['throughput_rps'] = round(len(samples) / elapsed, 2) if elapsed else None
+        statuses = {}
+        for sample in samples:
+            statuses[str(sample['status'])] = statuses.get(str(sample['status']), 0) + 1
+        result['status_codes'] = statuses
+        if not options['base_url']:
+            queries = [sample['queries'] for sample in samples]
+            rows = [sample['rows'] for sample in samples]
+            result.update(
+                queries_mean=round(sum(queries) / len(queries), 2),
+                queries_max=max(queries),
+                rows_mean=round(sum(rows) / len(rows), 2),
+                rows_max=max(rows),
+                db_ms_mean=round(sum(sample['db_ms'] for sample in samples) / len(samples), 3),
+            )
+        return result
+
+    def _local(self, request, options):
+        method, path, token = request
+        client = Client()
+        headers = {'HTTP_AUTHORIZATION': f'Bearer {token}'} if token else {}
+        if options['cold_cache']:
+            cache.clear()
+        stats = QueryStats()
+        with connection.execute_wrapper(stats):
+            started = time.perf_counter()
+            response = client.generic(method, path, **headers)
+            ms = (time.perf_counter() - started) * 1000
+        return {'ms': ms, 'status': response.status_code, 'queries': stats.queries,
+                'rows': stats.rows, 'db_ms': stats.db_ms}
+
+    def _remote(self, request, options):
+        method, path, token = request
+        http_request = urllib.request.Request(options['base_url'].rstrip('/') + path, method=method)
+        if token:
+            http_request.add_header('Authorization', f'Bearer {token}')
+        started = time.perf_counter()
+        try:
+            with urllib.request.urlopen(http_request) as response:
+                response.read()
+                status = response.status
+        except urllib.error.HTTPError as e:
+            status = e.code
+        return {'ms': (time.perf_counter() - started) * 1000, 'status': status}
+
+    def _print(self, report, compare_path):
+        baseline = {}
+        if compare_path:
+            with open(compare_path) as f:
+                baseline = json.load(f).get('endpoints', {})
+        meta = report['meta']
+        self.stdout.write(
+            f"{meta['dataset']['users']} users / {meta['dataset']['events']} events on {meta['vendor']} "
+            f"via {meta['transport']}, {meta['iterations']} requests per endpoint"
+        )
+        for name, stats in report['endpoints'].items():
+            line = (
+                f"  {name:<24} p50={stats['p50_ms']:>8}ms p95={stats['p95_ms']:>8}ms "
+                f"p99={stats['p99_ms']:>8}ms {stats['throughput_rps']:>8} req/s"
+            )
+            if 'queries_mean' in stats:
+                line += f" queries={stats['queries_mean']:>6} rows={stats['rows_mean']:>8}"
+            previous = baseline.get(name)
+            if previous:
+                line += f" (p95 {stats['p95_ms'] - previous['p95_ms']:+.1f}ms"
+                if 'queries_mean' in stats and 'queries_mean' in previous:
+                    line += f", queries {stats['queries_mean'] - previous['queries_mean']:+.1f}"
+                line += ')'
+            self.stdout.write(line)
+        self.stdout.write(self.style.SUCCESS('Benchmark finished'))
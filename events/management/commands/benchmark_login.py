@@ -0,0 +1,106 @@
+import json
+import random
+import uuid
+
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+
+from events.benchmarking import summarize, time_calls
+from events.models import UserProfile
+from events.utils import find_login_user, users_by_lower
+from events.views import UsernameOrEmailTokenObtainPairSerializer
+
+BENCHMARK_PASSWORD = 'benchmark-password'
+
+
+def legacy_login_lookup(identifier):
+    """
+    The previous two-step iexact lookup, kept here as the baseline.
+    """
+    user = User.objects.filter(email__iexact=identifier).first()
+    if user is None:
+        user = User.objects.filter(username__iexact=identifier).first()
+    return user
+
+
+class Command(BaseCommand):
+    help = 'Benchmarks login identifier lookups (and optionally full token issuance) against a large user table'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=100000, help='Synthetic users to create for the run')
+        parser.add_argument('--iterations', type=int, default=500, help='Lookups timed per strategy')
+        parser.add_argument('--batch-size', type=int, default=5000, help='Users inserted per bulk_create')
+        parser.add_argument('--full-login', type=int, default=0, metavar='N',
+                            help='Also time N complete token requests (includes password hashing)')
+        parser.add_argument('--seed', type=int, default=42, help='Random seed for choosing identifiers')
+        parser.add_argument('--json', action='store_true', help='Print the results as JSON')
+
+    def handle(self, *args, **options):
+        rng = random.Random(options['seed'])
+        prefix = f'bench{uuid.uuid4().hex[:6]}'
+
+        # Everything runs in one transaction that is rolled back, so no benchmark users are left behind
+        with transaction.atomic():
+            self._create_users(prefix, options['users'], options['batch_size'])
+            if connection.vendor == 'postgresql':
+                with connection.cursor() as cursor:
+                    cursor.execute('ANALYZE auth_user')
+
+            identifiers = []
+            for _ in range(options['iterations']):
+                i = rng.randrange(options['users'])
+                identifiers.append(rng.choice([
+                    f'{prefix}_{i}@example.com'.upper(),  # email, different case
+                    f'{prefix.upper()}_{i}',              # username, different case
+                    f'{prefix}_missing_{i}',              # unknown identifier
+                ]))
+
+            results = {
+                'users': options['users'],
+                'vendor': connection.vendor,
+                'legacy_iexact': summarize(time_calls(legacy_login_lookup, [(x,) for x in identifiers])),
+                'combined_lower': summarize(time_calls(find_login_user, [(x,) for x in identifiers])),
+                'plan': users_by_lower(username=identifiers[0], email=identifiers[0]).explain(),
+            }
+            if options['full_login']:
+                logins = [(f'{prefix}_{rng.randrange(options["users"])}@example.com',)
+                          for _ in range(options['full_login'])]
+                results['token_obtain'] = summarize(time_calls(self._login, logins))
+
+            transaction.set_rollback(True)
+
+        if options['json']:
+            self.stdout.write(json.dumps(results, indent=2))
+            return
+        self.stdout.write(f"{results['users']} users on {results['vendor']}")
+        for name in ('legacy_iexact', 'combined_lower', 'token_obtain'):
+            if name in results:
+                stats = results[name]
+                self.stdout.write(
+                    f"  {name:<15} p50={stats['p50_ms']}ms p95={stats['p95_ms']}ms "
+                    f"p99={stats['p99_ms']}ms mean={stats['mean_ms']}ms"
+                )
+        self.stdout.write('Query plan for the combined lookup:')
+        self.stdout.write(results['plan'])
+        self.stdout.write(self.style.SUCCESS('Benchmark finished; synthetic users rolled back'))
+
+    def _create_users(self, prefix, count, batch_size):
+        # Hash once; hashing per user would dominate the setup time
+        password = make_password(BENCHMARK_PASSWORD)
+        for start in range(0, count, batch_size):
+            users = User.objects.bulk_create([
+                User(username=f'{prefix}_{i}', email=f'{prefix}_{i}@example.com', password=password)
+                for i in range(start, min(start + batch_size, count))
+            ], batch_size=batch_size)
+            # bulk_create skips the post_save signal that normally creates profiles
+            UserProfile.objects.bulk_create([UserProfile(user=user) for user in users], batch_size=batch_size)
+            self.stdout.write(f'  Created {min(start + batch_size, count)} users...', ending='\r')
+        self.stdout.write('')
+
+    def _login(self, identifier):
+        serializer = UsernameOrEmailTokenObtainPairSerializer(
+            data={'username': identifier, 'password': BENCHMARK_PASSWORD}
+        )
+        serializer.is_valid(raise_exception=True)
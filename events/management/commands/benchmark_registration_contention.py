@@ -0,0 +1,93 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from events.contention import ContentionHarness, ISOLATION_LEVELS, SQLITE_TRANSACTION_MODES, STRATEGIES
+
+
+class Command(BaseCommand):
+    help = ('Runs concurrent registrants and cancellers against one event per registration strategy / '
+            'isolation level and reports throughput, lock waits, overbooking and waitlist consistency')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--strategies', nargs='+', choices=sorted(STRATEGIES), default=['no_lock', 'row_lock', 'view'],
+                            help='Registration strategies to compare')
+        parser.add_argument('--isolation', nargs='+', choices=sorted({*ISOLATION_LEVELS, *SQLITE_TRANSACTION_MODES}),
+                            help='Isolation levels to compare on PostgreSQL (default read_committed), '
+                                 'or transaction modes on SQLite (default deferred and immediate)')
+        parser.add_argument('--mode', choices=['threads', 'processes'], default='threads',
+                            help='Run workers as threads or forked processes')
+        parser.add_argument('--registrants', type=int, default=300, help='Users trying to register')
+        parser.add_argument('--cancellers', type=int, default=50, help='Seated users cancelling during the run')
+        parser.add_argument('--limit', type=int, default=100, help='Participant limit of the contended event')
+        parser.add_argument('--concurrency', type=int, default=32, help='Parallel workers')
+        parser.add_argument('--retries', type=int, default=5, help='Retries of serialization failures / busy errors')
+        parser.add_argument('--busy-timeout', type=int, default=5000, help='SQLite busy timeout in milliseconds')
+        parser.add_argument('--wal', action='store_true', help='Switch the SQLite database to WAL journal mode first')
+        parser.add_argument('--seed', type=int, default=42, help='Seed for the order of attempts')
+        parser.add_argument('--keep-users', action='store_true', help='Leave the generated users in place')
+        parser.add_argument('--json', action='store_true', help='Print the results as JSON')
+
+    def handle(self, *args, **options):
+        vendor = connection.vendor
+        if vendor == 'sqlite':
+            allowed, default = SQLITE_TRANSACTION_MODES, ['deferred', 'immediate']
+        else:
+            allowed, default = ISOLATION_LEVELS, ['read_committed']
+        isolation_levels = options['isolation'] or default
+        unsupported = set(isolation_levels) - set(allowed)
+        if unsupported:
+            raise CommandError(f"Not available on {vendor}: {', '.join(sorted(unsupported))}")
+        if vendor == 'sqlite':
+            if connection.is_in_memory_db():
+                raise CommandError('An in-memory SQLite database cannot be shared between workers')
+            if options['wal']:
+                with connection.cursor() as cursor:
+                    cursor.execute('PRAGMA journal_mode=WAL')
+        elif vendor != 'postgresql':
+            self.stdout.write(self.style.WARNING(f'Untested backend {vendor}; isolation levels are not applied'))
+
+        try:
+            harness = ContentionHarness(
+                registrants=options['registrants'], cancellers=options['cancellers'], limit=options['limit'],
+                concurrency=options['concurrency'], mode=options['mode'], seed=options['seed'],
+                retries=options['retries'], busy_timeout_ms=options['busy_timeout'],
+            )
+        except ValueError as e:
+            raise CommandError(str(e))
+
+        harness.setup()
+        reports = []
+        try:
+            for strategy in options['strategies']:
+                for isolation in isolation_levels:
+                    if not options['json']:
+                        self.stdout.write(f'  {strategy} / {isolation}...', ending='\r')
+                    reports.append(harness.run(strategy, isolation))
+        finally:
+            if not options['keep_users']:
+                harness.cleanup()
+
+        if options['json']:
+            self.stdout.write(json.dumps({'vendor': vendor, 'runs': reports}, indent=2))
+            return
+        self.stdout.write(
+            f"{options['registrants']} registrants + {options['cancellers']} cancellers, limit {options['limit']}, "
+            f"{options['concurrency']} {options['mode']} on {vendor}"
+        )
+        for report in reports:
+            check = report['check']
+            self.stdout.write(
+                f"  {report['strategy']:<9} {report['isolation']:<16} "
+                f"{report['registrations_per_s']:>8} reg/s  p95={report['latency']['p95_ms']}ms  "
+                f"lock p95={report['lock_wait']['p95_ms']}ms  retries={report['retries']}  "
+                f"seated={check['active']}/{check['limit']} waitlist={check['waitlist']}"
+            )
+            self.stdout.write(f"    outcomes: {report['outcomes']}")
+            for issue in check['issues']:
+                self.stdout.write(self.style.ERROR(f'    {issue}'))
+        if any(report['check']['issues'] for report in reports):
+            self.stdout.write(self.style.WARNING('Some strategies broke the registration invariants'))
+        else:
+            self.stdout.write(self.style.SUCCESS('All strategies kept the registration invariants'))
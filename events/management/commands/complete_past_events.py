@@ -0,0 +1,63 @@
+import time
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+
+from events.caching import invalidate_organizer_dashboard, invalidate_student_overview
+from events.models import Event, Registration
+
+
+class Command(BaseCommand):
+    help = 'Moves published events that have ended to completed, in bounded batches'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500, help='Events transitioned per transaction')
+        parser.add_argument('--grace-hours', type=float, default=2,
+                            help='Hours after the start time an event is considered over')
+        parser.add_argument('--sleep', type=float, default=0, help='Seconds to pause between batches')
+
+    def handle(self, *args, **options):
+        cutoff = timezone.now() - timedelta(hours=options['grace_hours'])
+        past_events = Event.objects.filter(status='published', date_time__lt=cutoff).order_by('date_time', 'id')
+
+        events_done = registrations_done = 0
+        while True:
+            event_ids = list(past_events.values_list('id', flat=True)[:options['batch_size']])
+            if not event_ids:
+                break
+            registrations_done += self._complete_batch(event_ids)
+            events_done += len(event_ids)
+            self.stdout.write(f'  Completed {events_done} events...', ending='\r')
+            if options['sleep']:
+                time.sleep(options['sleep'])
+
+        self.stdout.write('')
+        self.stdout.write(self.style.SUCCESS(
+            f'Completed {events_done} events; {registrations_done} registrations marked no-show'
+        ))
+
+    def _complete_batch(self, event_ids):
+        """
+        Finalise one batch of events with set-based UPDATEs. Bulk updates skip the
+        model signals, so the affected dashboard caches are invalidated here.
+        """
+        with transaction.atomic():
+            outstanding = Registration.objects.filter(event_id__in=event_ids, status='registered')
+            user_ids = set(outstanding.values_list('user_id', flat=True))
+            organizer_ids = set(
+                Event.objects.filter(id__in=event_ids).values_list('organizer_id', flat=True)
+            )
+
+            # Anyone still registered after the event ended never checked in
+            registrations = outstanding.update(status='no_show')
+            Event.objects.filter(id__in=event_ids, status='published').update(
+                status='completed', updated_at=timezone.now()
+            )
+
+            for organizer_id in organizer_ids:
+                invalidate_organizer_dashboard(organizer_id)
+            for user_id in user_ids:
+                invalidate_student_overview(user_id)
+        return registrations
@@ -0,0 +1,86 @@
+import json
+from datetime import date, datetime, timezone as dt_timezone
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from events.synthetic import SyntheticDataGenerator, SYNTHETIC_PASSWORD
+
+
+class Command(BaseCommand):
+    help = 'Generates a reproducible, production-sized dataset (users, events, skewed registrations) for benchmarks'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=1_000_000, help='Users to create (organizers included)')
+        parser.add_argument('--organizers', type=int, default=None,
+                            help='How many of the users are organizers (default: 1 per 25 events)')
+        parser.add_argument('--events', type=int, default=50_000, help='Events to create')
+        parser.add_argument('--registrations', type=int, default=10_000_000,
+                            help='Registration demand to spread over events; seats and caps make the result a bit lower')
+        parser.add_argument('--universities', type=int, default=50, help='Universities to spread users over')
+        parser.add_argument('--seed', type=int, default=42,
+                            help='Same seed, sizes and --base-date give the same dataset')
+        parser.add_argument('--base-date', type=date.fromisoformat, default=None,
+                            help='YYYY-MM-DD that event dates are spread around (default: today, UTC)')
+        parser.add_argument('--batch-size', type=int, default=10000, help='Rows per bulk insert')
+        parser.add_argument('--workers', type=int, default=1,
+                            help='Processes inserting users and registrations (PostgreSQL only; uses fork)')
+        parser.add_argument('--skew', type=float, default=1.0,
+                            help='Zipf exponent of event popularity; higher concentrates demand on fewer events')
+        parser.add_argument('--hot-share', type=float, default=0.01,
+                            help='Fraction of most in-demand events oversubscribed so they build waitlists')
+        parser.add_argument('--max-event-size', type=int, default=20000, help='Cap on one event\'s demand')
+        parser.add_argument('--max-waitlist', type=int, default=2000, help='Cap on one event\'s waitlist')
+        parser.add_argument('--prefix', default='synth', help='Username/title prefix marking generated rows')
+        parser.add_argument('--clear', action='store_true', help='Delete previously generated rows with this prefix first')
+        parser.add_argument('--json', action='store_true', help='Print the summary as JSON')
+
+    def handle(self, *args, **options):
+        workers = options['workers']
+        if workers > 1 and connection.vendor == 'sqlite':
+            # SQLite allows one writer at a time; parallel inserts would only contend for the lock
+            self.stdout.write(self.style.WARNING('SQLite detected, inserting with a single process'))
+            workers = 1
+        if options['users'] < 2 or options['events'] < 1:
+            raise CommandError('Need at least 2 users and 1 event')
+        organizers = options['organizers'] or max(options['events'] // 25, 1)
+        organizers = min(organizers, options['users'] - 1)
+
+        log = (lambda message: None) if options['json'] else (lambda message: self.stdout.write(f'  {message}'))
+        base_date = options['base_date']
+        generator = SyntheticDataGenerator(
+            prefix=options['prefix'],
+            seed=options['seed'],
+            base_time=datetime.combine(base_date, datetime.min.time(), dt_timezone.utc) if base_date else None,
+            batch_size=options['batch_size'],
+            workers=workers,
+            log=log,
+        )
+        if generator.has_existing_data():
+            if not options['clear']:
+                raise CommandError(f"Data with prefix '{options['prefix']}' exists; pass --clear to regenerate it")
+            log('Clearing previous synthetic data...')
+            generator.clear()
+
+        summary = generator.generate(
+            users=options['users'],
+            organizers=organizers,
+            events=options['events'],
+            registrations=options['registrations'],
+            universities=options['universities'],
+            exponent=options['skew'],
+            hot_share=options['hot_share'],
+            max_event_size=options['max_event_size'],
+            max_waitlist=options['max_waitlist'],
+        )
+        summary.update(seed=options['seed'], base_date=generator.base_time.date().isoformat(), organizers=organizers)
+
+        if options['json']:
+            self.stdout.write(json.dumps(summary, indent=2))
+            return
+        self.stdout.write(self.style.SUCCESS(
+            f"Generated {summary['users']} users ({organizers} organizers), {summary['events']} events, "
+            f"{summary['registrations']} registrations and {summary['waitlist_entries']} waitlist entries "
+            f"({summary['hot_events']} hot events)"
+        ))
+        self.stdout.write(f"All users log in with password '{SYNTHETIC_PASSWORD}'")
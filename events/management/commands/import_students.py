@@ -0,0 +1,44 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from events.imports import IMPORT_BATCH_SIZE, StudentImport
+from events.models import University
+
+
+class Command(BaseCommand):
+    help = 'Bulk-creates student accounts and profiles from a CSV file'
+
+    def add_arguments(self, parser):
+        parser.add_argument('csv_path', help='CSV with username,email[,password,first_name,last_name,student_id,department,contact_number]')
+        parser.add_argument('--university', required=True, help='University id or short code the students belong to')
+        parser.add_argument('--batch-size', type=int, default=IMPORT_BATCH_SIZE, help='Rows validated and inserted together')
+        parser.add_argument('--workers', type=int, default=None, help='Password hashing processes (1 hashes inline)')
+        parser.add_argument('--dry-run', action='store_true', help='Validate only; nothing is hashed or written')
+
+    def handle(self, *args, **options):
+        lookup = options['university']
+        university = (
+            University.objects.filter(id=int(lookup)).first() if lookup.isdigit() else None
+        ) or University.objects.filter(short_code__iexact=lookup).first()
+        if not university:
+            raise CommandError(f'University not found: {lookup}')
+
+        importer = StudentImport(
+            university,
+            batch_size=options['batch_size'],
+            workers=options['workers'],
+            dry_run=options['dry_run'],
+        )
+        try:
+            with open(options['csv_path'], newline='', encoding='utf-8-sig') as csv_file:
+                summary = importer.run(csv_file)
+        except (OSError, ValueError) as e:
+            raise CommandError(str(e))
+
+        for error in summary['errors']:
+            self.stdout.write(self.style.WARNING(f"  line {error['line']}: {error['error']}"))
+        if summary['error_count'] > len(summary['errors']):
+            self.stdout.write(f"  ... and {summary['error_count'] - len(summary['errors'])} more errors")
+        verb = 'Would create' if options['dry_run'] else 'Created'
+        self.stdout.write(self.style.SUCCESS(
+            f"{verb} {summary['created']} students for {university.name}; {summary['error_count']} rows rejected"
+        ))
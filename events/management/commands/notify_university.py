@@ -0,0 +1,42 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from events.models import University, NotificationFanout
+from events.notifications import run_fanout
+
+
+class Command(BaseCommand):
+    help = 'Sends a university-wide alert to every matching profile in batched chunks'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--university', type=int, required=True, help='University ID to alert')
+        parser.add_argument('--title', required=True)
+        parser.add_argument('--message', required=True)
+        parser.add_argument('--user-type', default='student', help='Profile user_type to target (default: student)')
+        parser.add_argument('--chunk-size', type=int, default=None, help='Recipients per batch')
+        parser.add_argument('--no-email', action='store_true', help='Only create in-app notifications')
+
+    def handle(self, *args, **options):
+        try:
+            university = University.objects.get(id=options['university'])
+        except University.DoesNotExist:
+            raise CommandError(f"University {options['university']} does not exist")
+
+        fanout = NotificationFanout.objects.create(
+            university=university,
+            user_type=options['user_type'],
+            title=options['title'],
+            message=options['message'],
+            send_email=not options['no_email'],
+            # Run here rather than by the worker, which leaves running fan-outs alone while they progress
+            status='running',
+            heartbeat_at=timezone.now(),
+        )
+        self.stdout.write(f'Alerting {options["user_type"]}s of {university.name}...')
+
+        def progress(current):
+            self.stdout.write(f'  Notified {current.notified_count}/{current.total_recipients}...', ending='\r')
+
+        fanout = run_fanout(fanout, chunk_size=options['chunk_size'], progress=progress)
+        self.stdout.write('')
+        self.stdout.write(self.style.SUCCESS(f'Notified {fanout.notified_count} users'))
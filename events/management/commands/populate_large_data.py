@@ -14,23 +14,7 @@ from events.models import (
     UserProfile,
     Registration,
 )
-
-# Pakistani first names
-PAKISTANI_FIRST_NAMES = [
-    'Ahmed', 'Ali', 'Hassan', 'Hussain', 'Muhammad', 'Usman', 'Bilal', 'Zain', 'Hamza', 'Omar',
-    'Fatima', 'Ayesha', 'Zainab', 'Maryam', 'Sana', 'Hira', 'Amina', 'Sara', 'Aisha', 'Khadija',
-    'Abdullah', 'Ibrahim', 'Yusuf', 'Haris', 'Rayyan', 'Ayan', 'Arham', 'Zayan', 'Ayaan',
-    'Aiza', 'Haniya', 'Mariam', 'Zara', 'Alisha', 'Hafsa', 'Iqra', 'Laiba', 'Maham', 'Noor',
-    'Fahad', 'Saad', 'Taha', 'Waleed', 'Zeeshan', 'Adnan', 'Asad', 'Faisal', 'Kamran', 'Nadeem',
-    'Areeba', 'Dua', 'Hiba', 'Jannat', 'Kainat', 'Mahira', 'Nida', 'Rida', 'Saba', 'Tayyaba',
-]
-
-# Pakistani last names
-PAKISTANI_LAST_NAMES = [
-    'Khan', 'Ahmed', 'Ali', 'Hassan', 'Hussain', 'Malik', 'Sheikh', 'Butt', 'Raza', 'Abbas',
-    'Iqbal', 'Rashid', 'Qureshi', 'Shah', 'Baig', 'Mirza', 'Hashmi', 'Rizvi', 'Zaidi', 'Naqvi',
-    'Javed', 'Akhtar', 'Siddiqui', 'Ansari', 'Farooq', 'Khalid', 'Tariq', 'Yousuf', 'Zaman', 'Rauf',
-]
+from events.sample_names import PAKISTANI_FIRST_NAMES, PAKISTANI_LAST_NAMES, DEPARTMENTS
 
 # Event titles and descriptions
 EVENT_TITLES = [
@@ -64,13 +48,6 @@ EVENT_DESCRIPTIONS = [
     'Join industry leaders for an inspiring and educational experience.',
 ]
 
-DEPARTMENTS = [
-    'Computer Science', 'Software Engineering', 'Electrical Engineering', 'Mechanical Engineering',
-    'Business Administration', 'Economics', 'Psychology', 'Mathematics', 'Physics', 'Chemistry',
-    'Biology', 'Medicine', 'Law', 'Journalism', 'Fine Arts', 'Architecture', 'Civil Engineering',
-    'Management Sciences', 'Finance', 'Marketing', 'Accounting', 'International Relations',
-]
-
 VENUE_NAMES = [
     'Main Auditorium', 'Conference Hall', 'Seminar Room', 'Lecture Theater', 'Exhibition Hall',
     'Innovation Lab', 'Student Center', 'Sports Complex', 'Cultural Center', 'Library Hall',
@@ -0,0 +1,64 @@
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from events.archive import archive_notifications
+from events.models import Notification
+
+
+class Command(BaseCommand):
+    help = 'Deletes read notifications older than their per-type retention period, in small batches'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000, help='Rows deleted per statement')
+        parser.add_argument('--sleep', type=float, default=0, help='Seconds to pause between batches')
+        parser.add_argument('--dry-run', action='store_true', help='Only report how many rows would be removed')
+        parser.add_argument('--archive', action='store_true',
+                            help='Copy expired rows to the archive table instead of discarding them')
+
+    def handle(self, *args, **options):
+        retention = getattr(settings, 'NOTIFICATION_RETENTION_DAYS', {'default': 90})
+        now = timezone.now()
+        total = 0
+
+        for notification_type, _ in Notification.NOTIFICATION_TYPES:
+            days = retention.get(notification_type, retention.get('default'))
+            if days is None:
+                continue
+            expired = Notification.objects.filter(
+                notification_type=notification_type,
+                is_read=True,
+                created_at__lt=now - timedelta(days=days)
+            )
+
+            if options['dry_run']:
+                reclaimed = expired.count()
+            else:
+                reclaimed = self._delete_in_batches(
+                    expired, options['batch_size'], options['sleep'], options['archive']
+                )
+
+            total += reclaimed
+            self.stdout.write(f'  {notification_type} (> {days} days): {reclaimed}')
+
+        verb = 'Would remove' if options['dry_run'] else 'Removed'
+        self.stdout.write(self.style.SUCCESS(f'{verb} {total} notifications'))
+
+    def _delete_in_batches(self, queryset, batch_size, pause, archive=False):
+        """
+        Delete by primary-key batches so each statement holds its locks only briefly.
+        """
+        deleted = 0
+        while True:
+            ids = list(queryset.order_by('created_at').values_list('id', flat=True)[:batch_size])
+            if not ids:
+                return deleted
+            if archive:
+                deleted += archive_notifications(ids)
+            else:
+                deleted += Notification.objects.filter(id__in=ids).delete()[0]
+            if pause:
+                time.sleep(pause)
@@ -0,0 +1,26 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from events.notifications import send_event_reminders
+
+
+class Command(BaseCommand):
+    help = 'Sends reminder notifications for published events starting within the next N hours'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--hours', type=int, default=24, help='Remind about events starting within this many hours')
+        parser.add_argument('--batch-size', type=int, default=500, help='Events fetched per query')
+        parser.add_argument('--loop', action='store_true', help='Run continuously instead of a single pass (cron)')
+        parser.add_argument('--interval', type=float, default=300, help='Seconds between passes with --loop')
+
+    def handle(self, *args, **options):
+        while True:
+            events, notified = send_event_reminders(options['hours'], batch_size=options['batch_size'])
+            if events or not options['loop']:
+                self.stdout.write(self.style.SUCCESS(
+                    f"Sent {options['hours']}h reminders for {events} events ({notified} notifications)"
+                ))
+            if not options['loop']:
+                return
+            time.sleep(options['interval'])
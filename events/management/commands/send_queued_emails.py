@@ -0,0 +1,78 @@
+import logging
+import time
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from events.imports import run_pending_imports
+from events.mailer import deliver_queued_emails, deliver_digests
+from events.notifications import run_pending_fanouts
+
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    help = ('Runs uploaded student imports and pending university-wide notification fan-outs, then delivers '
+            'queued emails in batches over a reused SMTP connection, plus due daily digests')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=None, help='Messages per SMTP connection')
+        parser.add_argument('--digest-age-hours', type=float, default=24,
+                            help='Send a digest once its oldest held email is this old')
+        parser.add_argument('--loop', action='store_true', help='Keep polling the outbox')
+        parser.add_argument('--interval', type=float, default=30, help='Seconds between polls with --loop')
+        parser.add_argument('--max-backoff', type=float, default=600,
+                            help='Longest wait with --loop while passes keep failing (the interval doubles per failure)')
+
+    def handle(self, *args, **options):
+        failures = 0
+        while True:
+            try:
+                healthy = self._run_once(options)
+            except Exception as e:
+                # One bad pass (database restart, bug in a job) must not stop the worker
+                if not options['loop']:
+                    raise
+                logger.exception("send_queued_emails pass failed")
+                self.stdout.write(self.style.ERROR(f'  pass failed: {e}'))
+                healthy = False
+            if not options['loop']:
+                return
+            failures = 0 if healthy else failures + 1
+            time.sleep(min(options['interval'] * 2 ** failures, options['max_backoff']))
+
+    def _run_once(self, options):
+        """
+        One pass over imports, fan-outs, emails and digests. Returns False when the mail
+        server couldn't be reached, so the loop backs off.
+        """
+        close_old_connections()
+        for job in run_pending_imports():
+            if job.status == 'failed':
+                self.stdout.write(self.style.ERROR(f'  student import {job.pk} failed: {job.error}'))
+            else:
+                self.stdout.write(f'  student import {job.pk}: {job.created_count} created, {job.error_count} rejected')
+        for fanout in run_pending_fanouts():
+            if fanout.status == 'failed':
+                self.stdout.write(self.style.ERROR(f'  fan-out {fanout.pk} failed: {fanout.error}'))
+            else:
+                self.stdout.write(f'  fan-out {fanout.pk}: {fanout.notified_count}/{fanout.total_recipients} notified')
+        batches = deliver_queued_emails(batch_size=options['batch_size'])
+        batches += deliver_digests(
+            batch_size=options['batch_size'],
+            older_than=timedelta(hours=options['digest_age_hours'])
+        )
+        for batch in batches:
+            kind = 'digest batch' if batch.is_digest else 'batch'
+            if batch.error:
+                self.stdout.write(self.style.ERROR(f'  {kind}: could not connect, {batch.failed} deferred: {batch.error}'))
+                continue
+            self.stdout.write(
+                f'  {kind}: {batch.sent} sent, {batch.failed} failed in {batch.duration_ms}ms'
+            )
+        if batches or not options['loop']:
+            sent = sum(batch.sent for batch in batches)
+            failed = sum(batch.failed for batch in batches)
+            self.stdout.write(self.style.SUCCESS(f'Sent {sent} emails ({failed} failed)'))
+        return not any(batch.error for batch in batches)
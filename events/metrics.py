@@ -0,0 +1,266 @@
+"""
+Prometheus text-format metrics, aggregated across worker processes.
+
+Each process keeps its counters and histograms in memory and, when METRICS_MULTIPROC_DIR
+is set, writes them to its own <pid>-<start>.json file in that directory at most every
+METRICS_FLUSH_SECONDS (and at exit). A scrape, whichever worker serves it, sums every
+file, so totals cover all gunicorn workers, including ones that have since exited.
+Empty the directory when the server starts (gunicorn.conf.py does this), not in between.
+"""
+import atexit
+import json
+import os
+import threading
+import time
+from bisect import bisect_left
+
+from django.conf import settings
+from django.db.models import Count, Min
+from django.utils import timezone
+
+# Histogram bucket upper bounds (inclusive), Prometheus style; the last bucket is +Inf
+LATENCY_BUCKETS_MS = (5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100, 200)
+
+
+class Histogram:
+    """
+    Fixed-bucket histogram with count, sum and max.
+    """
+
+    def __init__(self, bounds):
+        self.bounds = bounds
+        self.buckets = [0] * (len(bounds) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    def observe(self, value):
+        self.buckets[bisect_left(self.bounds, value)] += 1
+        self.count += 1
+        self.sum += value
+        self.max = max(self.max, value)
+
+    def quantile(self, q):
+        """
+        Upper bound of the bucket holding the q-quantile (the max for the +Inf bucket).
+        """
+        if not self.count:
+            return None
+        rank = q * self.count
+        seen = 0
+        for bound, count in zip(self.bounds, self.buckets):
+            seen += count
+            if seen >= rank:
+                return bound
+        return self.max
+
+    def as_dict(self):
+        return {
+            'count': self.count,
+            'sum': round(self.sum, 3),
+            'max': round(self.max, 3),
+            'p50': self.quantile(0.5),
+            'p95': self.quantile(0.95),
+            'p99': self.quantile(0.99),
+            'buckets': dict(zip([*map(str, self.bounds), '+Inf'], self.buckets)),
+        }
+
+
+LATENCY_BUCKETS_S = tuple(ms / 1000 for ms in LATENCY_BUCKETS_MS)
+
+# name -> (type, help, histogram bucket bounds)
+METRICS = {
+    'http_requests_total': ('counter', 'Requests handled, by route and status class', None),
+    'http_request_duration_seconds': ('histogram', 'Request latency by route', LATENCY_BUCKETS_S),
+    'http_request_db_duration_seconds': ('histogram', 'Time spent in database queries per request', LATENCY_BUCKETS_S),
+    'http_request_db_queries': ('histogram', 'Database queries per request', QUERY_COUNT_BUCKETS),
+    'registration_outcomes_total': ('counter', 'Event registration attempts by outcome', None),
+    'waitlist_promotions_total': ('counter', 'Users moved from a waitlist into a freed seat', None),
+    'cache_requests_total': ('counter', 'Cache lookups by cache and result (hit or miss)', None),
+}
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+
+def _labels_key(labels):
+    return tuple(sorted((key, str(value)) for key, value in labels.items()))
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._counters = {}
+        self._histograms = {}
+        self._pid = None
+        self._path = None
+        self._last_flush = 0.0
+
+    def _check_process(self):
+        # A forked worker starts from zero rather than re-reporting what the parent counted
+        if self._pid != os.getpid():
+            self._pid = os.getpid()
+            self._path = None
+            self._counters.clear()
+            self._histograms.clear()
+
+    def inc(self, name, amount=1, **labels):
+        key = (name, _labels_key(labels))
+        with self._lock:
+            self._check_process()
+            self._counters[key] = self._counters.get(key, 0) + amount
+
+    def observe(self, name, value, **labels):
+        key = (name, _labels_key(labels))
+        with self._lock:
+            self._check_process()
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = Histogram(METRICS[name][2])
+            histogram.observe(value)
+
+    def snapshot(self):
+        with self._lock:
+            self._check_process()
+            return {
+                'counters': [[name, list(labels), value] for (name, labels), value in self._counters.items()],
+                'histograms': [
+                    [name, list(labels), histogram.buckets, histogram.sum, histogram.count]
+                    for (name, labels), histogram in self._histograms.items()
+                ],
+            }
+
+    def flush(self):
+        """
+        Write this process's snapshot to its file in METRICS_MULTIPROC_DIR (atomically).
+        """
+        directory = getattr(settings, 'METRICS_MULTIPROC_DIR', '')
+        if not directory:
+            return
+        snapshot = self.snapshot()
+        with self._flush_lock:
+            if self._path is None:
+                self._path = os.path.join(directory, f'{os.getpid()}-{int(time.time() * 1000)}.json')
+            tmp_path = f'{self._path}.tmp'
+            with open(tmp_path, 'w') as f:
+                json.dump(snapshot, f)
+            os.replace(tmp_path, self._path)
+            self._last_flush = time.monotonic()
+
+    def flush_at_exit(self):
+        if self._counters or self._histograms:
+            self.flush()
+
+    def maybe_flush(self):
+        if time.monotonic() - self._last_flush >= getattr(settings, 'METRICS_FLUSH_SECONDS', 5):
+            self.flush()
+
+    def collect(self):
+        """
+        Counters and histograms summed over every process's file, or this process alone
+        when no multiprocess directory is configured.
+        """
+        directory = getattr(settings, 'METRICS_MULTIPROC_DIR', '')
+        if not directory:
+            return merge([self.snapshot()])
+        self.flush()
+        snapshots = []
+        for filename in os.listdir(directory):
+            if not filename.endswith('.json'):
+                continue
+            try:
+                with open(os.path.join(directory, filename)) as f:
+                    snapshots.append(json.load(f))
+            except (OSError, ValueError):
+                # Removed or being replaced while we listed the directory
+                continue
+        return merge(snapshots)
+
+
+def merge(snapshots):
+    counters, histograms = {}, {}
+    for snapshot in snapshots:
+        for name, labels, value in snapshot['counters']:
+            key = (name, tuple(map(tuple, labels)))
+            counters[key] = counters.get(key, 0) + value
+        for name, labels, buckets, total, count in snapshot['histograms']:
+            key = (name, tuple(map(tuple, labels)))
+            merged = histograms.setdefault(key, [[0] * len(buckets), 0.0, 0])
+            merged[0] = [a + b for a, b in zip(merged[0], buckets)]
+            merged[1] += total
+            merged[2] += count
+    return counters, histograms
+
+
+metrics = MetricsRegistry()
+atexit.register(metrics.flush_at_exit)
+
+
+def database_gauges():
+    """
+    Point-in-time values read from the database on each scrape: (name, help, [(labels, value)]).
+    """
+    from .models import QueuedEmail, NotificationFanout
+
+    pending = QueuedEmail.objects.filter(sent_at__isnull=True)
+    depth = {digest: 0 for digest in (False, True)}
+    depth.update(pending.values_list('digest').annotate(total=Count('pk')).order_by())
+    oldest = pending.filter(digest=False).aggregate(oldest=Min('created_at'))['oldest']
+    fanouts = dict(
+        NotificationFanout.objects.filter(status__in=['pending', 'running'])
+        .values_list('status').annotate(total=Count('pk')).order_by()
+    )
+    return [
+        ('notification_outbox_depth', 'Queued emails not yet sent (digest ones wait for the daily run)',
+         [({'digest': str(digest).lower()}, total) for digest, total in depth.items()]),
+        ('notification_outbox_oldest_age_seconds', 'Age of the oldest unsent non-digest email',
+         [({}, (timezone.now() - oldest).total_seconds() if oldest else 0)]),
+        ('notification_fanouts_active', 'University-wide notification fanouts not yet finished',
+         [({'status': status}, fanouts.get(status, 0)) for status in ('pending', 'running')]),
+    ]
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format_labels(labels):
+    if not labels:
+        return ''
+    return '{' + ','.join(f'{key}="{_escape(value)}"' for key, value in labels) + '}'
+
+
+def _format_value(value):
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return repr(value) if isinstance(value, float) else str(value)
+
+
+def render_metrics():
+    """
+    All metrics in the Prometheus text exposition format.
+    """
+    counters, histograms = metrics.collect()
+    lines = []
+    for name, (kind, help_text, bounds) in METRICS.items():
+        lines += [f'# HELP {name} {help_text}', f'# TYPE {name} {kind}']
+        if kind == 'counter':
+            for (metric, labels), value in sorted(counters.items()):
+                if metric == name:
+                    lines.append(f'{name}{_format_labels(labels)} {_format_value(value)}')
+            continue
+        for (metric, labels), (buckets, total, count) in sorted(histograms.items()):
+            if metric != name:
+                continue
+            cumulative = 0
+            for bound, bucket in zip([*map(_format_value, bounds), '+Inf'], buckets):
+                cumulative += bucket
+                lines.append(f'{name}_bucket{_format_labels(labels + (("le", bound),))} {cumulative}')
+            lines.append(f'{name}_sum{_format_labels(labels)} {_format_value(total)}')
+            lines.append(f'{name}_count{_format_labels(labels)} {count}')
+    for name, help_text, samples in database_gauges():
+        lines += [f'# HELP {name} {help_text}', f'# TYPE {name} gauge']
+        for labels, value in samples:
+            lines.append(f'{name}{_format_labels(_labels_key(labels))} {_format_value(value)}')
+    return '\n'.join(lines) + '\n'
@@ -0,0 +1,19 @@
+# Generated by Django 5.2.8 on 2026-10-18 23:28
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('events', '0012_unreadnotificationcounter_and_more'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='notification',
+            index=models.Index(fields=['notification_type', 'is_read', 'created_at'], name='events_noti_notific_8cfef3_idx'),
+        ),
+    ]
@@ -0,0 +1,44 @@
+# Generated by Django 5.2.8 on 2026-10-18 23:29
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('events', '0013_notification_events_noti_notific_8cfef3_idx'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EmailDeliveryBatch',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('started_at', models.DateTimeField(auto_now_add=True)),
+                ('duration_ms', models.PositiveIntegerField(default=0)),
+                ('attempted', models.PositiveIntegerField(default=0)),
+                ('sent', models.PositiveIntegerField(default=0)),
+                ('failed', models.PositiveIntegerField(default=0)),
+                ('is_digest', models.BooleanField(default=False)),
+            ],
+            options={
+                'verbose_name_plural': 'Email delivery batches',
+            },
+        ),
+        migrations.AddField(
+            model_name='queuedemail',
+            name='digest',
+            field=models.BooleanField(default=False, help_text="Held for the user's daily digest"),
+        ),
+        migrations.AddField(
+            model_name='userprofile',
+            name='email_digest',
+            field=models.BooleanField(default=False, help_text='Bundle low-priority emails into one daily digest'),
+        ),
+        migrations.AddIndex(
+            model_name='queuedemail',
+            index=models.Index(fields=['digest', 'sent_at', 'user'], name='events_queu_digest_4980d7_idx'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.8 on 2026-10-18 23:31
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('events', '0015_eventreminder_event_events_even_status_8b865d_idx_and_more'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='registration',
+            name='status',
+            field=models.CharField(choices=[('registered', 'Registered'), ('cancelled', 'Cancelled'), ('attended', 'Attended'), ('waitlisted', 'Waitlisted'), ('no_show', 'No Show')], default='registered', max_length=20),
+        ),
+    ]
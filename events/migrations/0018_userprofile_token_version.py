@@ -0,0 +1,18 @@
+# Generated by Django 5.2.8 on 2026-10-18 23:35
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('events', '0017_archived_history'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='userprofile',
+            name='token_version',
+            field=models.PositiveIntegerField(default=0, help_text='Bumped to revoke every token issued to the user'),
+        ),
+    ]
@@ -0,0 +1,25 @@
+from django.db import migrations
+
+# Login and registration look users up by LOWER(email) / LOWER(username) (see
+# events.utils.find_login_user). auth_user belongs to django.contrib.auth, so the
+# matching expression indexes are created here with plain SQL, which both
+# PostgreSQL and SQLite accept.
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auth', '0012_alter_user_first_name_max_length'),
+        ('events', '0018_userprofile_token_version'),
+    ]
+
+    operations = [
+        migrations.RunSQL(
+            'CREATE INDEX IF NOT EXISTS events_auth_user_lower_email_idx ON auth_user (LOWER(email));',
+            reverse_sql='DROP INDEX IF EXISTS events_auth_user_lower_email_idx;',
+        ),
+        migrations.RunSQL(
+            'CREATE INDEX IF NOT EXISTS events_auth_user_lower_username_idx ON auth_user (LOWER(username));',
+            reverse_sql='DROP INDEX IF EXISTS events_auth_user_lower_username_idx;',
+        ),
+    ]
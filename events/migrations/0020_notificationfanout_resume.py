@@ -0,0 +1,23 @@
+# Generated by Django 5.2.8 on 2026-10-19 00:24
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('events', '0019_auth_user_lower_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='notificationfanout',
+            name='heartbeat_at',
+            field=models.DateTimeField(blank=True, help_text='Last progress from the worker running it', null=True),
+        ),
+        migrations.AddField(
+            model_name='notificationfanout',
+            name='last_user_id',
+            field=models.PositiveBigIntegerField(default=0, help_text='Recipients up to this user id have been notified'),
+        ),
+    ]
@@ -0,0 +1,22 @@
+# Generated by Django 5.2.8 on 2026-10-19 01:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('events', '0021_studentimportjob'),
+    ]
+
+    operations = [
+        migrations.RemoveField(
+            model_name='studentimportjob',
+            name='csv_file',
+        ),
+        migrations.AddField(
+            model_name='studentimportjob',
+            name='csv_content',
+            field=models.TextField(blank=True, help_text='Uploaded CSV, cleared once the import has run'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.8 on 2026-10-19 01:15
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('events', '0022_studentimportjob_csv_content'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='emaildeliverybatch',
+            name='error',
+            field=models.TextField(blank=True, help_text="Why the batch couldn't connect to the mail server"),
+        ),
+    ]
@@ -1,4 +1,5 @@
 from django.db import models
+from django.db.models import Count, Q, OuterRef, Subquery, Value
 from django.contrib.auth.models import User
 from django.core.exceptions import ValidationError
 from django.utils import timezone
@@ -34,6 +35,8 @@ class UserProfile(models.Model):
     contact_number = models.CharField(max_length=15, blank=True)
     department = models.CharField(max_length=100, blank=True)
     is_verified = models.BooleanField(default=False)
+    email_digest = models.BooleanField(default=False, help_text="Bundle low-priority emails into one daily digest")
+    token_version = models.PositiveIntegerField(default=0, help_text="Bumped to revoke every token issued to the user")
     created_at = models.DateTimeField(auto_now_add=True)
 
     def __str__(self):
@@ -59,6 +62,38 @@ class EventCategory(models.Model):
     def __str__(self):
         return self.name
 
+class EventQuerySet(models.QuerySet):
+    def with_registration_counts(self):
+        """
+        Annotate registration counts so registered_count / is_full don't query per event.
+        """
+        return self.annotate(
+            annotated_registered_count=Count(
+                'registration', filter=Q(registration__status='registered'), distinct=True
+            ),
+            annotated_active_count=Count(
+                'registration', filter=Q(registration__status__in=['registered', 'attended']), distinct=True
+            ),
+        )
+
+    def with_user_registration_status(self, user):
+        """
+        Annotate the status of user's registration (or None) for EventSerializer.user_registration_status.
+        """
+        if not user.is_authenticated:
+            return self.annotate(annotated_user_registration_status=Value(None, output_field=models.CharField()))
+        return self.annotate(annotated_user_registration_status=Subquery(
+            Registration.objects.filter(event=OuterRef('pk'), user_id=user.pk).values('status')[:1]
+        ))
+
+    def for_serializer(self, user):
+        """
+        Load everything EventSerializer reads, so serializing n events costs a constant number of queries.
+        """
+        return self.select_related(
+            'organizer', 'host_university', 'venue', 'category'
+        ).prefetch_related('allowed_universities').with_registration_counts().with_user_registration_status(user)
+
 class Event(models.Model):
     STATUS_CHOICES = (
         ('draft', 'Draft'),
@@ -87,6 +122,16 @@ class Event(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     image = models.ImageField(upload_to='event_images/', null=True, blank=True)
+    # Set by archive_completed_events once the event's history moved to the archive tables
+    archived_at = models.DateTimeField(null=True, blank=True, editable=False)
+
+    objects = EventQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['status', 'date_time']),
+        ]
+
     def clean(self):
         # Clash detection
         if self.status == 'published' and self.venue:
@@ -111,6 +156,9 @@ class Event(models.Model):
 
     @property
     def registered_count(self):
+        annotated = getattr(self, 'annotated_registered_count', None)
+        if annotated is not None:
+            return annotated
         return self.registration_set.filter(status='registered').count()
     
     @property
@@ -120,7 +168,10 @@ class Event(models.Model):
         """
         if self.participant_limit is None:
             return False
-        return self.registration_set.filter(status__in=['registered', 'attended']).count() >= self.participant_limit
+        active_count = getattr(self, 'annotated_active_count', None)
+        if active_count is None:
+            active_count = self.registration_set.filter(status__in=['registered', 'attended']).count()
+        return active_count >= self.participant_limit
 
 class Registration(models.Model):
     REG_STATUS = (
@@ -128,6 +179,7 @@ class Registration(models.Model):
         ('cancelled', 'Cancelled'),
         ('attended', 'Attended'),
         ('waitlisted', 'Waitlisted'),
+        ('no_show', 'No Show'),
     )
     
     event = models.ForeignKey(Event, on_delete=models.CASCADE)
@@ -206,12 +258,34 @@ class Notification(models.Model):
     notification_type = models.CharField(max_length=50, choices=NOTIFICATION_TYPES)
     is_read = models.BooleanField(default=False)
     created_at = models.DateTimeField(auto_now_add=True)
+    # Moves when a later change is folded into this notification; created_at never does,
+    # so cursor pages over created_at stay stable
+    updated_at = models.DateTimeField(auto_now=True)
     related_event = models.ForeignKey(Event, on_delete=models.CASCADE, null=True, blank=True)
     target_university = models.ForeignKey(University, on_delete=models.CASCADE, null=True, blank=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['user', 'is_read', '-created_at']),
+            models.Index(fields=['user', '-created_at']),
+            models.Index(fields=['notification_type', 'is_read', 'created_at']),
+        ]
+
     def __str__(self):
         return f"{self.user.username} - {self.title}"
 
+class UnreadNotificationCounter(models.Model):
+    """
+    Per-user count of unread notifications, maintained on create/read so the badge is O(1).
+    Rows are created lazily from a COUNT the first time a user's badge is read.
+    """
+    user = models.OneToOneField(User, on_delete=models.CASCADE, primary_key=True, related_name='unread_counter')
+    unread_count = models.PositiveIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.user.username} - {self.unread_count} unread"
+
 class RecentActivity(models.Model):
     ACTION_CHOICES = (
         ('registered', 'Registered'),
@@ -230,4 +304,190 @@ class RecentActivity(models.Model):
         verbose_name_plural = 'Recent Activities'
     
     def __str__(self):
-        return f"{self.user.username} - {self.action} - {self.event.title}"
\ No newline at end of file
+        return f"{self.user.username} - {self.action} - {self.event.title}"
+
+class QueuedEmail(models.Model):
+    """
+    Outbound email waiting for batched delivery (see the send_queued_emails command).
+    """
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='queued_emails')
+    subject = models.CharField(max_length=200)
+    body = models.TextField()
+    notification_type = models.CharField(max_length=50, blank=True)
+    related_event = models.ForeignKey(Event, on_delete=models.CASCADE, null=True, blank=True)
+    digest = models.BooleanField(default=False, help_text="Held for the user's daily digest")
+    created_at = models.DateTimeField(auto_now_add=True)
+    sent_at = models.DateTimeField(null=True, blank=True)
+    # Set while a mailer batch holds the row; coalescing leaves claimed rows alone
+    claimed_at = models.DateTimeField(null=True, blank=True)
+    attempts = models.PositiveIntegerField(default=0)
+    last_error = models.TextField(blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['sent_at', 'created_at']),
+            models.Index(fields=['digest', 'sent_at', 'user']),
+        ]
+
+    def __str__(self):
+        return f"{self.user.username} - {self.subject}"
+
+class EventReminder(models.Model):
+    """
+    Records that the reminder sent lead_hours before an event went out, so reruns skip it.
+    """
+    event = models.ForeignKey(Event, on_delete=models.CASCADE, related_name='reminders')
+    lead_hours = models.PositiveIntegerField()
+    recipients = models.PositiveIntegerField(default=0)
+    sent_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        unique_together = ['event', 'lead_hours']
+
+    def __str__(self):
+        return f"{self.event.title} - {self.lead_hours}h reminder"
+
+class EmailDeliveryBatch(models.Model):
+    """
+    Outcome and latency of one batch sent over a single SMTP connection.
+    """
+    started_at = models.DateTimeField(auto_now_add=True)
+    duration_ms = models.PositiveIntegerField(default=0)
+    attempted = models.PositiveIntegerField(default=0)
+    sent = models.PositiveIntegerField(default=0)
+    failed = models.PositiveIntegerField(default=0)
+    is_digest = models.BooleanField(default=False)
+    error = models.TextField(blank=True, help_text="Why the batch couldn't connect to the mail server")
+
+    class Meta:
+        verbose_name_plural = 'Email delivery batches'
+
+    def __str__(self):
+        return f"{self.started_at:%Y-%m-%d %H:%M} - {self.sent}/{self.attempted} sent"
+
+class NotificationFanout(models.Model):
+    """
+    A university-wide alert being delivered to every matching profile, with progress.
+    """
+    STATUS_CHOICES = (
+        ('pending', 'Pending'),
+        ('running', 'Running'),
+        ('completed', 'Completed'),
+        ('failed', 'Failed'),
+    )
+
+    university = models.ForeignKey(University, on_delete=models.CASCADE, related_name='notification_fanouts')
+    user_type = models.CharField(max_length=20, choices=UserProfile.USER_TYPES, default='student')
+    title = models.CharField(max_length=200)
+    message = models.TextField()
+    related_event = models.ForeignKey(Event, on_delete=models.SET_NULL, null=True, blank=True)
+    send_email = models.BooleanField(default=True)
+    created_by = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True, related_name='notification_fanouts')
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='pending')
+    total_recipients = models.PositiveIntegerField(default=0)
+    notified_count = models.PositiveIntegerField(default=0)
+    last_user_id = models.PositiveBigIntegerField(default=0, help_text="Recipients up to this user id have been notified")
+    heartbeat_at = models.DateTimeField(null=True, blank=True, help_text="Last progress from the worker running it")
+    error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    def __str__(self):
+        return f"{self.university.short_code} - {self.title} ({self.status})"
+
+class StudentImportJob(models.Model):
+    """
+    An uploaded student CSV waiting for, or processed by, the send_queued_emails worker.
+    The CSV is kept on the row (web and worker don't share a filesystem) and emptied once
+    processed since it may hold plain-text passwords.
+    """
+    STATUS_CHOICES = (
+        ('pending', 'Pending'),
+        ('running', 'Running'),
+        ('completed', 'Completed'),
+        ('failed', 'Failed'),
+    )
+
+    university = models.ForeignKey(University, on_delete=models.CASCADE, related_name='student_imports')
+    csv_content = models.TextField(blank=True, help_text="Uploaded CSV, cleared once the import has run")
+    created_by = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True, related_name='student_imports')
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='pending')
+    created_count = models.PositiveIntegerField(default=0)
+    error_count = models.PositiveIntegerField(default=0)
+    errors = models.JSONField(default=list, blank=True, help_text="Rejected rows (line and reason), capped")
+    error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    def __str__(self):
+        return f"{self.university.short_code} import {self.pk} ({self.status})"
+
+# Cold copies of rows belonging to events completed long ago (see events.archive).
+# Hot tables and their indexes only hold live data; history reads union these in on request.
+
+class ArchivedRegistration(models.Model):
+    original_id = models.BigIntegerField()
+    event = models.ForeignKey(Event, on_delete=models.CASCADE, related_name='archived_registrations')
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='archived_registrations')
+    registered_at = models.DateTimeField()
+    status = models.CharField(max_length=20, choices=Registration.REG_STATUS)
+    archived_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['user', '-registered_at']),
+        ]
+
+    def __str__(self):
+        return f"{self.user.username} - {self.event.title} (archived)"
+
+class ArchivedWaitlistEntry(models.Model):
+    original_id = models.BigIntegerField()
+    event = models.ForeignKey(Event, on_delete=models.CASCADE, related_name='archived_waitlist_entries')
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='archived_waitlist_entries')
+    joined_at = models.DateTimeField()
+    position = models.IntegerField()
+    archived_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        verbose_name_plural = 'Archived waitlist entries'
+
+    def __str__(self):
+        return f"{self.user.username} - {self.event.title} (archived, position {self.position})"
+
+class ArchivedRecentActivity(models.Model):
+    original_id = models.BigIntegerField()
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='archived_activities')
+    event = models.ForeignKey(Event, on_delete=models.CASCADE, related_name='archived_activities')
+    action = models.CharField(max_length=20, choices=RecentActivity.ACTION_CHOICES)
+    timestamp = models.DateTimeField()
+    archived_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        verbose_name_plural = 'Archived recent activities'
+        indexes = [
+            models.Index(fields=['user', '-timestamp']),
+        ]
+
+    def __str__(self):
+        return f"{self.user.username} - {self.action} - {self.event.title} (archived)"
+
+class ArchivedNotification(models.Model):
+    original_id = models.BigIntegerField()
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='archived_notifications')
+    title = models.CharField(max_length=200)
+    message = models.TextField()
+    notification_type = models.CharField(max_length=50, choices=Notification.NOTIFICATION_TYPES)
+    is_read = models.BooleanField(default=False)
+    created_at = models.DateTimeField()
+    related_event = models.ForeignKey(Event, on_delete=models.CASCADE, null=True, blank=True, related_name='+')
+    target_university = models.ForeignKey(University, on_delete=models.CASCADE, null=True, blank=True, related_name='+')
+    archived_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['user', '-created_at']),
+        ]
+
+    def __str__(self):
+        return f"{self.user.username} - {self.title} (archived)"
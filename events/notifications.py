@@ -0,0 +1,456 @@
+import logging
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction, IntegrityError
+from django.db.models import F, Q
+from django.db.models.functions import Greatest
+from django.utils import timezone
+
+from .models import (
+    Event,
+    EventReminder,
+    Notification,
+    NotificationFanout,
+    QueuedEmail,
+    UserProfile,
+    Registration,
+    WaitlistEntry,
+    UnreadNotificationCounter,
+)
+from .mailer import unclaimed
+from .pubsub import publish_notifications, publish_notification
+
+logger = logging.getLogger(__name__)
+
+
+def _batch_size():
+    return getattr(settings, 'NOTIFICATION_BATCH_SIZE', 2000)
+
+
+def increment_unread(user_ids, by=1):
+    """
+    Bump the unread counter of users that already have one; missing counters
+    are initialised from a COUNT on first read, so they need no update here.
+    """
+    UnreadNotificationCounter.objects.filter(user_id__in=user_ids).update(
+        unread_count=F('unread_count') + by
+    )
+
+
+def decrement_unread(user_id, by=1):
+    UnreadNotificationCounter.objects.filter(user_id=user_id).update(
+        unread_count=Greatest(F('unread_count') - by, 0)
+    )
+
+
+def refresh_unread_count(user_id):
+    """
+    Recompute a user's counter from the notifications table.
+    """
+    unread = Notification.objects.filter(user_id=user_id, is_read=False).count()
+    UnreadNotificationCounter.objects.update_or_create(user_id=user_id, defaults={'unread_count': unread})
+    return unread
+
+
+def get_unread_count(user_id):
+    counter = UnreadNotificationCounter.objects.filter(user_id=user_id).values_list('unread_count', flat=True).first()
+    if counter is None:
+        return refresh_unread_count(user_id)
+    return counter
+
+
+def _digest_user_ids(user_ids, low_priority):
+    """
+    The users whose copy of an email is held for their daily digest.
+    """
+    if not low_priority or not user_ids:
+        return set()
+    return set(UserProfile.objects.filter(user_id__in=user_ids, email_digest=True).values_list('user_id', flat=True))
+
+
+def queue_emails(user_ids, subject, body, notification_type='', related_event=None, low_priority=False):
+    """
+    Queue one email per user for batched background delivery (events.mailer).
+    Low-priority emails are held for the daily digest of users who opted into it.
+    """
+    user_ids = list(user_ids)
+    digest_users = _digest_user_ids(user_ids, low_priority)
+    QueuedEmail.objects.bulk_create(
+        [
+            QueuedEmail(
+                user_id=user_id,
+                subject=subject,
+                body=body,
+                notification_type=notification_type,
+                related_event=related_event,
+                digest=user_id in digest_users,
+            )
+            for user_id in user_ids
+        ],
+        batch_size=_batch_size()
+    )
+
+
+# Notification types that describe the same thing (a user's place at an event) and
+# so replace one another within NOTIFICATION_COALESCE_SECONDS
+NOTIFICATION_FAMILIES = {
+    'registration_confirmation': 'registration',
+    'waitlist_promotion': 'registration',
+    'event_cancelled': 'registration',
+}
+
+
+def _family_types(notification_type):
+    family = NOTIFICATION_FAMILIES.get(notification_type)
+    return [t for t, f in NOTIFICATION_FAMILIES.items() if f == family] if family else []
+
+
+def coalesce_notification(user, title, message, notification_type, related_event=None):
+    """
+    Fold a new notification into a recent one for the same (user, event, type family).
+    Returns the updated notification, or None when a new row should be created.
+    """
+    family_types = _family_types(notification_type)
+    if related_event is None or not family_types:
+        return None
+
+    window = getattr(settings, 'NOTIFICATION_COALESCE_SECONDS', 600)
+    existing = Notification.objects.filter(
+        user=user,
+        related_event=related_event,
+        notification_type__in=family_types,
+        updated_at__gte=timezone.now() - timedelta(seconds=window)
+    ).order_by('-updated_at').first()
+    if existing is None:
+        return None
+
+    was_read = existing.is_read
+    existing.title = title
+    existing.message = message
+    existing.notification_type = notification_type
+    existing.is_read = False
+    existing.save(update_fields=['title', 'message', 'notification_type', 'is_read', 'updated_at'])
+    if was_read:
+        increment_unread([user.id])
+    publish_notification(existing)
+    return existing
+
+
+def queue_or_replace_email(user, subject, body, notification_type, related_event=None, low_priority=False):
+    """
+    Queue an email, or rewrite the user's still-unsent email for the same event and
+    type family queued within NOTIFICATION_COALESCE_SECONDS, so churn sends one message
+    describing the latest state. Emails a mailer batch has already claimed are never
+    rewritten; a new one is queued instead. The rewritten email takes the new message's priority:
+    a confirmation replacing a digest-held email goes out with the next batch.
+    """
+    family_types = _family_types(notification_type)
+    if related_event is not None and family_types:
+        window = getattr(settings, 'NOTIFICATION_COALESCE_SECONDS', 600)
+        replaced = QueuedEmail.objects.filter(
+            unclaimed(),
+            user=user,
+            related_event=related_event,
+            notification_type__in=family_types,
+            sent_at__isnull=True,
+            created_at__gte=timezone.now() - timedelta(seconds=window)
+        ).update(
+            subject=subject,
+            body=body,
+            notification_type=notification_type,
+            digest=user.id in _digest_user_ids([user.id], low_priority)
+        )
+        if replaced:
+            return
+    queue_emails([user.id], subject, body, notification_type, related_event=related_event, low_priority=low_priority)
+
+
+def bulk_notify(user_ids, title, message, notification_type, related_event=None,
+                target_university=None, send_email=False):
+    """
+    Create the same notification for many users with batched INSERTs.
+    Returns the number of notifications created.
+    """
+    user_ids = list(user_ids)
+    if not user_ids:
+        return 0
+
+    notifications = Notification.objects.bulk_create(
+        [
+            Notification(
+                user_id=user_id,
+                title=title,
+                message=message,
+                notification_type=notification_type,
+                related_event=related_event,
+                target_university=target_university,
+            )
+            for user_id in user_ids
+        ],
+        batch_size=_batch_size()
+    )
+    increment_unread(user_ids)
+    publish_notifications(notifications)
+    if send_email:
+        queue_emails(user_ids, title, message, notification_type, related_event=related_event)
+    return len(user_ids)
+
+
+def fanout_recipients(fanout):
+    return UserProfile.objects.filter(
+        university_id=fanout.university_id,
+        user_type=fanout.user_type,
+        user__is_active=True
+    ).order_by('user_id').values_list('user_id', flat=True)
+
+
+def _stale_fanout():
+    """
+    Q for fan-outs a worker may take: pending ones, and running ones whose worker
+    stopped reporting progress (killed or restarted mid-run).
+    """
+    stale_before = timezone.now() - timedelta(seconds=getattr(settings, 'NOTIFICATION_FANOUT_STALE_SECONDS', 300))
+    return Q(status='pending') | Q(status='running') & (
+        Q(heartbeat_at__lt=stale_before) | Q(heartbeat_at__isnull=True)
+    )
+
+
+def claim_fanout(fanout_id):
+    """
+    Mark a pending or stale fan-out as running. Returns False when another worker claimed it first.
+    """
+    return NotificationFanout.objects.filter(_stale_fanout(), pk=fanout_id).update(
+        status='running', heartbeat_at=timezone.now()
+    ) == 1
+
+
+def run_fanout(fanout, chunk_size=None, progress=None):
+    """
+    Deliver a NotificationFanout in keyset-paginated chunks of recipient ids, starting
+    after last_user_id. Each chunk commits together with the fan-out's progress, so a
+    fan-out that was cut short resumes where it stopped without notifying anyone twice.
+    """
+    chunk_size = chunk_size or _batch_size()
+    recipients = fanout_recipients(fanout)
+    last_user_id = fanout.last_user_id
+
+    NotificationFanout.objects.filter(pk=fanout.pk).update(
+        status='running',
+        total_recipients=fanout.notified_count + recipients.filter(user_id__gt=last_user_id).count(),
+        heartbeat_at=timezone.now()
+    )
+    fanout.refresh_from_db()
+
+    try:
+        while True:
+            user_ids = list(recipients.filter(user_id__gt=last_user_id)[:chunk_size])
+            if not user_ids:
+                break
+            with transaction.atomic():
+                created = bulk_notify(
+                    user_ids,
+                    title=fanout.title,
+                    message=fanout.message,
+                    notification_type='university_event',
+                    related_event=fanout.related_event,
+                    target_university=fanout.university,
+                    send_email=fanout.send_email,
+                )
+                NotificationFanout.objects.filter(pk=fanout.pk).update(
+                    notified_count=F('notified_count') + created,
+                    last_user_id=user_ids[-1],
+                    heartbeat_at=timezone.now()
+                )
+            last_user_id = fanout.last_user_id = user_ids[-1]
+            fanout.notified_count += created
+            if progress:
+                progress(fanout)
+    except Exception as e:
+        logger.exception("Notification fan-out %s failed", fanout.pk)
+        NotificationFanout.objects.filter(pk=fanout.pk).update(
+            status='failed', error=str(e), finished_at=timezone.now()
+        )
+        raise
+
+    NotificationFanout.objects.filter(pk=fanout.pk).update(status='completed', finished_at=timezone.now())
+    fanout.refresh_from_db()
+    return fanout
+
+
+def run_pending_fanouts(chunk_size=None):
+    """
+    Run every pending fan-out and resume stale running ones, oldest first; called by the
+    send_queued_emails worker. A failure is recorded on its fan-out (status 'failed' and
+    the error) and doesn't stop the others. Returns the fan-outs processed.
+    """
+    fanout_ids = list(
+        NotificationFanout.objects.filter(_stale_fanout()).order_by('created_at', 'pk').values_list('pk', flat=True)
+    )
+    processed = []
+    for fanout_id in fanout_ids:
+        if not claim_fanout(fanout_id):
+            continue
+        fanout = NotificationFanout.objects.select_related('university', 'related_event').get(pk=fanout_id)
+        try:
+            run_fanout(fanout, chunk_size=chunk_size)
+        except Exception:
+            # run_fanout logged the error and recorded it on the row; move on to the next one
+            fanout.refresh_from_db()
+        processed.append(fanout)
+    return processed
+
+
+def _event_audience(event):
+    registered = Registration.objects.filter(event=event, status='registered').values_list('user_id', flat=True)
+    waitlisted = WaitlistEntry.objects.filter(event=event).values_list('user_id', flat=True)
+    return registered, waitlisted
+
+
+def event_audience_ids(event):
+    """
+    Ids of everyone holding a registration or a waitlist spot for the event.
+    """
+    registered, waitlisted = _event_audience(event)
+    return set(registered.union(waitlisted))
+
+
+def event_audience_filter(event, field='user_id'):
+    """
+    Q restricting rows to the event's audience via subqueries (no id list round-trip).
+    """
+    registered, waitlisted = _event_audience(event)
+    return Q(**{f'{field}__in': registered}) | Q(**{f'{field}__in': waitlisted})
+
+
+def event_change_snapshot(event):
+    """
+    Capture the fields whose changes registrants are told about, before an update is applied.
+    """
+    return {'status': event.status, 'date_time': event.date_time, 'venue_id': event.venue_id}
+
+
+def broadcast_event_changes(event, previous):
+    """
+    Notify the event's audience about a cancellation or a date/venue change, given the
+    event_change_snapshot taken before the update. Returns the notification type sent, if any.
+    """
+    if event.status == 'cancelled' and previous['status'] != 'cancelled':
+        broadcast_event_cancelled(event)
+        return 'event_cancelled'
+
+    if event.status == 'published' and (
+        event.date_time != previous['date_time'] or event.venue_id != previous['venue_id']
+    ):
+        broadcast_event_updated(event)
+        return 'event_updated'
+    return None
+
+
+def broadcast_event_cancelled(event):
+    title = f"Event Cancelled: {event.title}"
+    message = f"{event.title} has been cancelled by the organizer."
+    with transaction.atomic():
+        return bulk_notify(
+            event_audience_ids(event), title, message, 'event_cancelled',
+            related_event=event, send_email=True
+        )
+
+
+def broadcast_event_updated(event):
+    """
+    Send an event_updated notification, folding edits made within
+    EVENT_UPDATE_COALESCE_SECONDS into the recipients' existing message and pending email.
+    The message always states the current date and venue so a folded message stays accurate.
+    """
+    title = f"Event Updated: {event.title}"
+    message = (
+        f"{event.title} has been updated. "
+        f"Date/time: {timezone.localtime(event.date_time):%Y-%m-%d %H:%M}. "
+        f"Venue: {event.venue.name}."
+    )
+    window = getattr(settings, 'EVENT_UPDATE_COALESCE_SECONDS', 900)
+    cutoff = timezone.now() - timedelta(seconds=window)
+
+    with transaction.atomic():
+        audience = event_audience_ids(event)
+
+        recent = Notification.objects.filter(
+            event_audience_filter(event),
+            related_event=event,
+            notification_type='event_updated',
+            updated_at__gte=cutoff
+        )
+        coalesced = set(recent.values_list('user_id', flat=True))
+        increment_unread(recent.filter(is_read=True).values('user_id'))
+        recent.update(title=title, message=message, is_read=False, updated_at=timezone.now())
+
+        pending_emails = QueuedEmail.objects.filter(
+            unclaimed(),
+            event_audience_filter(event),
+            related_event=event,
+            notification_type='event_updated',
+            sent_at__isnull=True
+        )
+        emailed = set(pending_emails.values_list('user_id', flat=True))
+        pending_emails.update(subject=title, body=message)
+
+        # Users whose earlier update email already went out get a fresh one
+        queue_emails(coalesced - emailed, title, message, 'event_updated', related_event=event)
+        return bulk_notify(
+            audience - coalesced, title, message, 'event_updated',
+            related_event=event, send_email=True
+        ) + len(coalesced)
+
+
+def send_event_reminders(lead_hours, batch_size=500):
+    """
+    Remind registrants of every published event starting within lead_hours that
+    hasn't had this reminder yet. Returns (events_reminded, notifications_created).
+    """
+    now = timezone.now()
+    due = Event.objects.filter(
+        status='published',
+        date_time__gt=now,
+        date_time__lte=now + timedelta(hours=lead_hours)
+    ).exclude(
+        reminders__lead_hours=lead_hours
+    ).select_related('venue').order_by('date_time', 'id')
+
+    events_reminded = notified = 0
+    while True:
+        # Each reminded event gains a reminder row and drops out of `due`
+        batch = list(due[:batch_size])
+        if not batch:
+            return events_reminded, notified
+        for event in batch:
+            created = _remind_event(event, lead_hours)
+            if created is not None:
+                events_reminded += 1
+                notified += created
+
+
+def _remind_event(event, lead_hours):
+    """
+    Claim the (event, lead_hours) reminder and notify registrants in one transaction.
+    Returns the number notified, or None if another run already claimed it.
+    """
+    try:
+        with transaction.atomic():
+            reminder = EventReminder.objects.create(event=event, lead_hours=lead_hours)
+            user_ids = Registration.objects.filter(
+                event=event, status='registered'
+            ).values_list('user_id', flat=True)
+            starts = timezone.localtime(event.date_time)
+            reminder.recipients = bulk_notify(
+                user_ids,
+                title=f"Reminder: {event.title}",
+                message=f"{event.title} starts {starts:%Y-%m-%d at %H:%M} at {event.venue.name}.",
+                notification_type='event_reminder',
+                related_event=event,
+                send_email=True,
+            )
+            reminder.save(update_fields=['recipients'])
+            return reminder.recipients
+    except IntegrityError:
+        return None
@@ -0,0 +1,145 @@
+import asyncio
+import json
+import threading
+from collections import defaultdict
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import transaction
+
+# Messages buffered per subscriber before the oldest are dropped (slow clients can't grow memory)
+SUBSCRIBER_QUEUE_SIZE = 100
+
+
+def user_channel(user_id):
+    return f'user:{user_id}'
+
+
+def event_channel(event_id):
+    return f'event:{event_id}'
+
+
+class Subscription:
+    """
+    One connected client: an asyncio queue bound to the loop that serves its stream.
+    """
+
+    def __init__(self, channels, loop):
+        self.channels = set(channels)
+        self.loop = loop
+        self.queue = asyncio.Queue(maxsize=SUBSCRIBER_QUEUE_SIZE)
+
+    def _put(self, message):
+        if self.queue.full():
+            self.queue.get_nowait()
+        self.queue.put_nowait(message)
+
+    def deliver(self, message):
+        # Publishers run on worker threads; hand the message to the subscriber's loop
+        self.loop.call_soon_threadsafe(self._put, message)
+
+
+class Broker:
+    """
+    In-process pub/sub used to push notifications and seat counts to SSE clients.
+    Only reaches subscribers connected to the same process.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._subscriptions = defaultdict(set)
+
+    def subscribe(self, channels):
+        subscription = Subscription(channels, asyncio.get_running_loop())
+        with self._lock:
+            for channel in subscription.channels:
+                self._subscriptions[channel].add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            for channel in subscription.channels:
+                subscribers = self._subscriptions.get(channel)
+                if subscribers is not None:
+                    subscribers.discard(subscription)
+                    if not subscribers:
+                        del self._subscriptions[channel]
+
+    def has_subscribers(self, channel):
+        return channel in self._subscriptions
+
+    def publish(self, channel, event, data):
+        with self._lock:
+            subscribers = list(self._subscriptions.get(channel, ()))
+        if not subscribers:
+            return 0
+        message = (event, json.dumps(data, cls=DjangoJSONEncoder))
+        for subscription in subscribers:
+            subscription.deliver(message)
+        return len(subscribers)
+
+
+broker = Broker()
+
+
+def publish_on_commit(channel, event, build_data):
+    """
+    Publish once the surrounding transaction commits. build_data is only called
+    when someone is listening, so unwatched writes pay nothing.
+    """
+    def _publish():
+        if broker.has_subscribers(channel):
+            broker.publish(channel, event, build_data())
+
+    transaction.on_commit(_publish)
+
+
+def _notification_data(notification):
+    return {
+        'id': notification.id,
+        'title': notification.title,
+        'message': notification.message,
+        'notification_type': notification.notification_type,
+        'related_event': notification.related_event_id,
+        'created_at': notification.created_at,
+        'updated_at': notification.updated_at,
+    }
+
+
+def publish_notification(notification):
+    publish_on_commit(user_channel(notification.user_id), 'notification', lambda: _notification_data(notification))
+
+
+def publish_notifications(notifications):
+    """
+    Publish a batch of bulk-created notifications with a single commit hook.
+    """
+    def _publish():
+        for notification in notifications:
+            channel = user_channel(notification.user_id)
+            if broker.has_subscribers(channel):
+                broker.publish(channel, 'notification', _notification_data(notification))
+
+    transaction.on_commit(_publish)
+
+
+def publish_seat_update(event_id):
+    """
+    Push the event's current seat availability to its watchers.
+    """
+    def _seats():
+        from .models import Event, WaitlistEntry
+        event = Event.objects.with_registration_counts().get(pk=event_id)
+        active = event.annotated_active_count
+        return {
+            'event_id': event.id,
+            'registered_count': event.registered_count,
+            'participant_limit': event.participant_limit,
+            'remaining_seats': (
+                max(event.participant_limit - active, 0)
+                if event.participant_limit is not None else None
+            ),
+            'is_full': event.is_full,
+            'waitlist_count': WaitlistEntry.objects.filter(event_id=event_id).count(),
+        }
+
+    publish_on_commit(event_channel(event_id), 'seats', _seats)
@@ -0,0 +1,109 @@
+import logging
+import re
+from collections import Counter
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connection
+
+logger = logging.getLogger(__name__)
+
+# Literals are stripped so queries differing only in parameters share a fingerprint
+_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_LITERAL = re.compile(r'\b\d+(?:\.\d+)?\b')
+_IN_LIST = re.compile(r'\bIN\s*\((?:\s*(?:\?|%s|\$\d+)\s*,?)+\)', re.IGNORECASE)
+_WHITESPACE = re.compile(r'\s+')
+
+
+class QueryBudgetExceeded(Exception):
+    pass
+
+
+def query_budget(max_queries):
+    """
+    Declare the most queries a function view may run per request, whatever the data size.
+    Put it above @api_view. ViewSets declare `query_budgets = {'<action>': n}` instead.
+    """
+    def decorator(view):
+        view.query_budget = max_queries
+        return view
+    return decorator
+
+
+def budget_for(view_func, method):
+    """
+    The declared budget of a resolved view for an HTTP method, or None when undeclared.
+    """
+    budget = getattr(view_func, 'query_budget', None)
+    if budget is not None:
+        return budget
+    view_class = getattr(view_func, 'cls', None)
+    actions = getattr(view_func, 'actions', None) or {}
+    action = actions.get(method.lower())
+    if view_class is None or action is None:
+        return None
+    return getattr(view_class, 'query_budgets', {}).get(action)
+
+
+def fingerprint(sql):
+    """
+    SQL with literals and parameter lists normalized, for spotting repeated (N+1) queries.
+    """
+    sql = _STRING_LITERAL.sub('?', sql)
+    sql = _NUMBER_LITERAL.sub('?', sql)
+    sql = _IN_LIST.sub('IN (...)', sql)
+    return _WHITESPACE.sub(' ', sql).strip()
+
+
+def repeated_fingerprints(statements, threshold):
+    """
+    [(fingerprint, count)] of the statements run at least threshold times, most frequent first.
+    """
+    counts = Counter(fingerprint(sql) for sql in statements)
+    return [(fp, count) for fp, count in counts.most_common() if count >= threshold]
+
+
+class QueryBudgetMiddleware:
+    """
+    DEBUG-only check of each request's query count against the view's declared budget.
+    Over-budget requests are logged with their repeated query fingerprints, or fail with
+    QueryBudgetExceeded when QUERY_BUDGET_ACTION is 'raise'. Repeated fingerprints are
+    also logged for requests within budget, since they usually point at an N+1.
+    """
+
+    def __init__(self, get_response):
+        if not settings.DEBUG:
+            raise MiddlewareNotUsed()
+        self.get_response = get_response
+
+    def __call__(self, request):
+        statements = []
+
+        def record(execute, sql, params, many, context):
+            statements.append(sql)
+            return execute(sql, params, many, context)
+
+        with connection.execute_wrapper(record):
+            response = self.get_response(request)
+        # Streaming responses run most of their queries after this point; only the setup is counted
+        self._check(request, statements)
+        return response
+
+    def _check(self, request, statements):
+        match = getattr(request, 'resolver_match', None)
+        if match is None:
+            return
+        budget = budget_for(match.func, request.method)
+        if budget is None:
+            budget = getattr(settings, 'QUERY_BUDGET_DEFAULT', None)
+        repeated = repeated_fingerprints(statements, getattr(settings, 'QUERY_BUDGET_REPEAT_THRESHOLD', 3))
+        details = ''.join(f'\n  {count}x {fp}' for fp, count in repeated)
+
+        if budget is not None and len(statements) > budget:
+            message = (f'{request.method} {request.path} ({match.view_name}) ran {len(statements)} queries, '
+                       f'budget is {budget}{details}')
+            if getattr(settings, 'QUERY_BUDGET_ACTION', 'log') == 'raise':
+                raise QueryBudgetExceeded(message)
+            logger.warning(message)
+        elif repeated:
+            logger.warning(f'{request.method} {request.path} ({match.view_name}) repeated queries:{details}')
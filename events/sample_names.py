@@ -0,0 +1,27 @@
+"""
+Names shared by the sample and synthetic data generators (populate_large_data, events.synthetic).
+"""
+
+# Pakistani first names
+PAKISTANI_FIRST_NAMES = [
+    'Ahmed', 'Ali', 'Hassan', 'Hussain', 'Muhammad', 'Usman', 'Bilal', 'Zain', 'Hamza', 'Omar',
+    'Fatima', 'Ayesha', 'Zainab', 'Maryam', 'Sana', 'Hira', 'Amina', 'Sara', 'Aisha', 'Khadija',
+    'Abdullah', 'Ibrahim', 'Yusuf', 'Haris', 'Rayyan', 'Ayan', 'Arham', 'Zayan', 'Ayaan',
+    'Aiza', 'Haniya', 'Mariam', 'Zara', 'Alisha', 'Hafsa', 'Iqra', 'Laiba', 'Maham', 'Noor',
+    'Fahad', 'Saad', 'Taha', 'Waleed', 'Zeeshan', 'Adnan', 'Asad', 'Faisal', 'Kamran', 'Nadeem',
+    'Areeba', 'Dua', 'Hiba', 'Jannat', 'Kainat', 'Mahira', 'Nida', 'Rida', 'Saba', 'Tayyaba',
+]
+
+# Pakistani last names
+PAKISTANI_LAST_NAMES = [
+    'Khan', 'Ahmed', 'Ali', 'Hassan', 'Hussain', 'Malik', 'Sheikh', 'Butt', 'Raza', 'Abbas',
+    'Iqbal', 'Rashid', 'Qureshi', 'Shah', 'Baig', 'Mirza', 'Hashmi', 'Rizvi', 'Zaidi', 'Naqvi',
+    'Javed', 'Akhtar', 'Siddiqui', 'Ansari', 'Farooq', 'Khalid', 'Tariq', 'Yousuf', 'Zaman', 'Rauf',
+]
+
+DEPARTMENTS = [
+    'Computer Science', 'Software Engineering', 'Electrical Engineering', 'Mechanical Engineering',
+    'Business Administration', 'Economics', 'Psychology', 'Mathematics', 'Physics', 'Chemistry',
+    'Biology', 'Medicine', 'Law', 'Journalism', 'Fine Arts', 'Architecture', 'Civil Engineering',
+    'Management Sciences', 'Finance', 'Marketing', 'Accounting', 'International Relations',
+]
@@ -1,6 +1,7 @@
 from rest_framework import serializers
 from django.contrib.auth.models import User
 from .models import *
+from .identity import get_identity
 
 class UniversitySerializer(serializers.ModelSerializer):
     class Meta:
@@ -38,7 +39,7 @@ class UserSerializer(serializers.ModelSerializer):
         }
 
         # Safely try to access and serialize profile
-        profile_instance = getattr(instance, 'profile', None)
+        profile_instance = self._get_profile(instance)
         if profile_instance:
             try:
                 representation['profile'] = UserProfileSerializer(profile_instance).data
@@ -49,6 +50,13 @@ class UserSerializer(serializers.ModelSerializer):
 
         return representation
 
+    def _get_profile(self, instance):
+        # The request's own user reuses the profile its RequestIdentity already loaded
+        request = self.context.get('request')
+        if request is not None and request.user.pk == instance.pk:
+            return get_identity(request).profile
+        return getattr(instance, 'profile', None)
+
 class VenueSerializer(serializers.ModelSerializer):
     university_name = serializers.CharField(source='university.name', read_only=True)
     
@@ -77,6 +85,9 @@ class EventSerializer(serializers.ModelSerializer):
     def get_user_registration_status(self, obj):
         request = self.context.get('request')
         if request and request.user.is_authenticated:
+            # Annotated by EventQuerySet.with_user_registration_status on list endpoints
+            if hasattr(obj, 'annotated_user_registration_status'):
+                return obj.annotated_user_registration_status
             registration = Registration.objects.filter(event=obj, user=request.user).first()
             return registration.status if registration else None
         return None
@@ -138,6 +149,24 @@ class NotificationSerializer(serializers.ModelSerializer):
         model = Notification
         fields = '__all__'
 
+class NotificationFanoutSerializer(serializers.ModelSerializer):
+    university_name = serializers.CharField(source='university.name', read_only=True)
+    
+    class Meta:
+        model = NotificationFanout
+        fields = '__all__'
+        read_only_fields = [
+            'created_by', 'status', 'total_recipients', 'notified_count', 'last_user_id',
+            'heartbeat_at', 'error', 'created_at', 'finished_at',
+        ]
+
+class StudentImportJobSerializer(serializers.ModelSerializer):
+    university_name = serializers.CharField(source='university.name', read_only=True)
+
+    class Meta:
+        model = StudentImportJob
+        exclude = ['csv_content']
+
 class RecentActivitySerializer(serializers.ModelSerializer):
     event_title = serializers.CharField(source='event.title', read_only=True)
     event_id = serializers.IntegerField(source='event.id', read_only=True)
@@ -1,8 +1,18 @@
 from django.contrib.auth import get_user_model
-from django.db.models.signals import post_save
+from django.db.models.signals import post_save, post_delete
 from django.dispatch import receiver
 
-from .models import UserProfile
+from .authentication import invalidate_fingerprint
+from .caching import (
+    per_row_invalidation_is_suppressed,
+    invalidate_organizer_dashboard,
+    invalidate_student_overview,
+    invalidate_recent_activities,
+    push_recent_activity,
+)
+from .models import UserProfile, Event, Registration, WaitlistEntry, RecentActivity, Notification
+from .notifications import increment_unread
+from .pubsub import publish_notification
 
 User = get_user_model()
 
@@ -35,3 +45,73 @@ def ensure_user_profile(sender, instance, created, **kwargs):
                 **_profile_defaults()
             )
 
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def invalidate_user_token_fingerprint(sender, instance, **kwargs):
+    # Staff/active flag or password changes revoke tokens issued with the old values
+    invalidate_fingerprint(instance.pk)
+
+
+@receiver(post_save, sender=UserProfile)
+@receiver(post_delete, sender=UserProfile)
+def invalidate_profile_token_fingerprint(sender, instance, **kwargs):
+    invalidate_fingerprint(instance.user_id)
+
+
+def _event_organizer_id(instance):
+    """
+    Resolve the organizer of a registration/waitlist row without a query when the event is cached.
+    """
+    if type(instance).event.is_cached(instance):
+        return instance.event.organizer_id
+    return Event.objects.filter(pk=instance.event_id).values_list('organizer_id', flat=True).first()
+
+
+@receiver(post_save, sender=Event)
+@receiver(post_delete, sender=Event)
+def invalidate_dashboard_for_event(sender, instance, **kwargs):
+    invalidate_organizer_dashboard(instance.organizer_id)
+
+
+@receiver(post_save, sender=Registration)
+@receiver(post_delete, sender=Registration)
+@receiver(post_save, sender=WaitlistEntry)
+@receiver(post_delete, sender=WaitlistEntry)
+def invalidate_dashboard_for_registration(sender, instance, **kwargs):
+    if per_row_invalidation_is_suppressed():
+        return
+    invalidate_organizer_dashboard(_event_organizer_id(instance))
+
+
+@receiver(post_save, sender=Registration)
+@receiver(post_delete, sender=Registration)
+def invalidate_overview_for_registration(sender, instance, **kwargs):
+    if per_row_invalidation_is_suppressed():
+        return
+    invalidate_student_overview(instance.user_id)
+
+
+@receiver(post_save, sender=RecentActivity)
+def cache_recent_activity(sender, instance, created, **kwargs):
+    if created:
+        from .serializers import RecentActivitySerializer
+        push_recent_activity(instance.user_id, RecentActivitySerializer(instance).data)
+        invalidate_student_overview(instance.user_id)
+
+
+@receiver(post_delete, sender=RecentActivity)
+def drop_recent_activity(sender, instance, **kwargs):
+    if per_row_invalidation_is_suppressed():
+        return
+    invalidate_recent_activities(instance.user_id)
+    invalidate_student_overview(instance.user_id)
+
+
+@receiver(post_save, sender=Notification)
+def count_unread_notification(sender, instance, created, **kwargs):
+    # bulk_create skips this signal; bulk_notify bumps the counters itself
+    if created and not instance.is_read:
+        increment_unread([instance.user_id])
+    if created:
+        publish_notification(instance)
@@ -0,0 +1,424 @@
+"""
+Production-sized synthetic data for benchmarks (see the generate_benchmark_data command).
+
+Everything is derived from a seed and a base time: each chunk of work gets its own
+Random(seed, chunk) and event dates are offsets from the base, so the same seed, sizes
+and base time give the same rows whether it runs in one process or many. Rows are written
+with bulk_create in large batches and a single precomputed password hash, which skips
+model save() (venue clash checks) and the profile-creating post_save signal.
+"""
+import multiprocessing
+import random
+import time
+from datetime import timedelta
+
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import connections, transaction
+from django.db.models import CASCADE, DO_NOTHING, SET_NULL
+from django.utils import timezone
+
+from .authentication import CLAIMS_FINGERPRINT_KEY
+from .caching import invalidate_organizer_dashboard
+from .models import University, EventCategory, Venue, Event, UserProfile, Registration, WaitlistEntry
+from .sample_names import PAKISTANI_FIRST_NAMES, PAKISTANI_LAST_NAMES, DEPARTMENTS
+
+SYNTHETIC_PASSWORD = 'synthetic123'
+
+CATEGORY_NAMES = ['Technology', 'Business', 'Career', 'Cultural', 'Academic', 'Sports', 'Social']
+VENUES_PER_UNIVERSITY = 5
+
+# Populated in the parent before forking so registration workers share them copy-on-write
+_STUDENTS = []
+_STUDENTS_BY_UNIVERSITY = {}
+
+
+def chunk_rng(seed, *parts):
+    # String seeds hash deterministically; hash() of a tuple of str is salted per process
+    return random.Random(':'.join(str(part) for part in (seed,) + parts))
+
+
+def zipf_weights(count, exponent, rng):
+    """
+    Zipf-like popularity weights (rank^-exponent) assigned to shuffled positions.
+    """
+    weights = [1 / (rank ** exponent) for rank in range(1, count + 1)]
+    rng.shuffle(weights)
+    return weights
+
+
+def allocate(total, weights, cap):
+    """
+    Split total across weights proportionally, with no share above cap; what a capped
+    share can't absorb is spread over the rest (water-filling).
+    """
+    shares = [0] * len(weights)
+    open_indices = [i for i, weight in enumerate(weights) if weight > 0]
+    remaining = total
+    while remaining > 0 and open_indices:
+        weight_sum = sum(weights[i] for i in open_indices)
+        still_open = []
+        allocated = 0
+        for i in open_indices:
+            share = min(int(remaining * weights[i] / weight_sum), cap - shares[i])
+            shares[i] += share
+            allocated += share
+            if shares[i] < cap:
+                still_open.append(i)
+        if allocated == 0:
+            break
+        remaining -= allocated
+        open_indices = still_open
+    return shares
+
+
+def _batched(items, size):
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+def _insert_users(task):
+    """
+    Create users [start, stop) and their profiles. Runs in worker processes.
+    """
+    prefix, seed, start, stop, organizers, universities, password, batch_size = task
+    rng = chunk_rng(seed, 'users', start)
+    users, profile_specs = [], []
+    for i in range(start, stop):
+        university_id, domain = universities[rng.randrange(len(universities))]
+        username = f'{prefix}_u{i:07d}'
+        users.append(User(
+            username=username,
+            email=f'{username}@{domain}',
+            password=password,
+            first_name=rng.choice(PAKISTANI_FIRST_NAMES),
+            last_name=rng.choice(PAKISTANI_LAST_NAMES),
+        ))
+        profile_specs.append((university_id, 'organizer' if i < organizers else 'student', i, rng.choice(DEPARTMENTS)))
+    for user_batch, spec_batch in zip(_batched(users, batch_size), _batched(profile_specs, batch_size)):
+        User.objects.bulk_create(user_batch)
+        if any(user.pk is None for user in user_batch):
+            ids = dict(User.objects.filter(
+                username__in=[user.username for user in user_batch]
+            ).values_list('username', 'id'))
+            for user in user_batch:
+                user.pk = ids[user.username]
+        UserProfile.objects.bulk_create([
+            UserProfile(
+                user=user,
+                university_id=university_id,
+                user_type=user_type,
+                student_id=f'S{i:07d}',
+                department=department,
+                is_verified=True,
+            )
+            for user, (university_id, user_type, i, department) in zip(user_batch, spec_batch)
+        ])
+    return stop - start
+
+
+def _insert_registrations(task):
+    """
+    Create the registrations and waitlist entries of a chunk of events. Runs in worker processes.
+    """
+    seed, events, batch_size = task
+    registrations, waitlist = [], []
+    created = waitlisted = 0
+    for event_id, index, university_id, visibility, is_past, limit, demand, max_waitlist in events:
+        if demand == 0:
+            continue
+        # Keyed by the event's position in the plan; its id differs between databases
+        rng = chunk_rng(seed, 'registrations', index)
+        pool = _STUDENTS_BY_UNIVERSITY.get(university_id, []) if visibility == 'university' else _STUDENTS
+        attendees = rng.sample(pool, min(demand, len(pool)))
+        seated, overflow = attendees[:limit], attendees[limit:]
+        for user_id in seated:
+            roll = rng.random()
+            if is_past:
+                status = 'attended' if roll < 0.7 else ('no_show' if roll < 0.95 else 'cancelled')
+            else:
+                status = 'registered' if roll < 0.95 else 'cancelled'
+            registrations.append(Registration(event_id=event_id, user_id=user_id, status=status))
+        if not is_past:
+            for position, user_id in enumerate(overflow[:max_waitlist], start=1):
+                waitlist.append(WaitlistEntry(event_id=event_id, user_id=user_id, position=position))
+
+        if len(registrations) >= batch_size:
+            Registration.objects.bulk_create(registrations, batch_size=batch_size)
+            created += len(registrations)
+            registrations = []
+        if len(waitlist) >= batch_size:
+            WaitlistEntry.objects.bulk_create(waitlist, batch_size=batch_size)
+            waitlisted += len(waitlist)
+            waitlist = []
+    Registration.objects.bulk_create(registrations, batch_size=batch_size)
+    WaitlistEntry.objects.bulk_create(waitlist, batch_size=batch_size)
+    return created + len(registrations), waitlisted + len(waitlist)
+
+
+def _id_chunks(queryset, size):
+    """
+    Primary keys of queryset in ascending chunks (keyset pagination, safe to delete as you go).
+    """
+    last_id = 0
+    while True:
+        ids = list(queryset.filter(pk__gt=last_id).order_by('pk').values_list('pk', flat=True)[:size])
+        if not ids:
+            return
+        yield ids
+        last_id = ids[-1]
+
+
+def _raw_delete(queryset):
+    """
+    Delete queryset's rows and everything that cascades from them with plain DELETE/UPDATE
+    statements, children first. Unlike QuerySet.delete() no instances are loaded and no
+    delete signals are sent, so callers invalidate caches themselves.
+    """
+    model = queryset.model
+    for field in model._meta.many_to_many:
+        through = field.remote_field.through
+        through._base_manager.filter(**{f'{field.m2m_field_name()}__in': queryset})._raw_delete(queryset.db)
+    for relation in model._meta.related_objects:
+        if relation.many_to_many:
+            through = relation.through
+            through._base_manager.filter(
+                **{f'{relation.field.m2m_reverse_field_name()}__in': queryset}
+            )._raw_delete(queryset.db)
+            continue
+        related = relation.related_model._base_manager.filter(**{f'{relation.field.name}__in': queryset})
+        if relation.on_delete is CASCADE:
+            _raw_delete(related)
+        elif relation.on_delete is SET_NULL:
+            related.update(**{relation.field.name: None})
+        elif relation.on_delete is not DO_NOTHING:
+            raise ValueError(f'Cannot bulk-delete {model.__name__} rows referenced by {relation.related_model.__name__}')
+    queryset._raw_delete(queryset.db)
+
+
+class SyntheticDataGenerator:
+    """
+    Builds universities, users, events and registrations at a requested scale.
+    """
+
+    def __init__(self, prefix='synth', seed=42, base_time=None, batch_size=10000, workers=1, log=print):
+        self.prefix = prefix
+        self.seed = seed
+        # Event dates are offsets from this; defaults to the start of today (UTC)
+        self.base_time = base_time or timezone.now().replace(hour=0, minute=0, second=0, microsecond=0)
+        self.batch_size = batch_size
+        self.workers = workers
+        self.log = log
+
+    def _map(self, func, tasks):
+        """
+        Run tasks inline or over a fork-based process pool; each worker opens its own connection.
+        """
+        if self.workers <= 1:
+            return [func(task) for task in tasks]
+        # Children must not share the parent's database connection
+        connections.close_all()
+        with multiprocessing.get_context('fork').Pool(self.workers) as pool:
+            return pool.map(func, tasks, chunksize=1)
+
+    def _timed(self, label, func, *args):
+        started = time.monotonic()
+        result = func(*args)
+        self.log(f'{label} in {time.monotonic() - started:.1f}s')
+        return result
+
+    def has_existing_data(self):
+        return User.objects.filter(username__startswith=f'{self.prefix}_').exists()
+
+    def clear(self):
+        """
+        Remove everything created under this prefix; registrations go with their events and users.
+        Events, then users, are deleted in id chunks of batch_size with raw cascading deletes
+        (one transaction per chunk, no delete signals). Afterwards the dashboards of organizers
+        of other events the synthetic users signed up for (e.g. during a benchmark) and the
+        users' cached token fingerprints are invalidated.
+        """
+        synthetic_users = User.objects.filter(username__startswith=f'{self.prefix}_')
+        other_organizer_ids = set()
+        for model in (Registration, WaitlistEntry):
+            other_organizer_ids.update(
+                model.objects.filter(user__in=synthetic_users)
+                .exclude(event__organizer__in=synthetic_users)
+                .values_list('event__organizer_id', flat=True)
+            )
+
+        for ids in _id_chunks(Event.objects.filter(organizer__in=synthetic_users), self.batch_size):
+            with transaction.atomic():
+                _raw_delete(Event.objects.filter(pk__in=ids))
+        for ids in _id_chunks(synthetic_users, self.batch_size):
+            with transaction.atomic():
+                _raw_delete(User.objects.filter(pk__in=ids))
+            cache.delete_many([CLAIMS_FINGERPRINT_KEY.format(user_id=user_id) for user_id in ids])
+        for organizer_id in other_organizer_ids:
+            invalidate_organizer_dashboard(organizer_id)
+
+    def reference_data(self, university_count):
+        """
+        Universities (reusing existing ones first), categories and a few venues per university.
+        """
+        universities = list(University.objects.filter(is_active=True).order_by('id')[:university_count])
+        missing = university_count - len(universities)
+        if missing > 0:
+            start = University.objects.count()
+            University.objects.bulk_create([
+                University(
+                    name=f'Synthetic University {start + i}',
+                    short_code=f'SU{start + i}'[:10],
+                    domain=f'su{start + i}.example.edu',
+                )
+                for i in range(missing)
+            ])
+            universities = list(University.objects.filter(is_active=True).order_by('id')[:university_count])
+
+        categories = [EventCategory.objects.get_or_create(name=name)[0] for name in CATEGORY_NAMES]
+
+        venues = {}
+        for venue in Venue.objects.filter(university__in=universities, name__startswith=f'{self.prefix} '):
+            venues.setdefault(venue.university_id, []).append(venue.id)
+        new_venues = [
+            Venue(name=f'{self.prefix} Hall {n}', university=university, capacity=500, features={})
+            for university in universities if university.id not in venues
+            for n in range(VENUES_PER_UNIVERSITY)
+        ]
+        for venue in Venue.objects.bulk_create(new_venues):
+            venues.setdefault(venue.university_id, []).append(venue.id)
+        if any(venue.pk is None for venue in new_venues):
+            venues = {}
+            for venue in Venue.objects.filter(university__in=universities, name__startswith=f'{self.prefix} '):
+                venues.setdefault(venue.university_id, []).append(venue.id)
+        return universities, categories, venues
+
+    def create_users(self, count, organizers, universities):
+        password = make_password(SYNTHETIC_PASSWORD)
+        university_domains = [(university.id, university.domain) for university in universities]
+        chunk = max(self.batch_size * 5, 1)
+        tasks = [
+            (self.prefix, self.seed, start, min(start + chunk, count), organizers,
+             university_domains, password, self.batch_size)
+            for start in range(0, count, chunk)
+        ]
+        return sum(self._map(_insert_users, tasks))
+
+    def load_users(self):
+        """
+        Read back (user_id, university_id, user_type) for this prefix, streaming.
+        """
+        organizers, students, by_university = [], [], {}
+        rows = UserProfile.objects.filter(
+            user__username__startswith=f'{self.prefix}_'
+        ).order_by('user_id').values_list('user_id', 'university_id', 'user_type')
+        for user_id, university_id, user_type in rows.iterator(chunk_size=self.batch_size):
+            if user_type == 'organizer':
+                organizers.append((user_id, university_id))
+            else:
+                students.append(user_id)
+                by_university.setdefault(university_id, []).append(user_id)
+        return organizers, students, by_university
+
+    def plan_events(self, count, registrations, exponent, hot_share, max_event_size, students):
+        """
+        Decide every event's demand up front: Zipf popularity, capped per event.
+        Returns [(demand, is_hot)], hot events being the top hot_share by demand.
+        """
+        rng = chunk_rng(self.seed, 'plan')
+        weights = zipf_weights(count, exponent, rng)
+        demand = allocate(registrations, weights, min(max_event_size, len(students)))
+        hot_cutoff = sorted(demand, reverse=True)[max(int(count * hot_share) - 1, 0)] if count else 0
+        return [(d, d >= hot_cutoff and d > 0) for d in demand]
+
+    def create_events(self, plan, organizers, categories, venues):
+        """
+        bulk_create the events; hot events get fewer seats than demand so waitlists form.
+        Returns registration specs per event for create_registrations.
+        """
+        now = self.base_time
+        specs = []
+        for offset, plan_batch in enumerate(_batched(plan, self.batch_size)):
+            rng = chunk_rng(self.seed, 'events', offset)
+            events, batch_specs = [], []
+            for index, (demand, is_hot) in enumerate(plan_batch, start=offset * self.batch_size):
+                organizer_id, university_id = organizers[rng.randrange(len(organizers))]
+                # Hot events are upcoming and open, which is where the long waitlists are
+                days = rng.uniform(1, 180) if is_hot else rng.uniform(-365, 180)
+                date_time = now + timedelta(days=days, hours=rng.randrange(24))
+                is_past = date_time < now
+                roll = 0 if is_hot else rng.random()
+                if is_past:
+                    status = 'completed' if roll < 0.95 else 'cancelled'
+                else:
+                    status = 'published' if roll < 0.9 else ('draft' if roll < 0.95 else 'cancelled')
+                if status not in ('published', 'completed'):
+                    demand = 0
+                if is_hot:
+                    limit = max(int(demand * rng.uniform(0.4, 0.7)), 1)
+                else:
+                    limit = max(int(demand * rng.uniform(1.0, 1.5)), 20)
+                visibility = rng.choices(['public', 'inter_university', 'university'], [6, 3, 1])[0]
+                events.append(Event(
+                    title=f'{self.prefix} event {index}',
+                    description='Synthetic benchmark event',
+                    date_time=date_time,
+                    venue_id=rng.choice(venues[university_id]),
+                    organizer_id=organizer_id,
+                    host_university_id=university_id,
+                    category=rng.choice(categories),
+                    participant_limit=limit,
+                    visibility=visibility,
+                    status=status,
+                ))
+                batch_specs.append((index, university_id, visibility, is_past, limit, demand))
+            Event.objects.bulk_create(events)
+            if any(event.pk is None for event in events):
+                ids = dict(Event.objects.filter(
+                    title__in=[event.title for event in events]
+                ).values_list('title', 'id'))
+                for event in events:
+                    event.pk = ids[event.title]
+            specs.extend(
+                (event.pk,) + spec for event, spec in zip(events, batch_specs)
+            )
+        return specs
+
+    def create_registrations(self, specs, students, by_university, max_waitlist):
+        global _STUDENTS, _STUDENTS_BY_UNIVERSITY
+        _STUDENTS, _STUDENTS_BY_UNIVERSITY = students, by_university
+        tasks = []
+        chunk, size = [], 0
+        for spec in specs:
+            chunk.append(spec + (max_waitlist,))
+            size += spec[-1]
+            if size >= self.batch_size * 10:
+                tasks.append((self.seed, chunk, self.batch_size))
+                chunk, size = [], 0
+        if chunk:
+            tasks.append((self.seed, chunk, self.batch_size))
+        results = self._map(_insert_registrations, tasks)
+        return sum(r for r, _ in results), sum(w for _, w in results)
+
+    def generate(self, users, organizers, events, registrations, universities,
+                 exponent=1.0, hot_share=0.01, max_event_size=20000, max_waitlist=2000):
+        universities, categories, venues = self._timed(
+            'Reference data ready', self.reference_data, universities
+        )
+        self._timed(f'Created {users} users', self.create_users, users, organizers, universities)
+        organizer_rows, students, by_university = self._timed('Loaded user ids', self.load_users)
+        plan = self.plan_events(events, registrations, exponent, hot_share, max_event_size, students)
+        specs = self._timed(
+            f'Created {events} events', self.create_events, plan, organizer_rows, categories, venues
+        )
+        created, waitlisted = self._timed(
+            'Created registrations', self.create_registrations, specs, students, by_university, max_waitlist
+        )
+        return {
+            'users': users,
+            'events': events,
+            'registrations': created,
+            'waitlist_entries': waitlisted,
+            'hot_events': sum(1 for _, is_hot in plan if is_hot),
+        }
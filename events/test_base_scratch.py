@@ -0,0 +1,28 @@
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.db import connection
+from django.core.cache import cache
+from django.utils import timezone
+from datetime import timedelta
+from django.contrib.auth.models import User
+from rest_framework.test import APIClient
+from events.models import *
+
+class Base(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.uni = University.objects.create(name='U', short_code='U', domain='u.edu')
+        self.org = User.objects.create_user('org', 'o@u.edu', 'pw', first_name='Org')
+        self.org.profile.user_type='organizer'; self.org.profile.university=self.uni; self.org.profile.save()
+        self.venue = Venue.objects.create(name='V', university=self.uni, capacity=10)
+        self.cat = EventCategory.objects.create(name='C')
+        self.c=APIClient(); self.c.force_authenticate(self.org)
+    def ev(self, i, limit=2, status='published', days=1):
+        return Event.objects.create(title=f'E{i}', description='d', date_time=timezone.now()+timedelta(days=days+i), venue=self.venue, organizer=self.org, host_university=self.uni, category=self.cat, participant_limit=limit, status=status)
+    def student(self, name):
+        u=User.objects.create_user(name, f'{name}@u.edu', 'pw')
+        u.profile.university=self.uni; u.profile.save(); return u
+    def q(self, fn):
+        with CaptureQueriesContext(connection) as q:
+            r=fn()
+        return len(q), r
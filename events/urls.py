@@ -13,6 +13,7 @@ router.register(r'waitlist', views.WaitlistEntryViewSet, basename='waitlist')
 router.register(r'attendance', views.AttendanceViewSet, basename='attendance')
 router.register(r'feedback', views.FeedbackViewSet, basename='feedback')
 router.register(r'notifications', views.NotificationViewSet, basename='notification')
+router.register(r'notification-fanouts', views.NotificationFanoutViewSet, basename='notification-fanout')
 
 # Admin routes
 router.register(r'admin/events', views.AdminEventViewSet, basename='admin-event')
@@ -24,7 +25,11 @@ urlpatterns = [
     path('register/', views.register_user, name='register'),
     path('analytics/', views.event_analytics, name='analytics'),
     path('health/', views.health_check, name='health_check'),
+    path('admin/request-timings/', views.request_timings, name='request-timings'),
+    path('metrics/', views.metrics_view, name='metrics'),
+    path('stream/', views.live_updates, name='live-updates'),
     path('student/overview/', views.student_dashboard_overview, name='student-dashboard-overview'),
+    path('student/activity/', views.student_activity_history, name='student-activity-history'),
     path('organizer/dashboard/', views.organizer_dashboard, name='organizer-dashboard'),
     path('organizer/analytics/', views.organizer_analytics, name='organizer-analytics'),
     path('organizer/events/', views.organizer_events, name='organizer-events'),
@@ -34,4 +39,5 @@ urlpatterns = [
     path('organizer/events/<int:event_id>/mark-attendance/', views.organizer_mark_attendance, name='organizer-mark-attendance'),
     path('organizer/create-event/', views.organizer_create_event, name='organizer-create-event'),
     path('organizer/registrations/', views.organizer_registrations, name='organizer-registrations'),
+    path('organizer/export/<str:dataset>/', views.organizer_export, name='organizer-export'),
 ]
@@ -1,13 +1,25 @@
+import logging
 from typing import Optional
 
 from django.core.mail import send_mail
+from django.core.paginator import Paginator, EmptyPage, PageNotAnInteger
 from django.conf import settings
+from django.contrib.auth.models import User
 from django.db import transaction
+from django.db.models import Case, Exists, IntegerField, OuterRef, Q, Value, When
+from django.db.models.functions import Lower
 
 from .models import Notification, WaitlistEntry, Registration, UserProfile, Event
+from .metrics import metrics
+from .pubsub import publish_seat_update
+from .notifications import coalesce_notification, queue_or_replace_email
+
+logger = logging.getLogger(__name__)
+
 def send_email_notification(user, subject, message):
     """
-    Send email notification to user
+    Send a single email to user immediately.
+    Notifications go through the QueuedEmail outbox instead (see events.mailer).
     """
     try:
         if user.email:
@@ -20,21 +32,30 @@ def send_email_notification(user, subject, message):
             )
             return True
     except Exception as e:
-        print(f"Failed to send email: {e}")
+        logger.warning("Failed to send email: %s", e)
     return False
-def send_notification(user, title, message, notification_type, related_event=None):
-    """Utility function to send notifications"""
-    notification = Notification.objects.create(
-        user=user,
-        title=title,
-        message=message,
-        notification_type=notification_type,
-        related_event=related_event
-    )
+def send_notification(user, title, message, notification_type, related_event=None, low_priority=False):
+    """
+    Utility function to send notifications.
+    Repeats for the same user, event and type family within NOTIFICATION_COALESCE_SECONDS
+    update the earlier notification (and its unsent email) instead of adding new ones.
+    """
+    notification = coalesce_notification(user, title, message, notification_type, related_event)
+    if notification is None:
+        notification = Notification.objects.create(
+            user=user,
+            title=title,
+            message=message,
+            notification_type=notification_type,
+            related_event=related_event
+        )
     
-    # Also send email for important notifications
+    # Also email important notifications, via the outbox for batched delivery
     if notification_type in ['registration_confirmation', 'waitlist_promotion', 'event_cancelled']:
-        send_email_notification(user, title, message)
+        queue_or_replace_email(
+            user, title, message, notification_type,
+            related_event=related_event, low_priority=low_priority
+        )
     
     return notification
 
@@ -88,6 +109,8 @@ def promote_from_waitlist(event):
                         event=event,
                         action='promoted'
                     )
+                    publish_seat_update(event.pk)
+                    transaction.on_commit(lambda: metrics.inc('waitlist_promotions_total'))
                     
                     return True
     except Exception as e:
@@ -123,4 +146,84 @@ def get_user_profile(user, create_if_missing: bool = False) -> Optional[UserProf
                 department='',
                 student_id='',
             )
-    return None
\ No newline at end of file
+    return None
+
+
+def parse_id(value):
+    """
+    A positive integer primary key from a query or body value, or None when it isn't one.
+    """
+    try:
+        pk = int(str(value).strip())
+    except (TypeError, ValueError):
+        return None
+    return pk if pk > 0 else None
+
+
+def paginate_queryset(request, queryset, page_param='page', default_page_size=50, max_page_size=200):
+    """
+    Slice a queryset for a function-based view using ?<page_param>=N&page_size=M.
+    Returns (page_object_list, pagination_metadata).
+    """
+    try:
+        page_size = int(request.query_params.get('page_size', default_page_size))
+    except (TypeError, ValueError):
+        page_size = default_page_size
+    page_size = max(1, min(page_size, max_page_size))
+
+    paginator = Paginator(queryset, page_size)
+    try:
+        page = paginator.page(request.query_params.get(page_param, 1))
+    except PageNotAnInteger:
+        page = paginator.page(1)
+    except EmptyPage:
+        page = paginator.page(paginator.num_pages)
+
+    return page.object_list, {
+        'page': page.number,
+        'page_size': page_size,
+        'total_pages': paginator.num_pages,
+        'count': paginator.count,
+        'has_next': page.has_next(),
+        'has_previous': page.has_previous(),
+    }
+
+
+def users_by_lower(username=None, email=None):
+    """
+    Users whose LOWER(username) or LOWER(email) equals the given value, in one query
+    served by the expression indexes from migration 0019 (iexact compiles to UPPER()
+    on PostgreSQL and can't use them).
+    """
+    condition = Q()
+    if username:
+        condition |= Q(username_lower=username.lower())
+    if email:
+        condition |= Q(email_lower=email.lower())
+    return User.objects.alias(
+        username_lower=Lower('username'),
+        email_lower=Lower('email'),
+    ).filter(condition)
+
+
+def find_login_user(identifier):
+    """
+    Resolve a login identifier that may be an email or a username, case-insensitively.
+    An email match wins over a username match.
+    """
+    if not identifier:
+        return None
+    return users_by_lower(username=identifier, email=identifier).order_by(
+        Case(When(email_lower=identifier.lower(), then=Value(0)), default=Value(1), output_field=IntegerField()),
+        'id'
+    ).first()
+
+
+def find_registration_conflicts(username, email):
+    """
+    Existing users clashing with a new username or email, each annotated with
+    has_profile, fetched in a single query.
+    """
+    return list(users_by_lower(username=username, email=email).annotate(
+        has_profile=Exists(UserProfile.objects.filter(user=OuterRef('pk')))
+    ))
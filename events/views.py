@@ -1,22 +1,84 @@
-from django.http import JsonResponse
-from rest_framework import viewsets, status, permissions
+import asyncio
+import csv
+import io
+import json
+import os
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.handlers.asgi import ASGIRequest
+from django.http import HttpResponse, JsonResponse, StreamingHttpResponse
+from django.utils.crypto import constant_time_compare
+from django.core.serializers.json import DjangoJSONEncoder
+from rest_framework import viewsets, status, permissions, mixins
 from rest_framework.decorators import action, api_view, permission_classes
 from rest_framework.response import Response
+from rest_framework.pagination import CursorPagination
+from rest_framework.parsers import MultiPartParser
 from rest_framework.permissions import IsAuthenticated, IsAdminUser, AllowAny
 from rest_framework.exceptions import ValidationError
-from rest_framework_simplejwt.views import TokenObtainPairView
-from rest_framework_simplejwt.serializers import TokenObtainPairSerializer
-from django.db.models import Q, Count, F
+from rest_framework.exceptions import AuthenticationFailed, ParseError
+from rest_framework_simplejwt.exceptions import InvalidToken
+from rest_framework_simplejwt.views import TokenObtainPairView, TokenRefreshView
+from rest_framework_simplejwt.serializers import TokenObtainPairSerializer, TokenRefreshSerializer
+from rest_framework_simplejwt.tokens import RefreshToken
+from django.db.models import Q, Count, F, Exists, OuterRef, Subquery, Prefetch
+from django.db.models.functions import Coalesce
 from django.db import transaction
 from django.contrib.auth.models import User
-from django.contrib.auth import get_user_model
 from django.db import IntegrityError
 from django.core.exceptions import ValidationError as DjangoValidationError
 from datetime import datetime, timedelta
 from django.utils import timezone
 from .models import *
 from .serializers import *
-from .utils import send_notification, promote_from_waitlist, get_user_profile
+from .utils import (
+    send_notification,
+    promote_from_waitlist,
+    paginate_queryset,
+    parse_id,
+    find_login_user,
+    find_registration_conflicts,
+)
+from .caching import (
+    get_organizer_dashboard,
+    get_student_overview,
+    get_recent_activities,
+    RECENT_ACTIVITY_LIMIT,
+)
+from .exports import EXPORTS, stream_csv
+from .imports import StudentImport, check_columns
+from .archive import registration_history, activity_history
+from .authentication import (
+    FINGERPRINT_CLAIM,
+    ClaimsJWTAuthentication,
+    add_role_claims,
+    check_fingerprint,
+    revoke_user_tokens,
+)
+from .identity import get_identity, user_role
+from .query_budget import query_budget
+from .instrumentation import route_timings
+from .metrics import CONTENT_TYPE as METRICS_CONTENT_TYPE, metrics, render_metrics
+from .pubsub import broker, user_channel, event_channel, publish_seat_update
+from .notifications import (
+    event_change_snapshot,
+    broadcast_event_changes,
+    get_unread_count,
+    increment_unread,
+    decrement_unread,
+)
+
+# Events fetched (with their prefetched registrations) per round-trip when streaming reports
+REPORT_STREAM_CHUNK_SIZE = 50
+
+# Registrations attendance can be marked for; complete_past_events marks anyone not yet
+# checked in as no_show, and a late check-in still turns that into attended
+ATTENDANCE_MARKABLE_STATUSES = ['registered', 'attended', 'no_show']
+
+# SSE client reconnect delay and idle keep-alive interval
+SSE_RETRY_MS = 5000
+SSE_HEARTBEAT_SECONDS = 15
 
 @api_view(['GET'])
 @permission_classes([AllowAny])
@@ -30,37 +92,86 @@ def health_check(request):
         'frontend': 'https://evex-frontend-h44f.vercel.app',
         'timestamp': timezone.now().isoformat()
     })
+
+@api_view(['GET', 'POST'])
+@permission_classes([IsAdminUser])
+def request_timings(request):
+    """
+    Per-route latency, DB time and query count histograms of this worker process
+    (see events.instrumentation). POST returns them and starts a fresh window.
+    """
+    snapshot = route_timings.snapshot()
+    if request.method == 'POST':
+        route_timings.reset()
+    routes = sorted(snapshot.items(), key=lambda item: item[1]['total_ms']['sum'], reverse=True)
+    return Response({'pid': os.getpid(), 'routes': dict(routes)})
+
+
+def registration_outcome(response):
+    """
+    registered / waitlisted / clash / rejected / error label of a register response.
+    """
+    if response.status_code == status.HTTP_201_CREATED:
+        return 'registered'
+    if response.status_code >= 500:
+        return 'error'
+    if response.data.get('status') == 'added_to_waitlist':
+        return 'waitlisted'
+    if str(response.data.get('error', '')).startswith('Time clash'):
+        return 'clash'
+    return 'rejected'
+
+
+def metrics_view(request):
+    """
+    Prometheus metrics (text format), summed over all workers sharing METRICS_MULTIPROC_DIR.
+    Needs `Authorization: Bearer <METRICS_TOKEN>`; without a configured token only in DEBUG.
+    """
+    token = settings.METRICS_TOKEN
+    if token:
+        if not constant_time_compare(request.headers.get('Authorization', ''), f'Bearer {token}'):
+            return HttpResponse('Unauthorized\n', status=401, content_type='text/plain')
+    elif not settings.DEBUG:
+        return HttpResponse('Not found\n', status=404, content_type='text/plain')
+    return HttpResponse(render_metrics(), content_type=METRICS_CONTENT_TYPE)
+
+def _id_param(name, value):
+    """
+    parse_id for queryset filters: a non-integer id is a 400, not a 500 from the ORM.
+    """
+    pk = parse_id(value)
+    if pk is None:
+        raise ParseError(f'{name} must be a positive integer id.')
+    return pk
+
+
 # Move IsOrganizerOrAdmin to the top, before any functions that use it
 class IsOrganizerOrAdmin(permissions.BasePermission):
     def has_permission(self, request, view):
         if not request.user.is_authenticated:
             return False
-        user_profile = get_user_profile(request.user, create_if_missing=True)
-        if not user_profile:
-            return False
-        return user_profile.user_type in ['organizer', 'admin'] or request.user.is_staff
+        if request.user.is_staff:
+            return True
+        # Answered from the token claims when present, so no query on the hot path
+        user_type, _ = user_role(request)
+        return user_type in ['organizer', 'admin']
 
 
 class UsernameOrEmailTokenObtainPairSerializer(TokenObtainPairSerializer):
     """
     Extends the default SimpleJWT serializer to accept either username or email.
+    Issued tokens carry the user's role claims (see events.authentication).
     """
 
+    @classmethod
+    def get_token(cls, user):
+        return add_role_claims(super().get_token(user), user)
+
     def validate(self, attrs):
         identifier = attrs.get(self.username_field)
         if identifier:
-            UserModel = get_user_model()
-
-            # Try to resolve the identifier to a username using email or case-insensitive username lookup
-            user_lookup = None
-            try:
-                user_lookup = UserModel.objects.get(email__iexact=identifier)
-            except UserModel.DoesNotExist:
-                try:
-                    user_lookup = UserModel.objects.get(username__iexact=identifier)
-                except UserModel.DoesNotExist:
-                    user_lookup = None
-
+            # Resolve the identifier (email or case-insensitive username) in one indexed query
+            user_lookup = find_login_user(identifier)
             if user_lookup:
                 attrs[self.username_field] = user_lookup.get_username()
 
@@ -70,6 +181,22 @@ class UsernameOrEmailTokenObtainPairSerializer(TokenObtainPairSerializer):
 class UsernameOrEmailTokenObtainPairView(TokenObtainPairView):
     serializer_class = UsernameOrEmailTokenObtainPairSerializer
 
+
+class ClaimsTokenRefreshSerializer(TokenRefreshSerializer):
+    """
+    Refuses to refresh revoked tokens, so a role change forces a fresh login.
+    """
+
+    def validate(self, attrs):
+        refresh = RefreshToken(attrs['refresh'])
+        if FINGERPRINT_CLAIM in refresh:
+            check_fingerprint(refresh)
+        return super().validate(attrs)
+
+
+class ClaimsTokenRefreshView(TokenRefreshView):
+    serializer_class = ClaimsTokenRefreshSerializer
+
 # Add this registration function
 @api_view(['POST'])
 @permission_classes([AllowAny])
@@ -89,38 +216,20 @@ def register_user(request):
                     status=status.HTTP_400_BAD_REQUEST
                 )
         
-        # Check if username already exists (case-insensitive)
-        existing_user_by_username = User.objects.filter(username__iexact=data['username']).first()
-        deleted_username_user_id = None
-        if existing_user_by_username:
-            # Check if this user has a profile by querying UserProfile directly
-            has_profile = UserProfile.objects.filter(user=existing_user_by_username).exists()
-            if has_profile:
+        # Check if username or email already exists (case-insensitive), in one query
+        conflicts = find_registration_conflicts(data['username'], data['email'])
+        for field, label in (('username', 'Username'), ('email', 'Email')):
+            value = str(data[field]).lower()
+            if any(user.has_profile and getattr(user, field).lower() == value for user in conflicts):
                 return Response(
-                    {'error': 'Username already exists'}, 
+                    {'error': f'{label} already exists'}, 
                     status=status.HTTP_400_BAD_REQUEST
                 )
-            else:
-                # User exists but has no profile - we can delete this orphaned user
-                deleted_username_user_id = existing_user_by_username.id
-                existing_user_by_username.delete()
         
-        # Check if email already exists (case-insensitive)
-        # Note: We check again in case it's a different user with the same email
-        existing_user_by_email = User.objects.filter(email__iexact=data['email']).first()
-        if existing_user_by_email:
-            # Check if this user has a profile by querying UserProfile directly
-            has_profile = UserProfile.objects.filter(user=existing_user_by_email).exists()
-            if has_profile:
-                return Response(
-                    {'error': 'Email already exists'}, 
-                    status=status.HTTP_400_BAD_REQUEST
-                )
-            else:
-                # User exists but has no profile - we can delete this orphaned user
-                # Only delete if it's not the same user we already deleted above
-                if existing_user_by_email.id != deleted_username_user_id:
-                    existing_user_by_email.delete()
+        # Users without a profile are orphans left by failed sign-ups - we can delete them
+        orphan_ids = [user.id for user in conflicts if not user.has_profile]
+        if orphan_ids:
+            User.objects.filter(id__in=orphan_ids).delete()
         
         # For students, university is optional (can be set later in profile)
         # For organizers and admins, university is required
@@ -274,129 +383,151 @@ def event_analytics(request):
     })
 
 # Add Organizer Dashboard Endpoint
+@query_budget(4)
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
 def student_dashboard_overview(request):
     """
-    Dashboard overview for students - returns recent activity and stats
+    Dashboard overview for students - returns recent activity and stats (cached per user)
     """
     user = request.user
+    payload = get_student_overview(user.id, lambda: _build_student_overview(user))
+    return Response(payload)
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def student_activity_history(request):
+    """
+    Full activity feed for the current user, including archived activity of past events
+    """
+    history, pagination = paginate_queryset(request, activity_history(request.user))
+    return Response({'results': list(history), 'pagination': pagination})
+
+
+def _build_student_overview(user):
+    # Most recent activities, served from the bounded per-user activity cache
+    recent_activities = get_recent_activities(
+        user.id,
+        lambda: RecentActivitySerializer(
+            RecentActivity.objects.filter(
+                user=user
+            ).select_related('event', 'user').order_by('-timestamp')[:RECENT_ACTIVITY_LIMIT],
+            many=True
+        ).data
+    )
     
-    # Get 5 most recent activities
-    recent_activities = RecentActivity.objects.filter(
-        user=user
-    ).select_related('event', 'user').order_by('-timestamp')[:5]
-    
-    # Get user's registrations for stats
-    registrations = Registration.objects.filter(user=user).select_related('event')
-    
-    # Calculate stats
+    # Calculate stats in a single conditional aggregate
     now = timezone.now()
-    upcoming_count = registrations.filter(
-        status='registered',
-        event__date_time__gte=now
-    ).count()
-    
-    attended_count = registrations.filter(status='attended').count()
-    
-    total_registrations = registrations.count()
+    stats = Registration.objects.filter(user=user).aggregate(
+        total_registrations=Count('pk'),
+        attended_count=Count('pk', filter=Q(status='attended')),
+        upcoming_count=Count('pk', filter=Q(status='registered', event__date_time__gte=now)),
+    )
+    total_registrations = stats['total_registrations']
+    attended_count = stats['attended_count']
     attendance_rate = round((attended_count / total_registrations * 100) if total_registrations > 0 else 0)
     
-    # Serialize recent activities
-    activity_serializer = RecentActivitySerializer(recent_activities, many=True)
-    
-    return Response({
-        'recent_activities': activity_serializer.data,
+    return {
+        'recent_activities': recent_activities,
         'stats': {
-            'upcoming_events': upcoming_count,
+            'upcoming_events': stats['upcoming_count'],
             'events_attended': attended_count,
             'attendance_rate': f"{attendance_rate}%",
             'total_registrations': total_registrations,
         }
-    })
+    }
 
+@query_budget(6)
 @api_view(['GET'])
 @permission_classes([IsOrganizerOrAdmin])
 def organizer_dashboard(request):
     """
-    Dashboard data for organizers
+    Dashboard data for organizers (cached per organizer, see events.caching)
     """
     user = request.user
-    # Get organizer's events
+    payload = get_organizer_dashboard(user.id, lambda: _build_organizer_dashboard(user))
+    return Response(payload)
+
+
+def _build_organizer_dashboard(user):
+    """
+    Build the organizer dashboard in a constant number of queries.
+    """
+    now = timezone.now()
     organizer_events = Event.objects.filter(organizer=user)
-    total_events = organizer_events.count()
-    published_events = organizer_events.filter(status='published').count()
-    draft_events = organizer_events.filter(status='draft').count()
-    
-    # Registration stats for organizer's events
-    total_registrations = Registration.objects.filter(
-        event__organizer=user, 
-        status='registered'
-    ).count()
-    
-    # Recent events (last 7 days)
-    seven_days_ago = datetime.now() - timedelta(days=7)
-    recent_registrations = Registration.objects.filter(
-        event__organizer=user,
-        registered_at__gte=seven_days_ago
-    ).count()
-    
+
+    # Per-event capacity figures as correlated subqueries so one aggregate covers every count
+    active_registrations = Registration.objects.filter(
+        event=OuterRef('pk'),
+        status__in=['registered', 'attended']
+    ).order_by().values('event').annotate(total=Count('pk')).values('total')
+    event_stats = organizer_events.annotate(
+        active_count=Coalesce(Subquery(active_registrations), 0),
+        has_waitlist=Exists(WaitlistEntry.objects.filter(event=OuterRef('pk'))),
+    ).aggregate(
+        total_events=Count('pk'),
+        published_events=Count('pk', filter=Q(status='published')),
+        draft_events=Count('pk', filter=Q(status='draft')),
+        open_events=Count('pk', filter=Q(
+            participant_limit__isnull=False,
+            active_count__lt=F('participant_limit')
+        )),
+        full_events_count=Count('pk', filter=Q(
+            participant_limit__isnull=False,
+            active_count__gte=F('participant_limit'),
+            has_waitlist=True
+        )),
+    )
+
+    # Registration stats for organizer's events (total and last 7 days)
+    seven_days_ago = now - timedelta(days=7)
+    registration_stats = Registration.objects.filter(event__organizer=user).aggregate(
+        total_registrations=Count('pk', filter=Q(status='registered')),
+        recent_registrations=Count('pk', filter=Q(registered_at__gte=seven_days_ago)),
+    )
+
     # Upcoming events
     upcoming_events = organizer_events.filter(
-        date_time__gte=datetime.now(),
+        date_time__gte=now,
         status='published'
-    ).order_by('date_time')[:5]
-    
-    upcoming_events_data = EventSerializer(upcoming_events, many=True).data
-    
-    # Annotate registration counts to determine capacity status
-    annotated_events = organizer_events.annotate(
-        reg_count=Count('registration')
-    )
-    full_events_with_waitlist = annotated_events.filter(
-        participant_limit__isnull=False,
-        reg_count__gte=F('participant_limit')
-    ).annotate(
-        waitlist_count=Count('waitlistentry')
-    ).filter(waitlist_count__gt=0)
-    open_events = annotated_events.filter(
-        participant_limit__isnull=False,
-        reg_count__lt=F('participant_limit')
-    )
-    
-    return Response({
+    ).select_related(
+        'organizer', 'host_university', 'venue', 'category'
+    ).prefetch_related('allowed_universities').with_registration_counts().order_by('date_time')[:5]
+
+    return {
         'overview': {
-            'total_events': total_events,
-            'published_events': published_events,
-            'draft_events': draft_events,
-            'total_registrations': total_registrations,
-            'recent_registrations': recent_registrations,
-            'open_events': open_events.count(),
+            'total_events': event_stats['total_events'],
+            'published_events': event_stats['published_events'],
+            'draft_events': event_stats['draft_events'],
+            'total_registrations': registration_stats['total_registrations'],
+            'recent_registrations': registration_stats['recent_registrations'],
+            'open_events': event_stats['open_events'],
         },
-        'upcoming_events': upcoming_events_data,
-        'full_events_count': full_events_with_waitlist.count(),
-    })
+        'upcoming_events': EventSerializer(upcoming_events, many=True).data,
+        'full_events_count': event_stats['full_events_count'],
+    }
 
+@query_budget(7)
 @api_view(['GET'])
 @permission_classes([IsOrganizerOrAdmin])
 def organizer_analytics(request):
     """
-    Get analytics and notifications for organizer's events
+    Get analytics and notifications for organizer's events.
+    Notifications and waitlist are paginated via ?notifications_page= / ?waitlist_page= (and ?page_size=).
     """
     user = request.user
-    from django.db.models import Count, Q, F
-    from datetime import datetime, timedelta
-    
-    # Get organizer's events
-    organizer_events = Event.objects.filter(organizer=user)
     
     # Get notifications related to organizer's events
     notifications = Notification.objects.filter(
         related_event__organizer=user
-    ).select_related('related_event', 'user').order_by('-created_at')[:50]
+    ).select_related('related_event', 'user').order_by('-created_at', '-id')
+    notification_page, notification_pagination = paginate_queryset(
+        request, notifications, page_param='notifications_page'
+    )
     
     notification_data = []
-    for notif in notifications:
+    for notif in notification_page:
         notification_data.append({
             'id': notif.id,
             'title': notif.title,
@@ -410,75 +541,58 @@ def organizer_analytics(request):
             'user_email': notif.user.email,
         })
     
-    # Get waitlist entries for full events
-    full_events = organizer_events.annotate(
-        reg_count=Count('registration', filter=Q(registration__status='registered'))
+    # Waitlist entries for all full events in one query (full = registered count reached the limit)
+    registered_for_event = Registration.objects.filter(
+        event=OuterRef('event'),
+        status='registered'
+    ).order_by().values('event').annotate(total=Count('pk')).values('total')
+    waitlist_entries = WaitlistEntry.objects.filter(
+        event__organizer=user,
+        event__participant_limit__isnull=False
+    ).annotate(
+        event_registered_count=Coalesce(Subquery(registered_for_event), 0)
     ).filter(
-        participant_limit__isnull=False,
-        reg_count__gte=F('participant_limit')
+        event_registered_count__gte=F('event__participant_limit')
+    ).select_related('event', 'user__profile__university').order_by('event_id', 'position')
+    waitlist_page, waitlist_pagination = paginate_queryset(
+        request, waitlist_entries, page_param='waitlist_page'
     )
     
     waitlist_data = []
-    for event in full_events:
-        waitlist_entries = WaitlistEntry.objects.filter(
-            event=event
-        ).select_related('user__profile').order_by('position')
-        
-        for entry in waitlist_entries:
-            profile = getattr(entry.user, 'profile', None)
-            waitlist_data.append({
-                'event_id': event.id,
-                'event_title': event.title,
-                'user_id': entry.user.id,
-                'user_name': entry.user.get_full_name() or entry.user.username,
-                'user_email': entry.user.email,
-                'position': entry.position,
-                'university': profile.university.name if (profile and profile.university) else None,
-                'contact_number': getattr(profile, 'contact_number', '') if profile else '',
-            })
-    
-    # Registration and cancellation stats
-    total_registrations = Registration.objects.filter(
-        event__organizer=user,
-        status='registered'
-    ).count()
-    
-    total_cancellations = Registration.objects.filter(
-        event__organizer=user,
-        status='cancelled'
-    ).count()
-    
-    total_attended = Registration.objects.filter(
-        event__organizer=user,
-        status='attended'
-    ).count()
-    
-    # Recent activity (last 7 days)
-    seven_days_ago = datetime.now() - timedelta(days=7)
-    recent_registrations = Registration.objects.filter(
-        event__organizer=user,
-        status='registered',
-        registered_at__gte=seven_days_ago
-    ).count()
+    for entry in waitlist_page:
+        profile = getattr(entry.user, 'profile', None)
+        waitlist_data.append({
+            'event_id': entry.event.id,
+            'event_title': entry.event.title,
+            'user_id': entry.user.id,
+            'user_name': entry.user.get_full_name() or entry.user.username,
+            'user_email': entry.user.email,
+            'position': entry.position,
+            'university': profile.university.name if (profile and profile.university) else None,
+            'contact_number': getattr(profile, 'contact_number', '') if profile else '',
+        })
     
-    recent_cancellations = Registration.objects.filter(
-        event__organizer=user,
-        status='cancelled',
-        registered_at__gte=seven_days_ago
-    ).count()
+    # Registration, cancellation and recent activity (last 7 days) stats in one aggregate
+    seven_days_ago = timezone.now() - timedelta(days=7)
+    stats = Registration.objects.filter(event__organizer=user).aggregate(
+        total_registrations=Count('pk', filter=Q(status='registered')),
+        total_cancellations=Count('pk', filter=Q(status='cancelled')),
+        total_attended=Count('pk', filter=Q(status='attended')),
+        recent_registrations=Count('pk', filter=Q(status='registered', registered_at__gte=seven_days_ago)),
+        recent_cancellations=Count('pk', filter=Q(status='cancelled', registered_at__gte=seven_days_ago)),
+    )
     
     return Response({
-        'stats': {
-            'total_registrations': total_registrations,
-            'total_cancellations': total_cancellations,
-            'total_attended': total_attended,
-            'recent_registrations': recent_registrations,
-            'recent_cancellations': recent_cancellations,
-        },
+        'stats': stats,
         'notifications': notification_data,
         'waitlist': waitlist_data,
+        'pagination': {
+            'notifications': notification_pagination,
+            'waitlist': waitlist_pagination,
+        },
     })
 
+@query_budget(3)
 @api_view(['GET'])
 @permission_classes([IsOrganizerOrAdmin])
 def organizer_events(request):
@@ -486,8 +600,8 @@ def organizer_events(request):
     List all events (including drafts) for the authenticated organizer
     """
     events = Event.objects.filter(
-        organizer=request.user
-    ).select_related('venue', 'host_university', 'category').order_by('-created_at')
+        organizer_id=request.user.id
+    ).for_serializer(request.user).order_by('-created_at')
     
     serializer = EventSerializer(events, many=True, context={'request': request})
     return Response(serializer.data)
@@ -512,9 +626,15 @@ def organizer_mark_attendance(request, event_id):
             {'error': 'user_id is required'},
             status=status.HTTP_400_BAD_REQUEST
         )
+    user_pk = parse_id(user_id)
+    if user_pk is None:
+        return Response(
+            {'error': 'user_id must be a positive integer'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
     
     try:
-        user_to_mark = User.objects.get(id=user_id)
+        user_to_mark = User.objects.get(id=user_pk)
     except User.DoesNotExist:
         return Response(
             {'error': 'User not found'},
@@ -525,7 +645,7 @@ def organizer_mark_attendance(request, event_id):
     registration = Registration.objects.filter(
         event=event,
         user=user_to_mark,
-        status__in=['registered', 'attended']
+        status__in=ATTENDANCE_MARKABLE_STATUSES
     ).first()
     
     if not registration:
@@ -579,73 +699,154 @@ def organizer_event_attendance(request, event_id):
     serializer = AttendanceSerializer(attendances, many=True, context={'request': request})
     return Response(serializer.data)
 
+def _report_user(user):
+    profile = getattr(user, 'profile', None)
+    return {
+        'id': user.id,
+        'name': user.get_full_name() or user.username,
+        'email': user.email,
+        'university': profile.university.name if (profile and profile.university) else None,
+        'contact_number': getattr(profile, 'contact_number', '') if profile else '',
+    }
+
+
+def _organizer_report_events(user):
+    """
+    Organizer's events with registrations and waitlist prefetched into report_* attributes.
+    """
+    return Event.objects.filter(
+        organizer=user
+    ).select_related('venue').prefetch_related(
+        Prefetch(
+            'registration_set',
+            queryset=Registration.objects.select_related('user__profile__university').order_by('-registered_at'),
+            to_attr='report_registrations'
+        ),
+        Prefetch(
+            'waitlistentry_set',
+            queryset=WaitlistEntry.objects.select_related('user__profile__university').order_by('position'),
+            to_attr='report_waitlist'
+        ),
+    ).order_by('date_time', 'id')
+
+
+def _event_registration_report(event):
+    """
+    Build one event's report purely from the prefetched report_* lists.
+    """
+    registrations = event.report_registrations
+    registered_count = sum(1 for reg in registrations if reg.status == 'registered')
+    attended_count = sum(1 for reg in registrations if reg.status == 'attended')
+    is_full = (
+        event.participant_limit is not None
+        and registered_count + attended_count >= event.participant_limit
+    )
+
+    registration_data = [{
+        'id': reg.id,
+        'status': reg.status,
+        'registered_at': reg.registered_at,
+        'user': _report_user(reg.user),
+    } for reg in registrations]
+
+    # Waitlist entries are only reported once the event is full
+    waitlist_data = []
+    if is_full:
+        waitlist_data = [{
+            'id': entry.id,
+            'position': entry.position,
+            'joined_at': entry.joined_at,
+            'user': _report_user(entry.user),
+        } for entry in event.report_waitlist]
+
+    return {
+        'id': event.id,
+        'title': event.title,
+        'date_time': event.date_time,
+        'venue_name': event.venue.name if event.venue else None,
+        'participant_limit': event.participant_limit,
+        'registered_count': registered_count,
+        'attended_count': attended_count,
+        'status': event.status,
+        'is_full': is_full,
+        'registrations': registration_data,
+        'waitlist': waitlist_data,
+    }
+
+
+def _stream_registration_reports(events, chunk_size=REPORT_STREAM_CHUNK_SIZE):
+    # iterator(chunk_size=...) runs the prefetches once per chunk, keeping memory bounded
+    for event in events.iterator(chunk_size=chunk_size):
+        yield json.dumps(_event_registration_report(event), cls=DjangoJSONEncoder) + '\n'
+
+
+@query_budget(6)
 @api_view(['GET'])
 @permission_classes([IsOrganizerOrAdmin])
 def organizer_registrations(request):
     """
-    Return registrations and attendance data for the organizer's events
+    Return registrations and attendance data for the organizer's events.
+    Paginated with ?page=&page_size=, narrowed with ?event_id=, or streamed
+    one event per line with ?stream=ndjson.
     """
-    events = Event.objects.filter(
-        organizer=request.user
-    ).select_related('venue').prefetch_related('registration_set__user__profile', 'waitlistentry_set__user__profile').order_by('date_time')
-    
-    response_data = []
-    for event in events:
-        registrations = list(
-            event.registration_set.select_related('user__profile').order_by('-registered_at')
+    events = _organizer_report_events(request.user)
+
+    event_id = request.query_params.get('event_id')
+    if event_id:
+        event_pk = parse_id(event_id)
+        if event_pk is None:
+            return Response(
+                {'error': 'event_id must be a positive integer'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        events = events.filter(id=event_pk)
+
+    if request.query_params.get('stream') == 'ndjson':
+        return StreamingHttpResponse(
+            _stream_registration_reports(events),
+            content_type='application/x-ndjson'
         )
-        attended_count = sum(1 for reg in registrations if reg.status == 'attended')
-        registration_data = []
-        for reg in registrations:
-            profile = getattr(reg.user, 'profile', None)
-            university_name = profile.university.name if (profile and profile.university) else None
-            registration_data.append({
-                'id': reg.id,
-                'status': reg.status,
-                'registered_at': reg.registered_at,
-                'user': {
-                    'id': reg.user.id,
-                    'name': reg.user.get_full_name() or reg.user.username,
-                    'email': reg.user.email,
-                    'university': university_name,
-                    'contact_number': getattr(profile, 'contact_number', '') if profile else '',
-                }
-            })
-        
-        # Get waitlist entries if event is full
-        waitlist_data = []
-        if event.is_full:
-            waitlist_entries = event.waitlistentry_set.select_related('user__profile').order_by('position')
-            for entry in waitlist_entries:
-                profile = getattr(entry.user, 'profile', None)
-                waitlist_data.append({
-                    'id': entry.id,
-                    'position': entry.position,
-                    'joined_at': entry.joined_at,
-                    'user': {
-                        'id': entry.user.id,
-                        'name': entry.user.get_full_name() or entry.user.username,
-                        'email': entry.user.email,
-                        'university': profile.university.name if (profile and profile.university) else None,
-                        'contact_number': getattr(profile, 'contact_number', '') if profile else '',
-                    }
-                })
-        
-        response_data.append({
-            'id': event.id,
-            'title': event.title,
-            'date_time': event.date_time,
-            'venue_name': event.venue.name if event.venue else None,
-            'participant_limit': event.participant_limit,
-            'registered_count': event.registered_count,
-            'attended_count': attended_count,
-            'status': event.status,
-            'is_full': event.is_full,
-            'registrations': registration_data,
-            'waitlist': waitlist_data,
-        })
-    
-    return Response({'events': response_data})
+
+    page_events, pagination = paginate_queryset(request, events, default_page_size=20, max_page_size=100)
+    response_data = [_event_registration_report(event) for event in page_events]
+
+    return Response({'events': response_data, 'pagination': pagination})
+
+
+@api_view(['GET'])
+@permission_classes([IsOrganizerOrAdmin])
+def organizer_export(request, dataset):
+    """
+    Stream a CSV export (registrations, attendance or feedback) for the organizer's events.
+    Optionally narrowed to one event with ?event_id=
+    """
+    if dataset not in EXPORTS:
+        return Response(
+            {'error': f'Unknown export. Must be one of: {", ".join(EXPORTS)}'},
+            status=status.HTTP_404_NOT_FOUND
+        )
+
+    events = Event.objects.filter(organizer=request.user)
+    event_id = request.query_params.get('event_id')
+    filename = f'{dataset}.csv'
+    if event_id:
+        event_pk = parse_id(event_id)
+        if event_pk is None:
+            return Response(
+                {'error': 'event_id must be a positive integer'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        events = events.filter(id=event_pk)
+        if not events.exists():
+            return Response(
+                {'error': 'Event not found or you do not have permission'},
+                status=status.HTTP_404_NOT_FOUND
+            )
+        filename = f'event-{event_pk}-{dataset}.csv'
+
+    response = StreamingHttpResponse(stream_csv(dataset, events.values('id')), content_type='text/csv')
+    response['Content-Disposition'] = f'attachment; filename="{filename}"'
+    return response
 
 
 @api_view(['GET'])
@@ -671,7 +872,7 @@ def organizer_update_event(request, event_id):
     Update an event for the authenticated organizer
     """
     try:
-        event = Event.objects.get(id=event_id, organizer=request.user)
+        event = Event.objects.get(id=event_id, organizer_id=request.user.id)
     except Event.DoesNotExist:
         return Response(
             {'error': 'Event not found or you do not have permission to edit it'},
@@ -679,12 +880,13 @@ def organizer_update_event(request, event_id):
         )
 
     data = request.data
-    profile = get_user_profile(request.user, create_if_missing=False)
+    profile = get_identity(request).profile
     if not profile or not profile.university:
         return Response(
             {'error': 'Please set your university in your profile settings'},
             status=status.HTTP_400_BAD_REQUEST
         )
+    previous = event_change_snapshot(event)
 
     # Update basic fields
     if 'title' in data:
@@ -745,6 +947,7 @@ def organizer_update_event(request, event_id):
         event.venue = venue
 
     event.save()
+    broadcast_event_changes(event, previous)
     serializer = EventSerializer(event, context={'request': request})
     return Response(serializer.data)
 
@@ -755,7 +958,7 @@ def organizer_create_event(request):
     Create a new event using simplified organizer form data.
     """
     data = request.data
-    profile = get_user_profile(request.user, create_if_missing=True)
+    profile = get_identity(request).get_profile(create_if_missing=True)
 
     if not profile or not profile.university:
         return Response(
@@ -845,6 +1048,52 @@ def organizer_create_event(request):
     serializer = EventSerializer(event, context={'request': request})
     return Response(serializer.data, status=status.HTTP_201_CREATED)
 
+async def live_updates(request):
+    """
+    Server-Sent Events stream of the user's new notifications and seat counts for
+    ?events=1,2,3. EventSource can't send headers, so the JWT may be passed as ?token=.
+    Must be served through event_backend.asgi to hold connections without a worker each.
+    """
+    if not isinstance(request, ASGIRequest):
+        # WSGI buffers the whole (endless) stream, pinning a worker while delivering nothing
+        return JsonResponse({'error': 'Live updates are only served by the ASGI application.'}, status=501)
+    authenticator = ClaimsJWTAuthentication()
+    raw_token = request.GET.get('token')
+    if not raw_token:
+        header = authenticator.get_header(request)
+        raw_token = authenticator.get_raw_token(header) if header else None
+    if not raw_token:
+        return JsonResponse({'error': 'Authentication credentials were not provided.'}, status=401)
+    try:
+        validated_token = authenticator.get_validated_token(raw_token)
+        user = await sync_to_async(authenticator.get_user)(validated_token)
+    except (InvalidToken, AuthenticationFailed):
+        return JsonResponse({'error': 'Given token not valid'}, status=401)
+
+    channels = [user_channel(user.id)]
+    for event_id in request.GET.get('events', '').split(','):
+        if event_id.strip().isdigit():
+            channels.append(event_channel(int(event_id)))
+
+    async def stream():
+        subscription = broker.subscribe(channels)
+        try:
+            yield f'retry: {SSE_RETRY_MS}\n\n'
+            while True:
+                try:
+                    event, data = await asyncio.wait_for(subscription.queue.get(), SSE_HEARTBEAT_SECONDS)
+                except asyncio.TimeoutError:
+                    yield ': keep-alive\n\n'
+                    continue
+                yield f'event: {event}\ndata: {data}\n\n'
+        finally:
+            broker.unsubscribe(subscription)
+
+    response = StreamingHttpResponse(stream(), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'
+    return response
+
 # Your existing ViewSets continue below...
 class UniversityViewSet(viewsets.ModelViewSet):
     queryset = University.objects.filter(is_active=True)
@@ -868,23 +1117,27 @@ class UserProfileViewSet(viewsets.ModelViewSet):
     @action(detail=False, methods=['get'])
     def me(self, request):
         """Get current user with profile"""
-        try:
-            profile = UserProfile.objects.get(user=request.user)
-            user_serializer = UserSerializer(request.user)
-            profile_serializer = UserProfileSerializer(profile)
-            return Response({
-                'user': user_serializer.data,
-                'profile': profile_serializer.data
-            })
-        except UserProfile.DoesNotExist:
+        identity = get_identity(request)
+        profile = identity.profile
+        if profile is None:
             return Response({'error': 'Profile not found'}, status=status.HTTP_404_NOT_FOUND)
+        user_serializer = UserSerializer(identity.user, context={'request': request})
+        profile_serializer = UserProfileSerializer(profile)
+        return Response({
+            'user': user_serializer.data,
+            'profile': profile_serializer.data
+        })
     
     @action(detail=False, methods=['patch', 'put'])
     def update_me(self, request):
         """Update current user's profile"""
         try:
-            profile = UserProfile.objects.get(user=request.user)
-            user = request.user
+            identity = get_identity(request)
+            profile = identity.profile
+            if profile is None:
+                raise UserProfile.DoesNotExist
+            user = identity.user
+            previous_university_id = profile.university_id
             
             # Update user fields
             if 'first_name' in request.data:
@@ -898,6 +1151,8 @@ class UserProfileViewSet(viewsets.ModelViewSet):
                 profile.contact_number = request.data['contact_number'] or ''
             if 'department' in request.data:
                 profile.department = request.data['department'] or ''
+            if 'email_digest' in request.data:
+                profile.email_digest = str(request.data['email_digest']).lower() in ('1', 'true')
             if 'university' in request.data:
                 university_id = request.data['university']
                 if university_id:
@@ -910,12 +1165,17 @@ class UserProfileViewSet(viewsets.ModelViewSet):
             profile.save()
             
             # Return updated data
-            user_serializer = UserSerializer(user)
+            user_serializer = UserSerializer(user, context={'request': request})
             profile_serializer = UserProfileSerializer(profile)
-            return Response({
+            data = {
                 'user': user_serializer.data,
                 'profile': profile_serializer.data
-            })
+            }
+            if profile.university_id != previous_university_id:
+                # The university is a token claim, so saving it revoked the caller's tokens; issue new ones
+                refresh = UsernameOrEmailTokenObtainPairSerializer.get_token(profile.user)
+                data['tokens'] = {'refresh': str(refresh), 'access': str(refresh.access_token)}
+            return Response(data)
         except UserProfile.DoesNotExist:
             return Response({'error': 'Profile not found'}, status=status.HTTP_404_NOT_FOUND)
         except Exception as e:
@@ -952,6 +1212,7 @@ class EventViewSet(viewsets.ModelViewSet):
     queryset = Event.objects.all()
     serializer_class = EventSerializer
     permission_classes = [IsAuthenticated]
+    query_budgets = {'list': 3}
     
     def get_permissions(self):
         # Allow unauthenticated access to list and retrieve actions for public events
@@ -976,13 +1237,15 @@ class EventViewSet(viewsets.ModelViewSet):
                 Q(description__icontains=search)
             )
         if category:
-            queryset = queryset.filter(category_id=category)
+            queryset = queryset.filter(category_id=_id_param('category', category))
         if university:
-            queryset = queryset.filter(host_university_id=university)
+            queryset = queryset.filter(host_university_id=_id_param('university', university))
         if date_from:
             queryset = queryset.filter(date_time__date__gte=date_from)
         if date_to:
             queryset = queryset.filter(date_time__date__lte=date_to)
+        if self.action in ('list', 'retrieve'):
+            queryset = queryset.for_serializer(self.request.user)
             
         return queryset.order_by('date_time')
 
@@ -993,29 +1256,42 @@ class EventViewSet(viewsets.ModelViewSet):
 
     @action(detail=True, methods=['post'])
     def register(self, request, pk=None):
-        user = request.user
-        
-        # Ensure user has a profile
-        user_profile = get_user_profile(user, create_if_missing=True)
+        try:
+            response = self._register(request, pk)
+        except Exception:
+            # Unhandled errors become 500s after this; count them before they propagate
+            metrics.inc('registration_outcomes_total', outcome='error')
+            raise
+        metrics.inc('registration_outcomes_total', outcome=registration_outcome(response))
+        return response
+
+    def _register(self, request, pk):
+        # Ensure user has a profile; user, profile and university come from one query
+        identity = get_identity(request)
+        user_profile = identity.get_profile(create_if_missing=True)
+        user = identity.user
         
         try:
             with transaction.atomic():
                 # Lock the event to prevent race conditions on capacity
                 try:
-                    event = Event.objects.select_for_update().get(pk=pk)
+                    # Relations are joined (but not locked) for the response serializer
+                    event = Event.objects.select_for_update(of=('self',)).select_related(
+                        'organizer', 'host_university', 'venue', 'category'
+                    ).get(pk=pk)
                 except Event.DoesNotExist:
                     return Response({'error': 'Event not found'}, status=status.HTTP_404_NOT_FOUND)
 
                 # 🔹 1. Check university restrictions
                 if event.visibility == 'university':
-                    if user_profile.university != event.host_university:
+                    if user_profile.university_id != event.host_university_id:
                         return Response(
                             {'error': 'This event is only for students of the host university'}, 
                             status=status.HTTP_403_FORBIDDEN
                         )
                 elif event.visibility == 'inter_university':
-                    allowed_universities = event.allowed_universities.all()
-                    if allowed_universities.exists() and user_profile.university not in allowed_universities:
+                    allowed_university_ids = set(event.allowed_universities.values_list('id', flat=True))
+                    if allowed_university_ids and user_profile.university_id not in allowed_university_ids:
                         return Response(
                             {'error': 'Your university is not allowed to register for this event'}, 
                             status=status.HTTP_403_FORBIDDEN
@@ -1074,7 +1350,8 @@ class EventViewSet(viewsets.ModelViewSet):
                         title="Added to Waitlist",
                         message=f"{user_name} has been added to waitlist for {event.title} (Position: {position})",
                         notification_type='waitlist_promotion',
-                        related_event=event
+                        related_event=event,
+                        low_priority=True
                     )
                     
                     # Log Activity
@@ -1083,6 +1360,7 @@ class EventViewSet(viewsets.ModelViewSet):
                         event=event,
                         action='waitlisted'
                     )
+                    publish_seat_update(event.pk)
                     
                     return Response({'status': 'added_to_waitlist', 'position': position})
                 
@@ -1116,6 +1394,7 @@ class EventViewSet(viewsets.ModelViewSet):
                         event=event,
                         action='registered'
                     )
+                    publish_seat_update(event.pk)
                     
                     user_name = user.get_full_name() or user.username
                     send_notification(
@@ -1135,10 +1414,17 @@ class EventViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR
             )
 
+    def perform_update(self, serializer):
+        previous = event_change_snapshot(serializer.instance)
+        event = serializer.save()
+        broadcast_event_changes(event, previous)
+
     def perform_destroy(self, instance):
         """Soft delete: mark as cancelled instead of deleting"""
+        previous = event_change_snapshot(instance)
         instance.status = 'cancelled'
         instance.save()
+        broadcast_event_changes(instance, previous)
 
     @action(detail=True, methods=['post'])
     def cancel_registration(self, request, pk=None):
@@ -1164,6 +1450,7 @@ class EventViewSet(viewsets.ModelViewSet):
         
         # Promote from waitlist
         promote_from_waitlist(event)
+        publish_seat_update(event.pk)
         
         user_name = user.get_full_name() or user.username
         send_notification(
@@ -1180,12 +1467,25 @@ class EventViewSet(viewsets.ModelViewSet):
 class RegistrationViewSet(viewsets.ModelViewSet):
     serializer_class = RegistrationSerializer
     permission_classes = [IsAuthenticated]
+    query_budgets = {'list': 5}
     
     # Add queryset at class level
     queryset = Registration.objects.all()
 
     def get_queryset(self):
-        return Registration.objects.filter(user=self.request.user)
+        queryset = Registration.objects.filter(user=self.request.user)
+        if self.action in ('list', 'retrieve'):
+            queryset = queryset.select_related('user').prefetch_related(
+                Prefetch('event', queryset=Event.objects.for_serializer(self.request.user))
+            )
+        return queryset
+
+    def list(self, request, *args, **kwargs):
+        # Archived registrations of long-completed events are only read when asked for
+        if request.query_params.get('include_archived') not in ('1', 'true'):
+            return super().list(request, *args, **kwargs)
+        history, pagination = paginate_queryset(request, registration_history(request.user))
+        return Response({'results': list(history), 'pagination': pagination})
 
 class WaitlistEntryViewSet(viewsets.ModelViewSet):
     serializer_class = WaitlistEntrySerializer
@@ -1205,20 +1505,20 @@ class AttendanceViewSet(viewsets.ModelViewSet):
     
     def get_queryset(self):
         user = self.request.user
-        user_profile = get_user_profile(user, create_if_missing=False)
+        user_type, _ = user_role(self.request)
         
         # Admin can see all attendance
-        if user.is_staff or (user_profile and user_profile.user_type == 'admin'):
+        if user.is_staff or user_type == 'admin':
             return Attendance.objects.all().select_related('event', 'user', 'registration', 'checked_in_by')
         
         # Organizer can see attendance for their events
-        if user_profile and user_profile.user_type == 'organizer':
+        if user_type == 'organizer':
             return Attendance.objects.filter(
-                event__organizer=user
+                event__organizer_id=user.id
             ).select_related('event', 'user', 'registration', 'checked_in_by')
         
         # Students can only see their own attendance
-        return Attendance.objects.filter(user=user).select_related('event', 'user', 'registration', 'checked_in_by')
+        return Attendance.objects.filter(user_id=user.id).select_related('event', 'user', 'registration', 'checked_in_by')
     
     def get_permissions(self):
         # Only allow create/update/delete for organizers and admins
@@ -1233,16 +1533,16 @@ class AttendanceViewSet(viewsets.ModelViewSet):
         request_user = self.request.user
         
         # Verify organizer owns the event or user is admin
-        user_profile = get_user_profile(request_user, create_if_missing=False)
-        if not (request_user.is_staff or (user_profile and user_profile.user_type == 'admin')):
-            if event.organizer != request_user:
+        user_type, _ = user_role(self.request)
+        if not (request_user.is_staff or user_type == 'admin'):
+            if event.organizer_id != request_user.id:
                 raise ValidationError({'error': 'You can only mark attendance for your own events'})
         
         # Check if user is registered for the event
         registration = Registration.objects.filter(
             event=event,
             user=user_to_mark,
-            status__in=['registered', 'attended']
+            status__in=ATTENDANCE_MARKABLE_STATUSES
         ).first()
         
         if not registration:
@@ -1342,21 +1642,86 @@ class FeedbackViewSet(viewsets.ModelViewSet):
         
         return Response(events_data, status=status.HTTP_200_OK)
 
+class NotificationCursorPagination(CursorPagination):
+    page_size = 20
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+    # id breaks created_at ties, so no notification is skipped or repeated between pages
+    ordering = ('-created_at', '-id')
+
 class NotificationViewSet(viewsets.ModelViewSet):
     serializer_class = NotificationSerializer
     permission_classes = [IsAuthenticated]
+    pagination_class = NotificationCursorPagination
+    query_budgets = {'list': 3}
     
     # Add queryset at class level
     queryset = Notification.objects.all()
 
     def get_queryset(self):
-        return Notification.objects.filter(user=self.request.user).order_by('-created_at')
+        queryset = Notification.objects.filter(user=self.request.user).select_related('related_event')
+        if self.request.query_params.get('unread') in ('1', 'true'):
+            queryset = queryset.filter(is_read=False)
+        return queryset.order_by('-created_at', '-id')
+
+    def perform_update(self, serializer):
+        was_read = serializer.instance.is_read
+        notification = serializer.save()
+        if notification.is_read != was_read:
+            if notification.is_read:
+                decrement_unread(notification.user_id)
+            else:
+                increment_unread([notification.user_id])
+
+    def perform_destroy(self, instance):
+        if not instance.is_read:
+            decrement_unread(instance.user_id)
+        instance.delete()
+
+    @action(detail=False, methods=['get'])
+    def unread_count(self, request):
+        return Response({'unread_count': get_unread_count(request.user.id)})
+
+    @action(detail=True, methods=['post'])
+    def mark_read(self, request, pk=None):
+        updated = Notification.objects.filter(pk=pk, user=request.user, is_read=False).update(is_read=True)
+        if updated:
+            decrement_unread(request.user.id)
+        return Response({'status': 'notification_marked_read'})
 
     @action(detail=False, methods=['post'])
     def mark_all_read(self, request):
-        Notification.objects.filter(user=request.user, is_read=False).update(is_read=True)
+        updated = Notification.objects.filter(user=request.user, is_read=False).update(is_read=True)
+        decrement_unread(request.user.id, by=updated)
         return Response({'status': 'all_notifications_marked_read'})
 
+class NotificationFanoutViewSet(mixins.CreateModelMixin,
+                                mixins.RetrieveModelMixin,
+                                mixins.ListModelMixin,
+                                viewsets.GenericViewSet):
+    """
+    Start university-wide alerts and poll their delivery progress.
+    """
+    serializer_class = NotificationFanoutSerializer
+    permission_classes = [IsOrganizerOrAdmin]
+    queryset = NotificationFanout.objects.all()
+
+    def get_queryset(self):
+        queryset = NotificationFanout.objects.select_related('university').order_by('-created_at')
+        if self.request.user.is_staff:
+            return queryset
+        return queryset.filter(created_by=self.request.user)
+
+    def perform_create(self, serializer):
+        user = self.request.user
+        university = serializer.validated_data['university']
+        if not user.is_staff:
+            user_type, university_id = user_role(self.request)
+            if user_type != 'admin' and university_id != university.id:
+                raise ValidationError({'university': 'You can only alert students of your own university'})
+        # Delivered by the send_queued_emails worker, which picks up pending fan-outs
+        serializer.save(created_by=user)
+
 # Admin-only endpoints
 class AdminEventViewSet(viewsets.ModelViewSet):
     permission_classes = [IsAdminUser]
@@ -1368,7 +1733,7 @@ class AdminEventViewSet(viewsets.ModelViewSet):
         # Filter by university
         university_id = self.request.query_params.get('university', None)
         if university_id and university_id != 'all':
-            queryset = queryset.filter(host_university_id=university_id)
+            queryset = queryset.filter(host_university_id=_id_param('university', university_id))
             
         # Filter by status
         status_param = self.request.query_params.get('status', None)
@@ -1377,6 +1742,11 @@ class AdminEventViewSet(viewsets.ModelViewSet):
             
         return queryset.order_by('-date_time')
 
+    def perform_update(self, serializer):
+        previous = event_change_snapshot(serializer.instance)
+        event = serializer.save()
+        broadcast_event_changes(event, previous)
+
 
 
 class AdminUserViewSet(viewsets.ModelViewSet):
@@ -1402,6 +1772,49 @@ class AdminUserViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR
             )
 
+    @action(detail=True, methods=['post'])
+    def revoke_tokens(self, request, pk=None):
+        """Sign the user out everywhere by invalidating all their issued tokens"""
+        user = self.get_object()
+        revoke_user_tokens(user.id)
+        return Response({'message': f'All tokens for {user.username} have been revoked'})
+
+    @action(detail=False, methods=['post'], parser_classes=[MultiPartParser])
+    def import_students(self, request):
+        """
+        Create student accounts in bulk from an uploaded CSV (columns: see events.imports).
+        A dry run validates inline; a real import is queued for the send_queued_emails
+        worker, which hashes passwords off the request path. Poll the returned job for the result.
+        """
+        upload = request.FILES.get('file')
+        if not upload:
+            return Response({'error': 'A CSV file is required'}, status=status.HTTP_400_BAD_REQUEST)
+        university_id = parse_id(request.data.get('university_id'))
+        university = University.objects.filter(id=university_id).first() if university_id else None
+        if not university:
+            return Response({'error': 'Invalid university ID'}, status=status.HTTP_400_BAD_REQUEST)
+
+        dry_run = str(request.data.get('dry_run', '')).lower() in ('1', 'true')
+        try:
+            if dry_run:
+                lines = io.TextIOWrapper(upload.file, encoding='utf-8-sig')
+                return Response(StudentImport(university, dry_run=True).run(lines))
+            content = upload.read().decode('utf-8-sig')
+            check_columns(next(csv.reader(io.StringIO(content, newline='')), None))
+        except (ValueError, UnicodeDecodeError) as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        # Stored on the row rather than in MEDIA_ROOT: the worker may run on another machine
+        job = StudentImportJob.objects.create(university=university, csv_content=content, created_by=request.user)
+        return Response(StudentImportJobSerializer(job).data, status=status.HTTP_202_ACCEPTED)
+
+    @action(detail=False, methods=['get'], url_path=r'import_students/(?P<job_id>\d+)')
+    def import_status(self, request, job_id=None):
+        """Progress and per-line errors of a queued student import"""
+        job = StudentImportJob.objects.select_related('university').filter(pk=job_id).first()
+        if not job:
+            return Response({'error': 'Import not found'}, status=status.HTTP_404_NOT_FOUND)
+        return Response(StudentImportJobSerializer(job).data)
+
 class AdminUniversityViewSet(viewsets.ModelViewSet):
     permission_classes = [IsAdminUser]
     queryset = University.objects.all()
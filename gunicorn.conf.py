@@ -0,0 +1,12 @@
+import glob
+import os
+
+
+def on_starting(server):
+    # Per-worker metric files from a previous run would otherwise be added to this run's totals
+    directory = os.environ.get('METRICS_MULTIPROC_DIR')
+    if not directory:
+        return
+    os.makedirs(directory, exist_ok=True)
+    for path in glob.glob(os.path.join(directory, '*.json*')):
+        os.remove(path)